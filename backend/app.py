@@ -1,14 +1,20 @@
 import os
-from flask import Flask, request, jsonify
+import json
+import time
+from flask import Flask, request, jsonify, Response, stream_with_context, g
 from flask_cors import CORS
 from config import Config
 from dotenv import load_dotenv
 from services.embedding_service import EmbeddingService
 from services.retrieval_service import RetrievalService
 from services.llm_service import LLMService
-import traceback
+from services.answer_cache import SemanticAnswerCache
+from services.log import configure_logging, get_logger, start_request, request_id_var
+from services.metrics import stage_timer, render_metrics, REQUEST_SECONDS
 
 load_dotenv()
+configure_logging(Config.LOG_LEVEL, Config.LOG_FORMAT)
+logger = get_logger("app")
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -22,10 +28,29 @@ CORS(app, resources={r"/*": {"origins": "*"}})
 embedding_service = EmbeddingService()
 retrieval_service = RetrievalService()
 llm_service = LLMService()
+answer_cache = SemanticAnswerCache(
+    capacity=Config.ANSWER_CACHE_SIZE,
+    dim=Config.EMBEDDING_DIM,
+    threshold=Config.ANSWER_CACHE_THRESHOLD,
+    ttl=Config.ANSWER_CACHE_TTL
+) if Config.ANSWER_CACHE_ENABLED else None
 
-print("\n" + "="*60)
-print("Legal Mitra RAG Backend - Ready!")
-print("="*60 + "\n")
+NO_RESULTS_ANSWER = "I couldn't find relevant information in the legal documents to answer your question. Please try:\n- Rephrasing your question\n- Using more specific legal terms\n- Mentioning specific acts or sections if known\n- Asking about a different legal topic"
+
+logger.info("Legal Mitra RAG Backend - Ready!")
+
+@app.before_request
+def bind_request_id():
+    """Correlation ID for every log line of this request (client-supplied or generated)"""
+    start_request(request.headers.get("X-Request-ID"), Config.LOG_DEBUG_SAMPLE_RATE)
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def add_request_id_header(response):
+    response.headers["X-Request-ID"] = request_id_var.get()
+    endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+    REQUEST_SECONDS.labels(endpoint).observe(time.perf_counter() - g.request_started)
+    return response
 
 @app.route('/', methods=['GET'])
 def home():
@@ -37,7 +62,11 @@ def home():
             "health": "/health",
             "namespaces": "/namespaces",
             "query": "/api/query",
-            "retrieve": "/api/retrieve"
+            "query_stream": "/api/query/stream",
+            "retrieve": "/api/retrieve",
+            "metrics": "/metrics",
+            "batch_query": "/api/batch/query",
+            "batch_retrieve": "/api/batch/retrieve"
         }
     })
 
@@ -46,15 +75,25 @@ def health_check():
     """Health check endpoint"""
     try:
         stats = retrieval_service.get_index_stats()
+        # Without the corpus indexes, section lookup and hybrid search are off
+        corpus_indexes = retrieval_service.corpus_index_stats()
         
         return jsonify({
-            "status": "healthy",
+            "status": "degraded" if corpus_indexes["error"] else "healthy",
             "version": "1.0.0",
             "services": {
                 "embedding_model": Config.EMBEDDING_MODEL,
-                "pinecone": "connected",
+                "vector_backend": Config.RETRIEVAL_BACKEND,
+                "pinecone": "connected" if Config.RETRIEVAL_BACKEND == "pinecone" else "disabled",
                 "gemini": Config.GEMINI_MODEL,
-                "total_vectors": stats.get('total_vector_count', 0)
+                "gemini_circuit": llm_service.breaker_stats(),
+                "total_vectors": stats.get('total_vector_count', 0),
+                "index_stats_age_seconds": retrieval_service.get_index_stats_age(),
+                "corpus_indexes": corpus_indexes,
+                "namespace_latency": retrieval_service.latency_stats(),
+                "reranker": retrieval_service.reranker_stats(),
+                "embedding_cache": embedding_service.cache_stats(),
+                "answer_cache": answer_cache.stats() if answer_cache else {"enabled": False}
             }
         }), 200
     except Exception as e:
@@ -64,14 +103,19 @@ def health_check():
         }), 500
 
 
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Prometheus metrics: per-stage latency histograms and pipeline counters"""
+    body, content_type = render_metrics()
+    return Response(body, mimetype=content_type)
+
+
 @app.route('/namespaces', methods=['GET'])
 def get_namespaces():
     """Get available legal document namespaces"""
     try:
-        # Get namespaces list
+        # Both read from the shared index stats cache (no extra Pinecone calls)
         namespaces = retrieval_service.get_available_namespaces()
-        
-        # Get full stats
         stats = retrieval_service.get_index_stats()
         namespaces_details = stats.get('namespaces', {})
         
@@ -82,15 +126,69 @@ def get_namespaces():
         }), 200
         
     except Exception as e:
-        print(f"Error in /namespaces: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in /namespaces: %s", e)
         return jsonify({
             "error": str(e),
             "total_namespaces": 0,
             "namespaces": []
         }), 200
 
+def build_sources(retrieved_docs):
+    """Source citations returned alongside an answer, in re-ranked order when re-ranked"""
+    if retrieved_docs and all('rerank_position' in doc for doc in retrieved_docs):
+        retrieved_docs = sorted(retrieved_docs, key=lambda doc: doc['rerank_position'])
+    sources = []
+    for doc in retrieved_docs:
+        metadata = doc.get('metadata', {})
+        source = {
+            "act_name": metadata.get('act_name', 'Unknown'),
+            "section_number": metadata.get('section_number', 'N/A'),
+            "text_preview": metadata.get('text_preview', ''),
+            "score": round(doc.get('score', 0.0), 4),
+            "namespace": doc.get('namespace', '')
+        }
+        if 'rerank_score' in doc:
+            source["rerank_score"] = doc['rerank_score']
+        sources.append(source)
+    return sources
+
+
+def parse_query_request(data):
+    """
+    Validate a /api/query style body.
+    Returns (params, None) or (None, error message).
+    """
+    if not data or 'question' not in data:
+        return None, "Missing 'question' in request body"
+    
+    question = data['question'].strip()
+    
+    if len(question) < 3:  # Reduced from 5
+        return None, "Question must be at least 3 characters long"
+    
+    if len(question) > 500:
+        return None, "Question must be less than 500 characters"
+    
+    # Extract parameters with improved defaults
+    top_k = data.get('top_k', Config.TOP_K)
+    
+    # Validate top_k
+    if not isinstance(top_k, int) or top_k < 1 or top_k > 20:  # Increased max
+        top_k = Config.TOP_K
+    
+    return {
+        "question": question,
+        "top_k": top_k,
+        "namespaces": data.get('namespaces', None),
+        "include_sources": data.get('include_sources', True)
+    }, None
+
+
+def sse_event(event, payload):
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+
 @app.route('/api/query', methods=['POST'])
 def query_legal_documents():
     """
@@ -98,54 +196,39 @@ def query_legal_documents():
     """
     try:
         # Validate request
-        data = request.get_json()
+        params, error = parse_query_request(request.get_json())
+        if error:
+            return jsonify({"error": error}), 400
         
-        if not data or 'question' not in data:
-            return jsonify({"error": "Missing 'question' in request body"}), 400
+        question = params["question"]
+        top_k = params["top_k"]
+        namespaces = params["namespaces"]
+        include_sources = params["include_sources"]
         
-        question = data['question'].strip()
-        
-        if len(question) < 3:  # Reduced from 5
-            return jsonify({"error": "Question must be at least 3 characters long"}), 400
-        
-        if len(question) > 500:
-            return jsonify({"error": "Question must be less than 500 characters"}), 400
-        
-        # Extract parameters with improved defaults
-        top_k = data.get('top_k', Config.TOP_K)
-        namespaces = data.get('namespaces', None)
-        include_sources = data.get('include_sources', True)
-        
-        # Validate top_k
-        if not isinstance(top_k, int) or top_k < 1 or top_k > 20:  # Increased max
-            top_k = Config.TOP_K
-        
-        print(f"\n{'='*60}")
-        print(f"📝 Query: {question}")
-        print(f"🔍 Top K: {top_k}")
-        print(f"📚 Namespaces: {namespaces or 'all'}")
-        print(f"{'='*60}")
+        logger.info("Query: %s", question, extra={"top_k": top_k, "namespaces": namespaces or "all"})
         
         # 1. Generate query embedding
-        query_embedding = embedding_service.embed_query(question)
+        with stage_timer("embed"):
+            query_embedding = embedding_service.embed_query(question)
         
         # 2. Retrieve relevant documents
-        retrieved_docs = retrieval_service.retrieve(
-            query_embedding=query_embedding,
-            top_k=top_k,
-            namespaces=namespaces,
-            score_threshold=Config.SCORE_THRESHOLD,
-            query_text=question
-        )
+        with stage_timer("retrieve"):
+            retrieved_docs = retrieval_service.retrieve(
+                query_embedding=query_embedding,
+                top_k=top_k,
+                namespaces=namespaces,
+                score_threshold=Config.SCORE_THRESHOLD,
+                query_text=question
+            )
         
-        print(f"✅ Retrieved {len(retrieved_docs)} documents")
+        logger.info("Retrieved %d documents", len(retrieved_docs))
         
         # Handle no results with more helpful message
         if not retrieved_docs:
-            print("⚠️  No relevant documents found")
+            logger.warning("No relevant documents found")
             return jsonify({
                 "question": question,
-                "answer": "I couldn't find relevant information in the legal documents to answer your question. Please try:\n- Rephrasing your question\n- Using more specific legal terms\n- Mentioning specific acts or sections if known\n- Asking about a different legal topic",
+                "answer": NO_RESULTS_ANSWER,
                 "sources": [],
                 "metadata": {
                     "retrieved_count": 0,
@@ -153,43 +236,133 @@ def query_legal_documents():
                 }
             }), 200
         
-        # 3. Generate answer using LLM
-        print("🤖 Generating answer with Gemini...")
-        answer = llm_service.generate_answer(question, retrieved_docs)
-        
-        # 4. Prepare sources with extended preview
-        sources = []
-        if include_sources:
-            for doc in retrieved_docs:
-                metadata = doc.get('metadata', {})
-                sources.append({
-                    "act_name": metadata.get('act_name', 'Unknown'),
-                    "section_number": metadata.get('section_number', 'N/A'),
-                    "text_preview": metadata.get('text_preview', ''),
-                    "score": round(doc.get('score', 0.0), 4),
-                    "namespace": doc.get('namespace', '')
-                })
-        
-        print("✅ Response generated successfully\n")
+        # 3. Serve reworded questions over the same provisions from the answer cache
+        cached = None
+        if answer_cache is not None:
+            section_key = SemanticAnswerCache.section_key(retrieved_docs)
+            cached = answer_cache.get(query_embedding, section_key)
+        
+        if cached:
+            logger.info("Answer cache hit (similarity: %.4f)", cached['similarity'])
+            answer = cached['answer']
+            sources = cached['sources']
+        else:
+            # 4. Generate answer using LLM
+            logger.info("Generating answer with Gemini")
+            with stage_timer("generate"):
+                answer = llm_service.generate_answer(question, retrieved_docs)
+            
+            # 5. Prepare sources with extended preview
+            sources = build_sources(retrieved_docs)
+            
+            # Only cache real Gemini answers, never fallbacks
+            if answer_cache is not None and llm_service.is_generated_answer(answer):
+                answer_cache.put(query_embedding, section_key, {"answer": answer, "sources": sources})
+        
+        logger.info("Response generated successfully")
         
         return jsonify({
             "question": question,
             "answer": answer,
-            "sources": sources,
+            "sources": sources if include_sources else [],
             "metadata": {
                 "retrieved_count": len(retrieved_docs),
                 "model_used": Config.GEMINI_MODEL,
+                "cached": cached is not None,
                 "threshold_used": Config.SCORE_THRESHOLD,
                 "namespaces_searched": namespaces or "all"
             }
         }), 200
     
     except Exception as e:
-        print(f"❌ Error in /api/query: {e}")
-        traceback.print_exc()
+        logger.exception("Error in /api/query: %s", e)
         return jsonify({"error": f"Internal server error: {str(e)}"}), 500
 
 
+@app.route('/api/query/stream', methods=['POST'])
+def query_legal_documents_stream():
+    """
+    Streaming variant of /api/query using Server-Sent Events.
+    
+    Events: "sources" (citations, sent as soon as retrieval finishes),
+    "chunk" (answer text), "reset" (discard text streamed so far; a retry
+    or fallback follows), "done" (full answer + metadata) and "error".
+    """
+    params, error = parse_query_request(request.get_json(silent=True))
+    if error:
+        return jsonify({"error": error}), 400
+    
+    question = params["question"]
+    top_k = params["top_k"]
+    namespaces = params["namespaces"]
+    include_sources = params["include_sources"]
+    
+    def generate():
+        try:
+            logger.info("Streaming query: %s", question)
+            
+            query_embedding = embedding_service.embed_query(question)
+            retrieved_docs = retrieval_service.retrieve(
+                query_embedding=query_embedding,
+                top_k=top_k,
+                namespaces=namespaces,
+                score_threshold=Config.SCORE_THRESHOLD,
+                query_text=question
+            )
+            
+            metadata = {
+                "retrieved_count": len(retrieved_docs),
+                "model_used": Config.GEMINI_MODEL,
+                "threshold_used": Config.SCORE_THRESHOLD,
+                "namespaces_searched": namespaces or "all"
+            }
+            
+            if not retrieved_docs:
+                yield sse_event("sources", {"sources": [], "metadata": metadata})
+                yield sse_event("chunk", {"text": NO_RESULTS_ANSWER})
+                yield sse_event("done", {"answer": NO_RESULTS_ANSWER, "metadata": {**metadata, "cached": False}})
+                return
+            
+            sources = build_sources(retrieved_docs)
+            yield sse_event("sources", {"sources": sources if include_sources else [], "metadata": metadata})
+            
+            cached = None
+            if answer_cache is not None:
+                section_key = SemanticAnswerCache.section_key(retrieved_docs)
+                cached = answer_cache.get(query_embedding, section_key)
+            
+            if cached:
+                logger.info("Answer cache hit (similarity: %.4f)", cached['similarity'])
+                answer = cached['answer']
+                yield sse_event("chunk", {"text": answer})
+            else:
+                parts = []
+                for kind, text in llm_service.generate_answer_stream(question, retrieved_docs):
+                    if kind == "reset":
+                        parts = []
+                        yield sse_event("reset", {"reason": text})
+                    else:
+                        parts.append(text)
+                        yield sse_event("chunk", {"text": text})
+                answer = "".join(parts)
+                
+                if answer_cache is not None and llm_service.is_generated_answer(answer):
+                    answer_cache.put(query_embedding, section_key, {"answer": answer, "sources": sources})
+            
+            yield sse_event("done", {"answer": answer, "metadata": {**metadata, "cached": cached is not None}})
+            logger.info("Streamed response completed")
+        
+        except Exception as e:
+            logger.exception("Error in /api/query/stream: %s", e)
+            yield sse_event("error", {"error": f"Internal server error: {str(e)}"})
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @app.route('/api/retrieve', methods=['POST'])
 def retrieve_only():
     """
@@ -224,9 +397,162 @@ def retrieve_only():
         }), 200
     
     except Exception as e:
-        print(f"Error in /api/retrieve: {e}")
+        logger.exception("Error in /api/retrieve: %s", e)
         return jsonify({"error": str(e)}), 500
 
+def parse_batch_request(data):
+    """
+    Validate a batch body {"questions": [...], top_k, namespaces, include_sources}.
+    Returns (items, None) or (None, error message); each item is
+    (params, None) or (None, error) so bad questions fail individually.
+    """
+    if not data or not isinstance(data.get('questions'), list) or not data['questions']:
+        return None, "Missing 'questions' list in request body"
+    
+    if len(data['questions']) > Config.BATCH_MAX_QUESTIONS:
+        return None, f"At most {Config.BATCH_MAX_QUESTIONS} questions per batch"
+    
+    shared = {key: data[key] for key in ('top_k', 'namespaces', 'include_sources') if key in data}
+    items = []
+    for question in data['questions']:
+        if not isinstance(question, str):
+            items.append((None, "Question must be a string"))
+        else:
+            items.append(parse_query_request({**shared, "question": question}))
+    return items, None
+
+
+def retrieve_batch(items):
+    """
+    Embed all valid questions at once and retrieve for each; returns
+    embeddings, docs and failed namespaces per item
+    """
+    valid = [i for i, (params, error) in enumerate(items) if not error]
+    if not valid:
+        return {}, {}, {}
+    
+    first = items[valid[0]][0]
+    questions = [items[i][0]["question"] for i in valid]
+    
+    embeddings = embedding_service.embed_queries(questions)
+    documents, failed_namespaces = retrieval_service.retrieve_batch(
+        query_embeddings=embeddings,
+        query_texts=questions,
+        top_k=first["top_k"],
+        namespaces=first["namespaces"],
+        score_threshold=Config.SCORE_THRESHOLD,
+        timeout=Config.BATCH_RETRIEVE_TIMEOUT
+    )
+    return dict(zip(valid, embeddings)), dict(zip(valid, documents)), dict(zip(valid, failed_namespaces))
+
+
+@app.route('/api/batch/retrieve', methods=['POST'])
+def batch_retrieve():
+    """
+    Retrieve documents for a list of questions; results are in input order
+    """
+    try:
+        items, error = parse_batch_request(request.get_json(silent=True))
+        if error:
+            return jsonify({"error": error}), 400
+        
+        _, documents, failed_namespaces = retrieve_batch(items)
+        
+        results = []
+        for i, (params, item_error) in enumerate(items):
+            if item_error:
+                results.append({"index": i, "error": item_error})
+                continue
+            result = {
+                "index": i,
+                "question": params["question"],
+                "retrieved_count": len(documents[i]),
+                "documents": documents[i]
+            }
+            if failed_namespaces[i]:
+                # Partial results: these acts could not be searched
+                result["failed_namespaces"] = failed_namespaces[i]
+            results.append(result)
+        
+        return jsonify({"count": len(results), "results": results}), 200
+    
+    except Exception as e:
+        logger.exception("Error in /api/batch/retrieve: %s", e)
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+
+@app.route('/api/batch/query', methods=['POST'])
+def batch_query():
+    """
+    Answer a list of questions; generations run on a bounded Gemini pool
+    and results are returned in input order with per-question errors
+    """
+    try:
+        items, error = parse_batch_request(request.get_json(silent=True))
+        if error:
+            return jsonify({"error": error}), 400
+        
+        embeddings, documents, failed_namespaces = retrieve_batch(items)
+        
+        results = [None] * len(items)
+        pending = {}
+        for i, (params, item_error) in enumerate(items):
+            if item_error:
+                results[i] = {"index": i, "error": item_error}
+                continue
+            
+            retrieved_docs = documents[i]
+            metadata = {
+                "retrieved_count": len(retrieved_docs),
+                "model_used": Config.GEMINI_MODEL,
+                "cached": False,
+                "threshold_used": Config.SCORE_THRESHOLD,
+                "namespaces_searched": params["namespaces"] or "all"
+            }
+            result = {"index": i, "question": params["question"], "metadata": metadata}
+            if failed_namespaces[i]:
+                # Partial results: these acts could not be searched
+                result["failed_namespaces"] = failed_namespaces[i]
+            results[i] = result
+            
+            if not retrieved_docs:
+                result.update(answer=NO_RESULTS_ANSWER, sources=[])
+                continue
+            
+            section_key = SemanticAnswerCache.section_key(retrieved_docs)
+            cached = answer_cache.get(embeddings[i], section_key) if answer_cache is not None else None
+            if cached:
+                metadata["cached"] = True
+                result.update(answer=cached['answer'], sources=cached['sources'])
+            else:
+                result["sources"] = build_sources(retrieved_docs)
+                pending[i] = (llm_service.submit_answer(params["question"], retrieved_docs), section_key)
+        
+        logger.info("Batch query: %d questions, %d generations", len(items), len(pending))
+        
+        for i, (future, section_key) in pending.items():
+            result = results[i]
+            try:
+                result["answer"] = future.result()
+            except Exception as e:
+                logger.warning("Generation failed for batch item %d: %s", i, e)
+                results[i] = {"index": i, "question": result["question"], "error": str(e)}
+                continue
+            
+            if answer_cache is not None and llm_service.is_generated_answer(result["answer"]) and not failed_namespaces[i]:
+                answer_cache.put(embeddings[i], section_key, {"answer": result["answer"], "sources": result["sources"]})
+        
+        for i, (params, item_error) in enumerate(items):
+            if not item_error and not params["include_sources"] and "sources" in results[i]:
+                results[i]["sources"] = []
+        
+        return jsonify({"count": len(results), "results": results}), 200
+    
+    except Exception as e:
+        logger.exception("Error in /api/batch/query: %s", e)
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+
 @app.errorhandler(404)
 def not_found(error):
     return jsonify({"error": "Endpoint not found"}), 404
@@ -0,0 +1,260 @@
+"""
+Asyncio-native serving path for the RAG API (same routes and responses as app.py).
+
+Run with an ASGI server, e.g.:
+    hypercorn asgi:app --bind 0.0.0.0:10000
+
+Gemini calls are awaited on its async client, namespace queries are awaited
+on the shared fan-out pool and embedding runs off the event loop, so one
+process can keep hundreds of queries in flight.
+"""
+import os
+import time
+import asyncio
+from quart import Quart, request, jsonify, Response, g
+from quart_cors import cors
+from config import Config
+from services.answer_cache import SemanticAnswerCache
+from services.log import get_logger, start_request, request_id_var
+from services.metrics import stage_timer, render_metrics, REQUEST_SECONDS
+from app import (
+    embedding_service,
+    retrieval_service,
+    llm_service,
+    answer_cache,
+    build_sources,
+    parse_query_request,
+    NO_RESULTS_ANSWER
+)
+
+app = Quart(__name__)
+app.config.from_object(Config)
+app = cors(app, allow_origin="*")
+logger = get_logger("asgi")
+
+
+@app.before_request
+async def bind_request_id():
+    """Correlation ID for every log line of this request (client-supplied or generated)"""
+    start_request(request.headers.get("X-Request-ID"), Config.LOG_DEBUG_SAMPLE_RATE)
+    g.request_started = time.perf_counter()
+
+
+@app.after_request
+async def add_request_id_header(response):
+    response.headers["X-Request-ID"] = request_id_var.get()
+    endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+    REQUEST_SECONDS.labels(endpoint).observe(time.perf_counter() - g.request_started)
+    return response
+
+
+@app.route('/', methods=['GET'])
+async def home():
+    """Root endpoint"""
+    return jsonify({
+        "message": "Legal Mitra RAG API",
+        "version": "1.0.0",
+        "endpoints": {
+            "health": "/health",
+            "namespaces": "/namespaces",
+            "query": "/api/query",
+            "retrieve": "/api/retrieve",
+            "metrics": "/metrics"
+        }
+    })
+
+
+@app.route('/health', methods=['GET'])
+async def health_check():
+    """Health check endpoint"""
+    try:
+        # Usually served from the stats cache; the first call may hit Pinecone
+        stats = await asyncio.to_thread(retrieval_service.get_index_stats)
+        # Without the corpus indexes, section lookup and hybrid search are off
+        corpus_indexes = retrieval_service.corpus_index_stats()
+        
+        return jsonify({
+            "status": "degraded" if corpus_indexes["error"] else "healthy",
+            "version": "1.0.0",
+            "services": {
+                "embedding_model": Config.EMBEDDING_MODEL,
+                "vector_backend": Config.RETRIEVAL_BACKEND,
+                "pinecone": "connected" if Config.RETRIEVAL_BACKEND == "pinecone" else "disabled",
+                "gemini": Config.GEMINI_MODEL,
+                "gemini_circuit": llm_service.breaker_stats(),
+                "total_vectors": stats.get('total_vector_count', 0),
+                "index_stats_age_seconds": retrieval_service.get_index_stats_age(),
+                "corpus_indexes": corpus_indexes,
+                "namespace_latency": retrieval_service.latency_stats(),
+                "reranker": retrieval_service.reranker_stats(),
+                "embedding_cache": embedding_service.cache_stats(),
+                "answer_cache": answer_cache.stats() if answer_cache else {"enabled": False}
+            }
+        }), 200
+    except Exception as e:
+        return jsonify({
+            "status": "unhealthy",
+            "error": str(e)
+        }), 500
+
+
+@app.route('/metrics', methods=['GET'])
+async def metrics():
+    """Prometheus metrics: per-stage latency histograms and pipeline counters"""
+    body, content_type = render_metrics()
+    return Response(body, mimetype=content_type)
+
+
+@app.route('/namespaces', methods=['GET'])
+async def get_namespaces():
+    """Get available legal document namespaces"""
+    try:
+        stats = await asyncio.to_thread(retrieval_service.get_index_stats)
+        namespaces = retrieval_service.get_available_namespaces()
+        
+        return jsonify({
+            "total_namespaces": len(namespaces),
+            "namespaces": namespaces,
+            "details": stats.get('namespaces', {})
+        }), 200
+    
+    except Exception as e:
+        logger.exception("Error in /namespaces: %s", e)
+        return jsonify({
+            "error": str(e),
+            "total_namespaces": 0,
+            "namespaces": []
+        }), 200
+
+
+@app.route('/api/query', methods=['POST'])
+async def query_legal_documents():
+    """
+    Main endpoint to query legal documents and get AI-generated answers
+    """
+    try:
+        params, error = parse_query_request(await request.get_json(silent=True))
+        if error:
+            return jsonify({"error": error}), 400
+        
+        question = params["question"]
+        top_k = params["top_k"]
+        namespaces = params["namespaces"]
+        
+        logger.info("Query (async): %s", question)
+        
+        # 1. Generate query embedding
+        with stage_timer("embed"):
+            query_embedding = await embedding_service.embed_query_async(question)
+        
+        # 2. Retrieve relevant documents
+        with stage_timer("retrieve"):
+            retrieved_docs = await retrieval_service.retrieve_async(
+                query_embedding=query_embedding,
+                top_k=top_k,
+                namespaces=namespaces,
+                score_threshold=Config.SCORE_THRESHOLD,
+                query_text=question
+            )
+        
+        logger.info("Retrieved %d documents", len(retrieved_docs))
+        
+        if not retrieved_docs:
+            logger.warning("No relevant documents found")
+            return jsonify({
+                "question": question,
+                "answer": NO_RESULTS_ANSWER,
+                "sources": [],
+                "metadata": {
+                    "retrieved_count": 0,
+                    "threshold_used": Config.SCORE_THRESHOLD
+                }
+            }), 200
+        
+        # 3. Serve reworded questions over the same provisions from the answer cache
+        cached = None
+        if answer_cache is not None:
+            section_key = SemanticAnswerCache.section_key(retrieved_docs)
+            cached = answer_cache.get(query_embedding, section_key)
+        
+        if cached:
+            logger.info("Answer cache hit (similarity: %.4f)", cached['similarity'])
+            answer = cached['answer']
+            sources = cached['sources']
+        else:
+            # 4. Generate answer using LLM
+            with stage_timer("generate"):
+                answer = await llm_service.generate_answer_async(question, retrieved_docs)
+            sources = build_sources(retrieved_docs)
+            
+            if answer_cache is not None and llm_service.is_generated_answer(answer):
+                answer_cache.put(query_embedding, section_key, {"answer": answer, "sources": sources})
+        
+        return jsonify({
+            "question": question,
+            "answer": answer,
+            "sources": sources if params["include_sources"] else [],
+            "metadata": {
+                "retrieved_count": len(retrieved_docs),
+                "model_used": Config.GEMINI_MODEL,
+                "cached": cached is not None,
+                "threshold_used": Config.SCORE_THRESHOLD,
+                "namespaces_searched": namespaces or "all"
+            }
+        }), 200
+    
+    except Exception as e:
+        logger.exception("Error in /api/query: %s", e)
+        return jsonify({"error": f"Internal server error: {str(e)}"}), 500
+
+
+@app.route('/api/retrieve', methods=['POST'])
+async def retrieve_only():
+    """
+    Retrieve relevant documents without LLM generation (for testing/debugging)
+    """
+    try:
+        data = await request.get_json(silent=True)
+        
+        if not data or 'question' not in data:
+            return jsonify({"error": "Missing 'question' in request body"}), 400
+        
+        question = data['question'].strip()
+        
+        query_embedding = await embedding_service.embed_query_async(question)
+        retrieved_docs = await retrieval_service.retrieve_async(
+            query_embedding=query_embedding,
+            top_k=data.get('top_k', Config.TOP_K),
+            namespaces=data.get('namespaces', None),
+            score_threshold=Config.SCORE_THRESHOLD,
+            query_text=question
+        )
+        
+        return jsonify({
+            "question": question,
+            "retrieved_count": len(retrieved_docs),
+            "documents": retrieved_docs
+        }), 200
+    
+    except Exception as e:
+        logger.exception("Error in /api/retrieve: %s", e)
+        return jsonify({"error": str(e)}), 500
+
+
+@app.errorhandler(404)
+async def not_found(error):
+    return jsonify({"error": "Endpoint not found"}), 404
+
+
+@app.errorhandler(405)
+async def method_not_allowed(error):
+    return jsonify({"error": "Method not allowed"}), 405
+
+
+@app.errorhandler(500)
+async def internal_error(error):
+    return jsonify({"error": "Internal server error"}), 500
+
+if __name__ == '__main__':
+    port = int(os.environ.get("PORT", 10000))
+    app.run(host='0.0.0.0', port=port, debug=Config.DEBUG)
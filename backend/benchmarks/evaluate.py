@@ -0,0 +1,286 @@
+"""
+Retrieval quality-vs-latency evaluation over the bundled acts.
+
+Runs every question of a labeled set (benchmarks/eval_set.jsonl) through
+RetrievalService.retrieve under several retrieval configurations and
+reports recall@k, MRR, latency and namespaces queried for each, so changes
+such as a smaller over-fetch or fewer namespaces can be checked for lost
+recall before they ship.
+
+Usage (from backend/, against the configured index and embedding model):
+    python -m benchmarks.evaluate                              # all built-in configurations
+    python -m benchmarks.evaluate --configs baseline overfetch_1 dense_only
+    python -m benchmarks.evaluate --config-file sweep.json --output eval.json
+    python -m benchmarks.evaluate --index-latency lognormal:40:200   # simulate remote index latency
+    python -m benchmarks.evaluate --show-misses baseline
+
+Eval set lines: {"question": ..., "expected": ["ipc:302", "bns:103"], "type": "topic"}.
+A config file maps names to knobs, e.g. {"fast": {"top_k": 5, "overfetch": 1}}.
+Knobs: top_k, score_threshold, overfetch, namespace_detection, diversify,
+mmr_lambda, hybrid, fusion, section_lookup, concordance, rerank, rerank_top_n. Unset knobs keep the server configuration.
+"""
+import argparse
+import json
+import os
+import time
+from contextlib import contextmanager
+from typing import List, Dict, Any
+
+import numpy as np
+
+from benchmarks.fakes import LatencyModel, FakeIndex
+
+EVAL_SET_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "eval_set.jsonl")
+RECALL_AT = (1, 3, 5, 10)
+
+DEFAULT_CONFIGS: Dict[str, Dict[str, Any]] = {
+    "baseline": {},
+    "top_k_5": {"top_k": 5},
+    "overfetch_1": {"overfetch": 1},
+    "overfetch_2": {"overfetch": 2},
+    "overfetch_3": {"overfetch": 3},
+    "threshold_0.2": {"score_threshold": 0.2},
+    "threshold_0.4": {"score_threshold": 0.4},
+    "all_namespaces": {"namespace_detection": False},
+    "no_diversify": {"diversify": False},
+    "mmr_0.5": {"mmr_lambda": 0.5},
+    "mmr_0.9": {"mmr_lambda": 0.9},
+    "dense_only": {"hybrid": False},
+    "dense_only_overfetch_2": {"hybrid": False, "overfetch": 2},
+    "weighted_fusion": {"fusion": "weighted"},
+    "no_section_lookup": {"section_lookup": False},
+    "no_concordance": {"concordance": False},
+    # Only differ from baseline when started with RERANK_ENABLED=true
+    "no_rerank": {"rerank": False},
+    "rerank_top_n_15": {"rerank_top_n": 15},
+}
+
+# Knob -> RetrievalService attribute
+_SERVICE_KNOBS = {
+    "overfetch": "_dense_overfetch",
+    "namespace_detection": "_namespace_detection",
+    "diversify": "_diversify",
+    "mmr_lambda": "_mmr_lambda",
+    "fusion": "_fusion_method",
+    "section_lookup": "_section_lookup_enabled",
+    "rerank_top_n": "_rerank_top_n",
+}
+
+# Knob -> optional component that the knob switches off when False
+_COMPONENT_KNOBS = {
+    "hybrid": ("_bm25_index", "HYBRID_SEARCH_ENABLED"),
+    "rerank": ("_reranker", "RERANK_ENABLED"),
+    "concordance": ("_concordance", "CONCORDANCE_PATH"),
+}
+
+
+def load_eval_set(path: str) -> List[Dict[str, Any]]:
+    items = []
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            if not item.get("question") or not item.get("expected"):
+                raise ValueError(f"{path}:{line_number}: needs 'question' and 'expected'")
+            item["expected"] = [tuple(label.split(":", 1)) for label in item["expected"]]
+            items.append(item)
+    return items
+
+
+@contextmanager
+def configured(service, knobs: Dict[str, Any]):
+    """Temporarily apply service-level knobs to the RetrievalService singleton"""
+    saved = {}
+    try:
+        for knob, attribute in _SERVICE_KNOBS.items():
+            if knob in knobs:
+                saved[attribute] = getattr(service, attribute)
+                setattr(service, attribute, knobs[knob])
+        for knob, (attribute, setting) in _COMPONENT_KNOBS.items():
+            if knob not in knobs:
+                continue
+            component = getattr(service, attribute)
+            if knobs[knob] and component is None:
+                raise ValueError(f"{knob}=True needs {attribute}, which was not loaded (check {setting})")
+            saved[attribute] = component
+            setattr(service, attribute, component if knobs[knob] else None)
+        yield
+    finally:
+        for attribute, value in saved.items():
+            setattr(service, attribute, value)
+
+
+def result_key(result: Dict[str, Any]):
+    return result["namespace"], str(result["metadata"].get("section_number", ""))
+
+
+def score_ranking(ranking: List[tuple], expected: List[tuple]) -> Dict[str, Any]:
+    """recall@k for each k, reciprocal rank of the first relevant hit"""
+    expected_set = set(expected)
+    scores = {}
+    for k in RECALL_AT:
+        found = expected_set.intersection(ranking[:k])
+        scores[f"recall@{k}"] = len(found) / len(expected_set)
+    reciprocal_rank = 0.0
+    for rank, key in enumerate(ranking, 1):
+        if key in expected_set:
+            reciprocal_rank = 1.0 / rank
+            break
+    scores["rr"] = reciprocal_rank
+    return scores
+
+
+def evaluate_config(
+    service,
+    counter: FakeIndex,
+    items: List[Dict[str, Any]],
+    embeddings: List[List[float]],
+    knobs: Dict[str, Any],
+    defaults: Dict[str, Any],
+    repeat: int = 1
+) -> Dict[str, Any]:
+    top_k = knobs.get("top_k", defaults["top_k"])
+    score_threshold = knobs.get("score_threshold", defaults["score_threshold"])
+
+    per_item = []
+    latencies = []
+    counter.query_calls = 0
+    with configured(service, knobs):
+        for item, embedding in zip(items, embeddings):
+            for _ in range(repeat):
+                started = time.perf_counter()
+                results = service.retrieve(
+                    query_embedding=embedding,
+                    top_k=top_k,
+                    score_threshold=score_threshold,
+                    query_text=item["question"]
+                )
+                latencies.append(time.perf_counter() - started)
+            ranking = [result_key(result) for result in results]
+            per_item.append({
+                "question": item["question"],
+                "type": item.get("type", ""),
+                "expected": item["expected"],
+                "ranking": ranking,
+                "returned": len(results),
+                **score_ranking(ranking, item["expected"])
+            })
+
+    def mean(rows, metric):
+        return round(float(np.mean([row[metric] for row in rows])), 4) if rows else None
+
+    def quality(rows):
+        summary = {f"recall@{k}": mean(rows, f"recall@{k}") for k in RECALL_AT if k <= top_k}
+        summary["mrr"] = mean(rows, "rr")
+        summary["questions"] = len(rows)
+        return summary
+
+    latency_ms = np.asarray(latencies) * 1000
+    by_type: Dict[str, List[Dict]] = {}
+    by_namespace: Dict[str, List[Dict]] = {}
+    for row in per_item:
+        by_type.setdefault(row["type"] or "untyped", []).append(row)
+        for namespace in {namespace for namespace, _ in row["expected"]}:
+            by_namespace.setdefault(namespace, []).append(row)
+
+    return {
+        "knobs": {"top_k": top_k, "score_threshold": score_threshold, **knobs},
+        **quality(per_item),
+        "latency": {
+            "mean_ms": round(float(latency_ms.mean()), 2),
+            **{f"p{q}_ms": round(float(np.percentile(latency_ms, q)), 2) for q in (50, 95, 99)}
+        },
+        "namespaces_per_query": round(counter.query_calls / max(len(latencies), 1), 2),
+        "results_per_query": mean(per_item, "returned"),
+        "by_type": {name: quality(rows) for name, rows in sorted(by_type.items())},
+        "by_namespace": {name: quality(rows) for name, rows in sorted(by_namespace.items())},
+        "misses": [
+            {"question": row["question"], "expected": [":".join(key) for key in row["expected"]],
+             "top": [":".join(key) for key in row["ranking"][:5]]}
+            for row in per_item if row["rr"] == 0.0
+        ],
+    }
+
+
+def print_summary(report: Dict[str, Dict[str, Any]]):
+    print(f"\n{'Config':<26}{'R@1':>7}{'R@3':>7}{'R@5':>7}{'R@10':>7}{'MRR':>7}{'p50 ms':>9}{'p95 ms':>9}{'NS/q':>7}")
+    for name, stats in report.items():
+        recalls = "".join(f"{stats[f'recall@{k}']:>7.3f}" if f"recall@{k}" in stats else f"{'-':>7}" for k in RECALL_AT)
+        print(f"{name:<26}{recalls}{stats['mrr']:>7.3f}{stats['latency']['p50_ms']:>9}{stats['latency']['p95_ms']:>9}"
+              f"{stats['namespaces_per_query']:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall/MRR/latency of retrieval configurations on a labeled question set")
+    parser.add_argument("--eval-set", default=EVAL_SET_PATH)
+    parser.add_argument("--configs", nargs="+", help=f"Built-in configurations to run (default: all): {', '.join(DEFAULT_CONFIGS)}")
+    parser.add_argument("--config-file", help="JSON object of {name: knobs}; replaces the built-in configurations")
+    parser.add_argument("--index-latency", default="none", help="Extra latency per index query: none | fixed:MS | lognormal:P50_MS:P99_MS")
+    parser.add_argument("--repeat", type=int, default=1, help="Timed retrieve() calls per question")
+    parser.add_argument("--show-misses", nargs="*", metavar="CONFIG", help="Print questions with no relevant hit")
+    parser.add_argument("--output", help="Write the full report as JSON to this path")
+    args = parser.parse_args()
+
+    if args.config_file:
+        with open(args.config_file, encoding="utf-8") as f:
+            configs = json.load(f)
+    else:
+        configs = DEFAULT_CONFIGS
+    if args.configs:
+        unknown = [name for name in args.configs if name not in configs]
+        if unknown:
+            parser.error(f"Unknown configurations: {', '.join(unknown)}")
+        configs = {name: configs[name] for name in args.configs}
+
+    # Hybrid search is on by default; set before load_dotenv() so a .env that turns it off
+    # still gets a BM25 index and dense_only vs hybrid can be compared
+    os.environ.setdefault("HYBRID_SEARCH_ENABLED", "true")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    from dotenv import load_dotenv
+    load_dotenv()
+    from config import Config
+    from services.log import configure_logging
+    from services.embedding_service import EmbeddingService
+    from services.retrieval_service import RetrievalService
+
+    configure_logging(Config.LOG_LEVEL, Config.LOG_FORMAT)
+    items = load_eval_set(args.eval_set)
+    embedding_service = EmbeddingService()
+    service = RetrievalService()
+
+    # Section lookup and BM25 are built in the background; measure them once ready
+    corpus_indexes = [index for index in (RetrievalService._section_index, RetrievalService._bm25_index) if index is not None]
+    deadline = time.monotonic() + 300
+    while not all(index.ready for index in corpus_indexes) and time.monotonic() < deadline:
+        time.sleep(0.1)
+
+    # Count (and optionally slow down) index queries
+    counter = FakeIndex(RetrievalService._index, LatencyModel(args.index_latency))
+    RetrievalService._index = counter
+
+    started = time.perf_counter()
+    embeddings = embedding_service.embed_queries([item["question"] for item in items])
+    print(f"Embedded {len(items)} questions in {time.perf_counter() - started:.2f}s")
+
+    defaults = {"top_k": Config.TOP_K, "score_threshold": Config.SCORE_THRESHOLD}
+    report = {}
+    for name, knobs in configs.items():
+        report[name] = evaluate_config(service, counter, items, embeddings, knobs, defaults, args.repeat)
+
+    print_summary(report)
+    if args.show_misses is not None:
+        for name in args.show_misses or list(report):
+            print(f"\nMisses for {name}:")
+            for miss in report[name]["misses"]:
+                print(f"  {miss['question']!r}: expected {', '.join(miss['expected'])}; got {', '.join(miss['top']) or 'nothing'}")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+In-process stand-ins for Pinecone, Gemini and the embedding model.
+
+Each fake sleeps for a latency drawn from a LatencyModel, so the benchmark
+exercises the real threading, timeouts and hedging code paths without any
+network or GPU.
+"""
+from typing import List, Dict, Optional, Union
+import numpy as np
+import asyncio
+import hashlib
+import random
+import re
+import time
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+class LatencyModel:
+    """
+    Latency distribution given as "none", "fixed:<ms>" or "lognormal:<p50_ms>:<p99_ms>".
+    The lognormal is fitted so its median and 99th percentile match.
+    """
+
+    def __init__(self, spec: str = "none", seed: Optional[int] = None):
+        self.spec = spec
+        self._rng = random.Random(seed)
+        parts = spec.split(":")
+        self.kind = parts[0]
+        if self.kind == "fixed":
+            self.value = float(parts[1]) / 1000.0
+        elif self.kind == "lognormal":
+            p50, p99 = float(parts[1]) / 1000.0, float(parts[2]) / 1000.0
+            self.mu = np.log(p50)
+            self.sigma = np.log(max(p99, p50) / p50) / 2.326
+        elif self.kind != "none":
+            raise ValueError(f"Unknown latency spec: {spec}")
+
+    def sample(self) -> float:
+        if self.kind == "fixed":
+            return self.value
+        if self.kind == "lognormal":
+            return self._rng.lognormvariate(self.mu, self.sigma)
+        return 0.0
+
+    def sleep(self):
+        delay = self.sample()
+        if delay:
+            time.sleep(delay)
+
+    async def sleep_async(self):
+        delay = self.sample()
+        if delay:
+            await asyncio.sleep(delay)
+
+
+class FakeEncoder:
+    """
+    Deterministic bag-of-words random projection with the encode() signature
+    of SentenceTransformer. Texts sharing words get similar vectors, so dense
+    scores over a corpus encoded with it behave plausibly.
+    """
+
+    def __init__(self, dimension: int = 768, latency: Optional[LatencyModel] = None):
+        self.dimension = dimension
+        self.latency = latency or LatencyModel()
+        self._word_vectors: Dict[str, np.ndarray] = {}
+
+    def _word_vector(self, word: str) -> np.ndarray:
+        vector = self._word_vectors.get(word)
+        if vector is None:
+            seed = int.from_bytes(hashlib.md5(word.encode()).digest()[:4], "little")
+            vector = np.random.default_rng(seed).standard_normal(self.dimension).astype(np.float32)
+            self._word_vectors[word] = vector
+        return vector
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        convert_to_tensor: bool = False,
+        show_progress_bar: bool = False
+    ) -> np.ndarray:
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        self.latency.sleep()
+
+        embeddings = np.zeros((len(texts), self.dimension), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in _WORD.findall(text.lower()):
+                embeddings[row] += self._word_vector(word)
+            if not embeddings[row].any():
+                embeddings[row] = self._word_vector("<empty>")
+        return embeddings[0] if single else embeddings
+
+
+class FakeIndex:
+    """
+    Wraps an index (normally a LocalIndex over a synthetic corpus) and adds
+    latency to query() and describe_index_stats(), like a remote Pinecone
+    index. list()/fetch() pass straight through for corpus index builds.
+    """
+
+    def __init__(self, inner, query_latency: LatencyModel, stats_latency: Optional[LatencyModel] = None,
+                 namespace_latency: Optional[Dict[str, LatencyModel]] = None):
+        self._inner = inner
+        self.query_latency = query_latency
+        self.stats_latency = stats_latency or LatencyModel()
+        self.namespace_latency = namespace_latency or {}
+        self.query_calls = 0
+
+    def query(self, vector, top_k: int = 10, include_metadata: bool = False, namespace: str = "", **kwargs):
+        self.query_calls += 1
+        self.namespace_latency.get(namespace, self.query_latency).sleep()
+        return self._inner.query(vector=vector, top_k=top_k, include_metadata=include_metadata, namespace=namespace, **kwargs)
+
+    def describe_index_stats(self):
+        self.stats_latency.sleep()
+        return self._inner.describe_index_stats()
+
+    def __getattr__(self, name):
+        return getattr(self._inner, name)
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+        self.candidates = []
+
+    def __iter__(self):
+        # Streaming: a handful of chunks
+        words = self.text.split(" ")
+        step = max(1, len(words) // 5)
+        for start in range(0, len(words), step):
+            yield FakeResponse(" ".join(words[start:start + step]) + " ")
+
+
+class FakeGenerativeModel:
+    """
+    Stand-in for genai.GenerativeModel. Sleeps for the configured latency,
+    raises a retryable error with probability `error_rate`, and returns an
+    answer that cites the first sections in the prompt.
+    """
+
+    def __init__(self, latency: LatencyModel, error_rate: float = 0.0, seed: Optional[int] = None):
+        self.latency = latency
+        self.error_rate = error_rate
+        self._rng = random.Random(seed)
+        self.calls = 0
+
+    def _answer(self, prompt: str) -> str:
+        self.calls += 1
+        if self.error_rate and self._rng.random() < self.error_rate:
+            raise RuntimeError("503 Service Unavailable (simulated)")
+        cited = re.findall(r"\] (.+?) - Section (\S+)", prompt)[:3]
+        citations = "; ".join(f"{act} Section {section}" for act, section in cited) or "the retrieved provisions"
+        return f"Simulated answer based on {citations}. " + "Explanation text. " * 40
+
+    def generate_content(self, prompt, generation_config=None, request_options=None, stream=False, **kwargs):
+        self.latency.sleep()
+        return FakeResponse(self._answer(prompt))
+
+    async def generate_content_async(self, prompt, generation_config=None, request_options=None, **kwargs):
+        await self.latency.sleep_async()
+        return FakeResponse(self._answer(prompt))
@@ -0,0 +1,67 @@
+"""
+Micro-benchmark for MMR re-ranking (services.mmr.mmr_select).
+
+Times one re-rank of a full fan-out's candidates (8 namespaces x top_k * 2 =
+160 by default): similarity matrix plus greedy selection, and the vector
+gather from a SectionIndex-sized matrix. Exits non-zero if the median
+exceeds --budget-ms.
+
+Usage (from backend/):
+    python -m benchmarks.mmr_bench
+    python -m benchmarks.mmr_bench --candidates 320 --top-k 20 --iterations 5000
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from services.mmr import mmr_select
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time MMR re-ranking over a fan-out's worth of candidates")
+    parser.add_argument("--candidates", type=int, default=160)
+    parser.add_argument("--top-k", type=int, default=10)
+    parser.add_argument("--dimension", type=int, default=768)
+    parser.add_argument("--corpus", type=int, default=20000, help="Rows in the matrix candidates are gathered from")
+    parser.add_argument("--lambda", dest="lambda_", type=float, default=0.7)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--budget-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    corpus = rng.standard_normal((args.corpus, args.dimension)).astype(np.float32)
+    corpus /= np.linalg.norm(corpus, axis=1, keepdims=True)
+    sections_per_candidate = max(1, args.candidates // 3)
+
+    timings = {"gather": [], "mmr": [], "total": []}
+    for _ in range(args.iterations):
+        rows = rng.choice(args.corpus, args.candidates, replace=False)
+        scores = np.sort(rng.random(args.candidates).astype(np.float32))[::-1]
+        groups = rng.integers(0, sections_per_candidate, args.candidates)
+
+        started = time.perf_counter()
+        vectors = corpus[rows]
+        gathered = time.perf_counter()
+        mmr_select(vectors, scores, args.top_k, args.lambda_, groups)
+        finished = time.perf_counter()
+
+        timings["gather"].append(gathered - started)
+        timings["mmr"].append(finished - gathered)
+        timings["total"].append(finished - started)
+
+    print(f"MMR over {args.candidates} candidates x {args.dimension} dims, top_k={args.top_k}, {args.iterations} runs")
+    print(f"{'Step':<10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for step, values in timings.items():
+        values = np.asarray(values) * 1000
+        print(f"{step:<10}{np.percentile(values, 50):>10.3f}{np.percentile(values, 95):>10.3f}{np.percentile(values, 99):>10.3f}")
+
+    median = float(np.percentile(timings["total"], 50)) * 1000
+    within_budget = median <= args.budget_ms
+    print(f"\nMedian {median:.3f} ms {'within' if within_budget else 'OVER'} the {args.budget_ms} ms budget")
+    return 0 if within_budget else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,433 @@
+"""
+Offline benchmark / replay harness for the RAG pipeline.
+
+Drives the Flask routes in-process against fake Pinecone, Gemini and (by
+default) embedding backends with configurable latency distributions, and
+reports p50/p95/p99 per pipeline stage, end-to-end latency, QPS and memory.
+
+Usage (from backend/):
+    python -m benchmarks.run                                      # synthetic corpus and traffic
+    python -m benchmarks.run --queries recorded.jsonl --requests 2000 --concurrency 16
+    python -m benchmarks.run --pinecone-latency lognormal:40:250 --gemini-latency lognormal:900:4000
+    python -m benchmarks.run --embedder real --index-dir ./local_index   # real model over an ingested index
+    python -m benchmarks.run --output after.json
+    python -m benchmarks.run --compare before.json after.json --threshold 10
+
+Recorded traffic is a .txt file (one question per line) or .jsonl file whose
+lines are request bodies ({"question": ..., "top_k": ...}). Pipeline knobs
+are read from the environment as usual, e.g. HEDGE_ENABLED=true.
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import sys
+import tempfile
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional
+
+import numpy as np
+
+from benchmarks.fakes import LatencyModel, FakeEncoder, FakeIndex, FakeGenerativeModel
+
+ACTS = {
+    "ipc": ("Indian Penal Code, 1860", "IPC"),
+    "bns": ("Bharatiya Nyaya Sanhita, 2023", "BNS"),
+    "crpc": ("Code of Criminal Procedure, 1973", "CrPC"),
+    "iea": ("Indian Evidence Act, 1872", "IEA"),
+    "constitution": ("Constitution of India", "Constitution"),
+    "hma": ("Hindu Marriage Act, 1955", "HMA"),
+    "cpa": ("Consumer Protection Act, 2019", "CPA"),
+    "ica": ("Indian Contract Act, 1872", "ICA"),
+}
+
+TOPICS = [
+    "murder", "theft", "robbery", "cheating", "criminal breach of trust", "defamation",
+    "kidnapping", "assault", "dowry death", "bail", "arrest without warrant", "anticipatory bail",
+    "confession", "dying declaration", "burden of proof", "right to equality", "freedom of speech",
+    "divorce", "maintenance", "void marriage", "consumer complaint", "unfair trade practice",
+    "breach of contract", "free consent", "consideration", "public servant", "trespass", "forgery",
+]
+
+QUESTION_TEMPLATES = [
+    "What is the punishment for {topic} under {act}?",
+    "Explain section {section} of {act}",
+    "What does the law say about {topic}?",
+    "Is {topic} a cognizable offence?",
+    "{act} section {section}",
+    "How is {topic} defined in the {act_name}?",
+]
+
+FILLER = ("whoever shall be liable with imprisonment fine court person offence provided that "
+          "under this act any such may extend to years described either description").split()
+
+
+# ----------------------------------------------------------------------
+# Synthetic corpus and traffic
+# ----------------------------------------------------------------------
+
+def build_synthetic_index(index_dir: str, encoder: FakeEncoder, sections_per_act: int, chunks_per_section: int, seed: int):
+    """Write a LocalIndex with every act populated by generated sections"""
+    from services.local_index import LocalIndex
+
+    rng = random.Random(seed)
+    index = LocalIndex(index_dir, dimension=encoder.dimension)
+    for namespace, (act_name, act_short_name) in ACTS.items():
+        ids, texts, metadata = [], [], []
+        for number in range(1, sections_per_act + 1):
+            topic = TOPICS[(number + len(namespace)) % len(TOPICS)]
+            for chunk_index in range(chunks_per_section):
+                text = f"{topic.capitalize()}. " + " ".join(rng.choice(FILLER) for _ in range(60)) + f" {topic}."
+                ids.append(f"{namespace}-{number}-{chunk_index}")
+                texts.append(f"{act_short_name} Section {number}: {text}")
+                metadata.append({
+                    "section_number": str(number),
+                    "section_title": topic.capitalize(),
+                    "act_name": act_name,
+                    "act_short_name": act_short_name,
+                    "chunk_index": chunk_index,
+                    "text_preview": text[:200],
+                    "text": text,
+                })
+        vectors = encoder.encode(texts)
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        index.write_namespace(namespace, ids, vectors, metadata)
+
+
+def synthetic_requests(count: int, sections_per_act: int, top_k: Optional[int], seed: int) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    requests = []
+    for _ in range(count):
+        namespace = rng.choice(list(ACTS))
+        act_name, act_short_name = ACTS[namespace]
+        question = rng.choice(QUESTION_TEMPLATES).format(
+            topic=rng.choice(TOPICS),
+            act=act_short_name,
+            act_name=act_name,
+            section=rng.randint(1, sections_per_act)
+        )
+        body = {"question": question}
+        if top_k:
+            body["top_k"] = top_k
+        requests.append(body)
+    return requests
+
+
+def load_requests(path: str, top_k: Optional[int]) -> List[Dict[str, Any]]:
+    """Recorded traffic: one question per line (.txt) or one request body per line (.jsonl)"""
+    requests = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            body = json.loads(line) if path.endswith(".jsonl") else {"question": line}
+            if "query" in body and "question" not in body:
+                body["question"] = body.pop("query")
+            if top_k:
+                body.setdefault("top_k", top_k)
+            requests.append(body)
+    if not requests:
+        raise ValueError(f"No requests in {path}")
+    return requests
+
+
+# ----------------------------------------------------------------------
+# Measurement
+# ----------------------------------------------------------------------
+
+class StageRecorder:
+    """Collects raw stage durations from services.metrics listeners"""
+
+    def __init__(self):
+        self._samples: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, stage: str, seconds: float):
+        with self._lock:
+            self._samples.setdefault(stage, []).append(seconds)
+
+    def reset(self):
+        with self._lock:
+            self._samples = {}
+
+    def snapshot(self) -> Dict[str, List[float]]:
+        with self._lock:
+            return {stage: list(values) for stage, values in self._samples.items()}
+
+
+def summarize(values: List[float]) -> Dict[str, Any]:
+    """count, mean and p50/p95/p99 in milliseconds"""
+    if not values:
+        return {"count": 0}
+    array = np.asarray(values) * 1000
+    return {
+        "count": int(len(array)),
+        "mean_ms": round(float(array.mean()), 2),
+        **{f"p{q}_ms": round(float(np.percentile(array, q)), 2) for q in (50, 95, 99)}
+    }
+
+
+def rss_mb() -> Optional[float]:
+    """Current resident set size (Linux), None elsewhere"""
+    try:
+        with open("/proc/self/statm") as f:
+            return round(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024, 1)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return round(peak / 1024 / (1024 if sys.platform == "darwin" else 1), 1)
+
+
+def drive(client_factory, endpoint: str, requests: List[Dict[str, Any]], concurrency: int):
+    """Send every request with `concurrency` workers; returns (latencies, statuses, wall seconds)"""
+    latencies: List[float] = [0.0] * len(requests)
+    statuses: List[int] = [0] * len(requests)
+    local = threading.local()
+
+    def send(position: int):
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = client_factory()
+        started = time.perf_counter()
+        response = client.post(endpoint, json=requests[position])
+        latencies[position] = time.perf_counter() - started
+        statuses[position] = response.status_code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bench-client") as pool:
+        list(pool.map(send, range(len(requests))))
+    return latencies, statuses, time.perf_counter() - started
+
+
+# ----------------------------------------------------------------------
+# Run
+# ----------------------------------------------------------------------
+
+# Environment settings worth recording with a run
+ENV_KNOBS = {
+    "HYBRID_SEARCH_ENABLED", "FUSION_METHOD", "SECTION_INDEX_ENABLED", "HEDGE_ENABLED", "HEDGE_PERCENTILE",
+    "HEDGE_MIN_DELAY_MS", "NAMESPACE_QUERY_WORKERS", "NAMESPACE_QUERY_TIMEOUT", "EMBEDDING_MICRO_BATCHING",
+    "EMBEDDING_CACHE_MAX_MB", "ANSWER_CACHE_ENABLED", "CONTEXT_TOKEN_BUDGET",
+}
+
+
+def run(args) -> Dict[str, Any]:
+    encoder = FakeEncoder(latency=LatencyModel(args.embed_latency, seed=args.seed))
+    workdir = None
+    if args.index_dir:
+        index_dir = args.index_dir
+    else:
+        if args.embedder == "real":
+            raise SystemExit("--embedder real needs --index-dir (the synthetic corpus is encoded with the fake encoder)")
+        workdir = tempfile.TemporaryDirectory(prefix="legal-mitra-bench-")
+        index_dir = workdir.name
+        build_synthetic_index(index_dir, FakeEncoder(), args.sections, args.chunks, args.seed)
+
+    # Must be in place before config/app are imported
+    os.environ["RETRIEVAL_BACKEND"] = "local"
+    os.environ["LOCAL_INDEX_DIR"] = index_dir
+    os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("ANSWER_CACHE_ENABLED", "false")
+    os.environ.setdefault("EMBEDDING_CACHE_MAX_MB", "0")
+    if args.embedder == "fake":
+        os.environ["EMBEDDING_BACKEND"] = "torch"
+        fake_module = types.ModuleType("sentence_transformers")
+        fake_module.SentenceTransformer = lambda *a, **kw: encoder
+        sys.modules["sentence_transformers"] = fake_module
+
+    from services.metrics import add_stage_listener
+    from services.llm_service import PROMPT_VARIANTS
+    from services.retrieval_service import RetrievalService
+    import app as app_module
+
+    retrieval_service = app_module.retrieval_service
+    llm_service = app_module.llm_service
+
+    # Let the background corpus indexes (section lookup / BM25) finish first
+    corpus_indexes = [index for index in (RetrievalService._section_index, RetrievalService._bm25_index) if index is not None]
+    deadline = time.monotonic() + 120
+    while not all(index.ready for index in corpus_indexes) and time.monotonic() < deadline:
+        time.sleep(0.05)
+
+    namespace_latency = {
+        namespace: LatencyModel(spec, seed=args.seed)
+        for namespace, spec in (item.split("=", 1) for item in args.namespace_latency)
+    }
+    fake_index = FakeIndex(
+        RetrievalService._index,
+        LatencyModel(args.pinecone_latency, seed=args.seed),
+        stats_latency=LatencyModel(args.stats_latency, seed=args.seed),
+        namespace_latency=namespace_latency
+    )
+    RetrievalService._index = fake_index
+    fake_model = FakeGenerativeModel(LatencyModel(args.gemini_latency, seed=args.seed), args.gemini_error_rate, seed=args.seed)
+    llm_service._models = {variant: fake_model for variant in PROMPT_VARIANTS}
+
+    if args.queries:
+        traffic = load_requests(args.queries, args.top_k)
+    else:
+        traffic = synthetic_requests(args.requests + args.warmup, args.sections, args.top_k, args.seed)
+    warmup = [traffic[i % len(traffic)] for i in range(args.warmup)]
+    measured = [traffic[(args.warmup + i) % len(traffic)] for i in range(args.requests)]
+
+    recorder = StageRecorder()
+    add_stage_listener(recorder)
+    client_factory = app_module.app.test_client
+
+    if warmup:
+        drive(client_factory, args.endpoint, warmup, args.concurrency)
+    recorder.reset()
+    fake_index.query_calls = fake_model.calls = 0
+    hedges_before = (retrieval_service.hedges_sent, retrieval_service.hedge_wins)
+    rss_before = rss_mb()
+
+    latencies, statuses, wall = drive(client_factory, args.endpoint, measured, args.concurrency)
+
+    errors = sum(1 for status in statuses if status >= 400)
+    report = {
+        "config": {
+            "endpoint": args.endpoint,
+            "requests": len(measured),
+            "warmup": len(warmup),
+            "concurrency": args.concurrency,
+            "traffic": args.queries or "synthetic",
+            "embedder": args.embedder,
+            "index_dir": args.index_dir or "synthetic",
+            "latency": {
+                "pinecone": args.pinecone_latency,
+                "namespaces": dict(item.split("=", 1) for item in args.namespace_latency),
+                "gemini": args.gemini_latency,
+                "embed": args.embed_latency if args.embedder == "fake" else "real",
+            },
+            "gemini_error_rate": args.gemini_error_rate,
+            "env": {key: value for key, value in sorted(os.environ.items()) if key in ENV_KNOBS},
+        },
+        "wall_seconds": round(wall, 3),
+        "qps": round(len(measured) / wall, 2) if wall else 0.0,
+        "errors": errors,
+        "request": summarize(latencies),
+        "stages": {stage: summarize(values) for stage, values in sorted(recorder.snapshot().items())},
+        # Rolling window of the service's own tracker (includes warmup if the window is large)
+        "namespaces": retrieval_service.latency_stats()["namespaces"],
+        "calls": {
+            "index_queries": fake_index.query_calls,
+            "gemini": fake_model.calls,
+            "hedges_sent": retrieval_service.hedges_sent - hedges_before[0],
+            "hedge_wins": retrieval_service.hedge_wins - hedges_before[1],
+        },
+        "memory": {
+            "rss_before_mb": rss_before,
+            "rss_after_mb": rss_mb(),
+            "peak_rss_mb": peak_rss_mb(),
+        },
+    }
+    if workdir is not None:
+        workdir.cleanup()
+    return report
+
+
+def print_report(report: Dict[str, Any]):
+    config = report["config"]
+    print(f"\n{config['endpoint']}  {config['requests']} requests, concurrency {config['concurrency']}, traffic: {config['traffic']}")
+    print(f"QPS {report['qps']}  errors {report['errors']}  wall {report['wall_seconds']}s  "
+          f"peak RSS {report['memory']['peak_rss_mb']} MB")
+    print(f"\n{'Stage':<22}{'Count':>8}{'Mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    rows = [("request", report["request"])] + list(report["stages"].items())
+    for name, stats in rows:
+        if stats.get("count"):
+            print(f"{name:<22}{stats['count']:>8}{stats['mean_ms']:>10}{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}")
+    if report["namespaces"]:
+        print(f"\n{'Namespace':<22}{'Samples':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+        for namespace, stats in sorted(report["namespaces"].items()):
+            print(f"{namespace:<22}{stats['samples']:>8}{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}")
+
+
+# ----------------------------------------------------------------------
+# Compare
+# ----------------------------------------------------------------------
+
+def compare(base: Dict[str, Any], new: Dict[str, Any], threshold: float) -> bool:
+    """Print per-stage deltas; True if any p95/p99 regressed by more than `threshold` percent"""
+    def delta(before, after):
+        if not before:
+            return "n/a", 0.0
+        change = (after - before) / before * 100
+        return f"{change:+.1f}%", change
+
+    regressed = False
+    print(f"\n{'Stage':<22}{'Metric':>8}{'Base':>10}{'New':>10}{'Delta':>10}")
+    qps_label, _ = delta(base["qps"], new["qps"])
+    print(f"{'throughput':<22}{'qps':>8}{base['qps']:>10}{new['qps']:>10}{qps_label:>10}")
+
+    rows = [("request", base["request"], new["request"])]
+    for stage in sorted(set(base["stages"]) | set(new["stages"])):
+        rows.append((stage, base["stages"].get(stage, {}), new["stages"].get(stage, {})))
+    for name, before, after in rows:
+        if not before.get("count") or not after.get("count"):
+            print(f"{name:<22}{'count':>8}{before.get('count', 0):>10}{after.get('count', 0):>10}{'':>10}")
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            label, change = delta(before[metric], after[metric])
+            flag = ""
+            if metric != "p50_ms" and change > threshold:
+                regressed = True
+                flag = "  REGRESSION"
+            print(f"{name:<22}{metric[:3]:>8}{before[metric]:>10}{after[metric]:>10}{label:>10}{flag}")
+
+    peak_label, _ = delta(base["memory"]["peak_rss_mb"], new["memory"]["peak_rss_mb"])
+    print(f"{'memory':<22}{'peak MB':>8}{base['memory']['peak_rss_mb']:>10}{new['memory']['peak_rss_mb']:>10}{peak_label:>10}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the RAG pipeline against fake Pinecone/Gemini backends")
+    parser.add_argument("--endpoint", default="/api/query", choices=["/api/query", "/api/retrieve"])
+    parser.add_argument("--queries", help="Recorded traffic (.txt or .jsonl); synthetic questions if omitted")
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests")
+    parser.add_argument("--warmup", type=int, default=20, help="Requests sent before measuring")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--top-k", type=int, help="top_k sent with every request (default: server default)")
+    parser.add_argument("--embedder", choices=["fake", "real"], default="fake",
+                        help="fake: bag-of-words encoder; real: the configured embedding model")
+    parser.add_argument("--index-dir", help="Existing local index (e.g. from ingest.py --backend local) instead of a synthetic corpus")
+    parser.add_argument("--sections", type=int, default=200, help="Synthetic sections per act")
+    parser.add_argument("--chunks", type=int, default=2, help="Synthetic chunks per section")
+    parser.add_argument("--pinecone-latency", default="lognormal:30:120", help="none | fixed:MS | lognormal:P50_MS:P99_MS")
+    parser.add_argument("--namespace-latency", nargs="*", default=[], metavar="NS=SPEC",
+                        help="Per-namespace override, e.g. constitution=lognormal:60:600")
+    parser.add_argument("--stats-latency", default="fixed:50", help="describe_index_stats latency")
+    parser.add_argument("--gemini-latency", default="lognormal:800:3000")
+    parser.add_argument("--gemini-error-rate", type=float, default=0.0, help="Fraction of Gemini calls that fail")
+    parser.add_argument("--embed-latency", default="none", help="Extra latency per fake encode() call")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Write the report as JSON to this path")
+    parser.add_argument("--compare", nargs=2, metavar=("BASE", "NEW"), help="Compare two saved reports and exit")
+    parser.add_argument("--threshold", type=float, default=10.0, help="p95/p99 regression (%%) that fails --compare")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0], encoding="utf-8") as f:
+            base = json.load(f)
+        with open(args.compare[1], encoding="utf-8") as f:
+            new = json.load(f)
+        sys.exit(1 if compare(base, new, args.threshold) else 0)
+
+    report = run(args)
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,17 @@ class Config:
     SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
     DEBUG = os.getenv("DEBUG", "False").lower() == "true"
     
+    # Logging
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")  # DEBUG enables per-match retrieval tracing
+    LOG_FORMAT = os.getenv("LOG_FORMAT", "text")  # "text" or "json"
+    LOG_DEBUG_SAMPLE_RATE = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1.0"))  # share of requests that emit DEBUG lines
+    
+    # Vector store: "pinecone" or "local" (embedded memory-mapped index)
+    RETRIEVAL_BACKEND = os.getenv("RETRIEVAL_BACKEND", "pinecone").lower()
+    LOCAL_INDEX_DIR = os.getenv("LOCAL_INDEX_DIR", os.path.join(os.path.dirname(__file__), "data", "index"))
+    LOCAL_INDEX_IVF_MIN_VECTORS = int(os.getenv("LOCAL_INDEX_IVF_MIN_VECTORS", "2000"))  # 0 = exact search only
+    LOCAL_INDEX_NPROBE = int(os.getenv("LOCAL_INDEX_NPROBE", "8"))
+    
     # Pinecone
     PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
     INDEX_NAME = os.getenv("INDEX_NAME")
@@ -17,32 +28,114 @@ class Config:
     # Gemini
     GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
     GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-1.5-flash")  # Default fallback
+    GEMINI_TRANSPORT = os.getenv("GEMINI_TRANSPORT", "grpc")  # "grpc" or "rest"
     
     # Embedding
     EMBEDDING_MODEL = "all-mpnet-base-v2"
     EMBEDDING_DIM = 768
+    EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "torch").lower()  # "torch" or "onnx"
+    ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", os.path.join(os.path.dirname(__file__), "data", "onnx", "all-mpnet-base-v2"))
+    ONNX_QUANTIZED = os.getenv("ONNX_QUANTIZED", "False").lower() == "true"  # use int8 model
+    ONNX_MAX_SEQ_LENGTH = 384
+    ONNX_THREADS = int(os.getenv("ONNX_THREADS", "0"))  # 0 = onnxruntime default
+    EMBEDDING_CACHE_MAX_MB = float(os.getenv("EMBEDDING_CACHE_MAX_MB", "64"))  # 0 disables
+    EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH")  # e.g. data/embedding_cache.npz
+    EMBEDDING_MICRO_BATCHING = os.getenv("EMBEDDING_MICRO_BATCHING", "True").lower() == "true"
+    EMBEDDING_BATCH_MAX_SIZE = int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "32"))
+    EMBEDDING_BATCH_MAX_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "3"))
+    EMBEDDING_BATCH_TIMEOUT = float(os.getenv("EMBEDDING_BATCH_TIMEOUT", "30"))  # seconds a sync caller waits for its batch
     
     # Retrieval
     TOP_K = 10
     SCORE_THRESHOLD = 0.3
     MIN_RESULTS = 3
+    NAMESPACE_QUERY_WORKERS = int(os.getenv("NAMESPACE_QUERY_WORKERS", "32"))  # headroom: a slow query holds its thread until its own timeout
+    NAMESPACE_QUERY_TIMEOUT = float(os.getenv("NAMESPACE_QUERY_TIMEOUT", "5.0"))  # seconds
+    SECTION_INDEX_ENABLED = os.getenv("SECTION_INDEX_ENABLED", "True").lower() == "true"
+    DENSE_OVERFETCH = 2  # dense matches fetched per namespace = top_k * this
+    NAMESPACE_DETECTION_ENABLED = os.getenv("NAMESPACE_DETECTION_ENABLED", "True").lower() == "true"  # search only acts named in the query
+    # Old <-> new section numbers (IPC <-> BNS, CrPC <-> BNSS); used through the section index, "" disables
+    CONCORDANCE_PATH = os.getenv("CONCORDANCE_PATH", os.path.join(os.path.dirname(__file__), "data", "concordance.json"))
+    DIVERSIFY_RESULTS = os.getenv("DIVERSIFY_RESULTS", "True").lower() == "true"  # MMR re-ranking for general queries
+    MMR_LAMBDA = float(os.getenv("MMR_LAMBDA", "0.7"))  # 1.0 = pure relevance, lower = more diverse
+    
+    # Hedged namespace queries
+    HEDGE_ENABLED = os.getenv("HEDGE_ENABLED", "False").lower() == "true"
+    HEDGE_PERCENTILE = float(os.getenv("HEDGE_PERCENTILE", "95"))  # send a duplicate after this latency percentile
+    HEDGE_MIN_SAMPLES = 20  # latencies seen before hedging starts
+    HEDGE_MIN_DELAY_MS = float(os.getenv("HEDGE_MIN_DELAY_MS", "20"))
+    LATENCY_WINDOW = 512  # recent samples kept per namespace
+    
+    # Hybrid (BM25 + dense) retrieval
+    HYBRID_SEARCH_ENABLED = os.getenv("HYBRID_SEARCH_ENABLED", "True").lower() == "true"
+    HYBRID_DENSE_OVERFETCH = 1
+    FUSION_METHOD = os.getenv("FUSION_METHOD", "rrf")  # "rrf" or "weighted"
+    FUSION_DENSE_WEIGHT = float(os.getenv("FUSION_DENSE_WEIGHT", "0.6"))
+    FUSION_BM25_WEIGHT = float(os.getenv("FUSION_BM25_WEIGHT", "0.4"))
+    FUSION_RRF_K = 60
+    BM25_K1 = 1.2
+    BM25_B = 0.75
+    
+    # Cross-encoder re-ranking of general-query results
+    RERANK_ENABLED = os.getenv("RERANK_ENABLED", "False").lower() == "true"
+    RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+    RERANK_TOP_N = int(os.getenv("RERANK_TOP_N", "30"))  # candidates re-scored per request
+    RERANK_BATCH_SIZE = int(os.getenv("RERANK_BATCH_SIZE", "8"))
+    RERANK_BUDGET_MS = float(os.getenv("RERANK_BUDGET_MS", "150"))  # no new batches once this is spent
+    RERANK_CACHE_SIZE = 10000  # (question, chunk) scores kept
+    RERANK_MAX_LENGTH = 256  # tokens per pair
+    
+    # Batch endpoints
+    BATCH_MAX_QUESTIONS = int(os.getenv("BATCH_MAX_QUESTIONS", "256"))
+    BATCH_QUERY_CHUNK_SIZE = int(os.getenv("BATCH_QUERY_CHUNK_SIZE", "16"))  # vectors per namespace request
+    BATCH_RETRIEVE_TIMEOUT = float(os.getenv("BATCH_RETRIEVE_TIMEOUT", "120"))  # seconds
+    BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", "4"))
+    
+    # Index stats cache
+    INDEX_STATS_TTL = float(os.getenv("INDEX_STATS_TTL", "60"))  # seconds
+    INDEX_STATS_MAX_STALE = float(os.getenv("INDEX_STATS_MAX_STALE", "600"))  # serve stale while refreshing
     
     # LLM
     MAX_TOKENS = 3072
     TEMPERATURE = 0.2
+    LLM_REQUEST_DEADLINE = float(os.getenv("LLM_REQUEST_DEADLINE", "30"))  # seconds, across all retries
+    LLM_BACKOFF_CAP = float(os.getenv("LLM_BACKOFF_CAP", "8"))  # max seconds between retries
+    LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))  # consecutive failures to open
+    LLM_BREAKER_RECOVERY = float(os.getenv("LLM_BREAKER_RECOVERY", "30"))  # seconds before a probe
+    
+    # Semantic answer cache
+    ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "True").lower() == "true"
+    ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "2048"))
+    ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))  # cosine similarity
+    ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "86400"))  # seconds
     
     # Context
-    MAX_CONTEXT_LENGTH = 8000
+    CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "2000"))  # tokens of retrieved provisions per prompt
+    CONTEXT_TOKENIZER = "sentence-transformers/all-mpnet-base-v2"  # read from the local Hugging Face cache only
+    CONTEXT_TOKENIZER_PATH = os.getenv("CONTEXT_TOKENIZER_PATH", os.path.join(ONNX_MODEL_DIR, "tokenizer.json"))
     TEXT_PREVIEW_LENGTH = 600
     
+    # Ingestion
+    DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+    INGEST_CHUNK_SIZE = 1000  # characters
+    INGEST_CHUNK_OVERLAP = 150
+    INGEST_EMBED_BATCH = 256
+    INGEST_UPSERT_BATCH = 100
+    INGEST_MANIFEST_DIR = os.getenv("INGEST_MANIFEST_DIR", DATA_DIR)
+    
     @classmethod
     def validate(cls):
-        if not cls.PINECONE_API_KEY:
+        if cls.EMBEDDING_BACKEND not in ("torch", "onnx"):
+            raise ValueError(f"Unknown EMBEDDING_BACKEND: {cls.EMBEDDING_BACKEND}")
+        if cls.RETRIEVAL_BACKEND not in ("pinecone", "local"):
+            raise ValueError(f"Unknown RETRIEVAL_BACKEND: {cls.RETRIEVAL_BACKEND}")
+        if cls.RETRIEVAL_BACKEND == "pinecone" and not cls.PINECONE_API_KEY:
             raise ValueError("PINECONE_API_KEY not found in environment")
         if not cls.GEMINI_API_KEY:
             raise ValueError("GEMINI_API_KEY not found in environment")
         
         print(f"✓ Config validated")
         print(f"  - Gemini Model: {cls.GEMINI_MODEL}")
-        print(f"  - Index: {cls.INDEX_NAME}")
+        print(f"  - Backend: {cls.RETRIEVAL_BACKEND}")
+        print(f"  - Index: {cls.INDEX_NAME if cls.RETRIEVAL_BACKEND == 'pinecone' else cls.LOCAL_INDEX_DIR}")
         print(f"  - Score Threshold: {cls.SCORE_THRESHOLD}")
\ No newline at end of file
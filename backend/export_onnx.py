@@ -0,0 +1,123 @@
+"""
+Export the embedding model to ONNX for the onnx embedding backend.
+
+Usage:
+    python export_onnx.py                 # export fp32 model.onnx
+    python export_onnx.py --int8          # also write an int8-quantized model.int8.onnx
+    python export_onnx.py --compare-only  # re-run parity and timing checks on an existing export
+
+After exporting, set EMBEDDING_BACKEND=onnx (and ONNX_QUANTIZED=true for int8).
+"""
+import argparse
+import os
+import time
+import numpy as np
+from config import Config
+
+SAMPLE_QUERIES = [
+    "what is section 302 ipc",
+    "punishment for murder under BNS",
+    "can police arrest without warrant for a cognizable offence",
+    "anticipatory bail procedure under crpc section 438",
+    "dowry death",
+    "right to life and personal liberty article 21",
+    "grounds for divorce under hindu marriage act",
+    "consumer complaint against defective product",
+    "is an agreement without consideration void",
+    "admissibility of electronic records as evidence",
+]
+
+
+def export(model_dir: str, int8: bool):
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    print(f"Loading {Config.EMBEDDING_MODEL}...")
+    st = SentenceTransformer(Config.EMBEDDING_MODEL, device="cpu")
+    transformer = st[0].auto_model.eval()
+    tokenizer = st.tokenizer
+
+    os.makedirs(model_dir, exist_ok=True)
+    onnx_path = os.path.join(model_dir, "model.onnx")
+
+    dummy = tokenizer(["export sample"], return_tensors="pt")
+    with torch.no_grad():
+        torch.onnx.export(
+            transformer,
+            (dummy["input_ids"], dummy["attention_mask"]),
+            onnx_path,
+            input_names=["input_ids", "attention_mask"],
+            output_names=["last_hidden_state"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "last_hidden_state": {0: "batch", 1: "sequence"},
+            },
+            opset_version=14,
+        )
+    tokenizer.save_pretrained(model_dir)
+    print(f"✓ Exported {onnx_path}")
+
+    if int8:
+        from onnxruntime.quantization import quantize_dynamic, QuantType
+        int8_path = os.path.join(model_dir, "model.int8.onnx")
+        quantize_dynamic(onnx_path, int8_path, weight_type=QuantType.QInt8)
+        print(f"✓ Quantized {int8_path}")
+
+
+def _normalize(embeddings: np.ndarray) -> np.ndarray:
+    return embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+
+
+def _latency_ms(encode, queries, repeats: int = 5) -> float:
+    timings = []
+    for _ in range(repeats):
+        for query in queries:
+            started = time.perf_counter()
+            encode(query)
+            timings.append((time.perf_counter() - started) * 1000)
+    return float(np.median(timings))
+
+
+def compare(model_dir: str):
+    """Parity against the PyTorch vectors plus startup and latency comparison"""
+    from services.onnx_encoder import OnnxEncoder
+
+    started = time.perf_counter()
+    from sentence_transformers import SentenceTransformer
+    torch_model = SentenceTransformer(Config.EMBEDDING_MODEL, device="cpu")
+    torch_startup = time.perf_counter() - started
+    reference = _normalize(torch_model.encode(SAMPLE_QUERIES, convert_to_tensor=False))
+
+    print(f"\n{'Backend':<12}{'Startup s':>11}{'p50 ms':>9}{'Min cos':>10}{'Mean cos':>10}")
+    print(f"{'torch':<12}{torch_startup:>11.2f}{_latency_ms(torch_model.encode, SAMPLE_QUERIES):>9.1f}{1.0:>10.4f}{1.0:>10.4f}")
+
+    for label, model_file in (("onnx", "model.onnx"), ("onnx-int8", "model.int8.onnx")):
+        if not os.path.exists(os.path.join(model_dir, model_file)):
+            continue
+        started = time.perf_counter()
+        encoder = OnnxEncoder(model_dir, model_file, max_seq_length=Config.ONNX_MAX_SEQ_LENGTH)
+        startup = time.perf_counter() - started
+
+        vectors = _normalize(encoder.encode(SAMPLE_QUERIES))
+        cosines = np.sum(vectors * reference, axis=1)
+        print(f"{label:<12}{startup:>11.2f}{_latency_ms(encoder.encode, SAMPLE_QUERIES):>9.1f}"
+              f"{cosines.min():>10.4f}{cosines.mean():>10.4f}")
+
+    print("\nStartup for onnx excludes the torch import, which onnx workers never pay.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the embedding model to ONNX")
+    parser.add_argument("--model-dir", default=Config.ONNX_MODEL_DIR)
+    parser.add_argument("--int8", action="store_true", help="Also write an int8 dynamically quantized model")
+    parser.add_argument("--compare-only", action="store_true", help="Skip export; only run parity/timing checks")
+    args = parser.parse_args()
+
+    if not args.compare_only:
+        export(args.model_dir, args.int8)
+    compare(args.model_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+Build the retrieval corpus from the PDFs in backend/data.
+
+Usage:
+    python ingest.py                          # all acts into the configured backend (incremental)
+    python ingest.py --full                   # rebuild every namespace from scratch
+    python ingest.py --acts ipc bns           # selected acts only
+    python ingest.py --backend local          # write to the embedded local index
+    python ingest.py --workers 4 --report ingest_report.json
+"""
+import argparse
+import json
+from dotenv import load_dotenv
+from config import Config
+from services.ingestion_service import IngestionService, LEGAL_ACTS, open_index
+from services.log import configure_logging
+
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ingest legal act PDFs into the vector index")
+    parser.add_argument("--acts", nargs="+", choices=list(LEGAL_ACTS.keys()), help="Namespaces to ingest (default: all)")
+    parser.add_argument("--backend", choices=["pinecone", "local"], default=Config.RETRIEVAL_BACKEND)
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: CPU count)")
+    parser.add_argument("--full", action="store_true", help="Ignore the manifest and rebuild each namespace")
+    parser.add_argument("--report", help="Write per-act timings as JSON to this path")
+    args = parser.parse_args()
+    configure_logging(Config.LOG_LEVEL, Config.LOG_FORMAT)
+
+    from services.embedding_service import EmbeddingService
+
+    index = open_index(args.backend)
+    service = IngestionService(index, EmbeddingService(), backend=args.backend)
+    report = service.run(namespaces=args.acts, workers=args.workers, full=args.full)
+
+    print(f"\n{'Act':<14}{'Status':>10}{'Sections':>10}{'Changed':>9}{'Removed':>9}{'Embedded':>10}{'Parse s':>9}{'Embed s':>9}{'Write s':>9}")
+    for namespace, stats in report.items():
+        print(f"{namespace:<14}{stats['status']:>10}{stats['sections']:>10}{stats.get('changed_sections', 0):>9}"
+              f"{stats.get('removed_sections', 0):>9}{stats.get('embedded_chunks', 0):>10}"
+              f"{stats.get('parse_seconds', 0):>9}{stats.get('embed_seconds', 0):>9}{stats.get('write_seconds', 0):>9}")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+from typing import List, Dict, Any, Optional, FrozenSet, Tuple
+from services.metrics import CACHE_LOOKUPS
+import numpy as np
+import threading
+import time
+
+class SemanticAnswerCache:
+    """
+    Cache of generated answers keyed by query embedding.
+
+    Embeddings live in a fixed-size (capacity x dim) matrix, so a lookup is one
+    vectorized cosine-similarity pass. A hit needs similarity >= threshold AND
+    the same retrieved section set, so a reworded question is only answered
+    from cache when it would have been given the same legal provisions.
+    Entries expire after `ttl` seconds; when full, the least recently used
+    slot is replaced.
+    """
+
+    def __init__(self, capacity: int, dim: int, threshold: float, ttl: float):
+        self.capacity = capacity
+        self.threshold = threshold
+        self.ttl = ttl
+        self._matrix = np.zeros((capacity, dim), dtype=np.float32)
+        self._created = np.zeros(capacity, dtype=np.float64)
+        self._last_used = np.zeros(capacity, dtype=np.float64)
+        self._valid = np.zeros(capacity, dtype=bool)
+        self._payloads: List[Optional[Tuple[FrozenSet, Dict[str, Any]]]] = [None] * capacity
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def section_key(documents: List[Dict[str, Any]]) -> FrozenSet[Tuple[str, str]]:
+        """Identity of a retrieved document set: its (namespace, section_number) pairs"""
+        return frozenset(
+            (doc.get('namespace', ''), str(doc.get('metadata', {}).get('section_number', '')))
+            for doc in documents
+        )
+
+    def get(self, embedding: List[float], section_key: FrozenSet) -> Optional[Dict[str, Any]]:
+        """Return the cached payload (plus "similarity") for a matching question, if any"""
+        query = np.asarray(embedding, dtype=np.float32)
+        now = time.time()
+
+        with self._lock:
+            live = self._valid & (now - self._created < self.ttl)
+            if not live.any():
+                self.misses += 1
+                CACHE_LOOKUPS.labels("answer", "miss").inc()
+                return None
+
+            similarities = self._matrix @ query
+            similarities[~live] = -1.0
+
+            # Most similar first, among everything above the threshold
+            candidates = np.flatnonzero(similarities >= self.threshold)
+            for slot in candidates[np.argsort(-similarities[candidates])]:
+                key, payload = self._payloads[slot]
+                if key == section_key:
+                    self._last_used[slot] = now
+                    self.hits += 1
+                    CACHE_LOOKUPS.labels("answer", "hit").inc()
+                    return {**payload, "similarity": float(similarities[slot])}
+
+            self.misses += 1
+            CACHE_LOOKUPS.labels("answer", "miss").inc()
+            return None
+
+    def put(self, embedding: List[float], section_key: FrozenSet, payload: Dict[str, Any]):
+        now = time.time()
+        with self._lock:
+            free = np.flatnonzero(~self._valid | (now - self._created >= self.ttl))
+            slot = int(free[0]) if len(free) else int(np.argmin(self._last_used))
+
+            self._matrix[slot] = np.asarray(embedding, dtype=np.float32)
+            self._created[slot] = now
+            self._last_used[slot] = now
+            self._valid[slot] = True
+            self._payloads[slot] = (section_key, payload)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": int(self._valid.sum()),
+                "capacity": self.capacity,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
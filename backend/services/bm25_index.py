@@ -0,0 +1,133 @@
+from typing import List, Dict, Any, Iterable, Tuple
+from services.log import get_logger
+import numpy as np
+import threading
+import re
+
+logger = get_logger("bm25")
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset("""
+a an and are as at be by for from has have he her his if in into is it its may of on or
+shall she such that the their them then there these they this to under was were which who
+whom will with any all been being other than what when where whether not no so
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens plus adjacent-word bigrams ("anticipatory_bail")"""
+    words = [w for w in _TOKEN.findall(text.lower()) if w not in _STOPWORDS]
+    return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+
+class BM25Index:
+    """
+    Okapi BM25 over section chunk texts with compact CSR postings:
+    per term, a slice of an int32 doc-id array and a uint16 term-frequency array.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._vocab: Dict[str, int] = {}
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._doc_ids = np.zeros(0, dtype=np.int32)
+        self._tfs = np.zeros(0, dtype=np.uint16)
+        self._idf = np.zeros(0, dtype=np.float32)
+        self._doc_norm = np.zeros(0, dtype=np.float32)
+        self._doc_namespace = np.zeros(0, dtype=np.int16)
+        self._namespaces: List[str] = []
+        self._docs: List[Tuple[str, str, Dict[str, Any]]] = []  # (id, namespace, metadata)
+        self._ready = threading.Event()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def build(self, chunks: Iterable[Tuple[str, str, Dict[str, Any]]]):
+        """Index (namespace, id, metadata) chunks; text comes from metadata"""
+        docs = []
+        postings: Dict[str, Dict[int, int]] = {}
+        lengths = []
+
+        for namespace, vec_id, metadata in chunks:
+            text = metadata.get('text') or metadata.get('text_preview', '')
+            title = metadata.get('section_title', '')
+            tokens = tokenize(f"{title} {text}")
+
+            doc_id = len(docs)
+            docs.append((vec_id, namespace, metadata))
+            lengths.append(len(tokens))
+            for token in tokens:
+                term_postings = postings.setdefault(token, {})
+                term_postings[doc_id] = term_postings.get(doc_id, 0) + 1
+
+        n_docs = len(docs)
+        vocab = {}
+        offsets = [0]
+        doc_ids = []
+        tfs = []
+        for term_id, (term, term_postings) in enumerate(postings.items()):
+            vocab[term] = term_id
+            doc_ids.extend(term_postings.keys())
+            tfs.extend(min(tf, 65535) for tf in term_postings.values())
+            offsets.append(len(doc_ids))
+
+        offsets = np.asarray(offsets, dtype=np.int64)
+        df = np.diff(offsets).astype(np.float32)
+        lengths = np.asarray(lengths, dtype=np.float32)
+        avg_length = float(lengths.mean()) if n_docs else 0.0
+
+        namespaces = sorted({namespace for _, namespace, _ in docs})
+        namespace_ids = {namespace: i for i, namespace in enumerate(namespaces)}
+
+        self._vocab = vocab
+        self._offsets = offsets
+        self._doc_ids = np.asarray(doc_ids, dtype=np.int32)
+        self._tfs = np.asarray(tfs, dtype=np.uint16)
+        self._idf = np.log(1.0 + (n_docs - df + 0.5) / (df + 0.5)).astype(np.float32)
+        self._doc_norm = (self.k1 * (1 - self.b + self.b * lengths / (avg_length or 1.0))).astype(np.float32)
+        self._doc_namespace = np.asarray([namespace_ids[ns] for _, ns, _ in docs], dtype=np.int16)
+        self._namespaces = namespaces
+        self._docs = docs
+        self._ready.set()
+        logger.info("BM25 index built: %d chunks, %d terms", n_docs, len(vocab))
+
+    def search(self, query: str, namespaces: List[str], top_k: int) -> List[Dict[str, Any]]:
+        """Top-k chunks by BM25 score within the given namespaces"""
+        if not self.ready or not self._docs:
+            return []
+
+        term_ids = {self._vocab[t] for t in tokenize(query) if t in self._vocab}
+        if not term_ids:
+            return []
+
+        scores = np.zeros(len(self._docs), dtype=np.float32)
+        for term_id in term_ids:
+            start, end = self._offsets[term_id], self._offsets[term_id + 1]
+            docs = self._doc_ids[start:end]
+            tf = self._tfs[start:end].astype(np.float32)
+            scores[docs] += self._idf[term_id] * tf * (self.k1 + 1) / (tf + self._doc_norm[docs])
+
+        wanted = set(namespaces)
+        allowed = [i for i, ns in enumerate(self._namespaces) if ns in wanted]
+        scores[~np.isin(self._doc_namespace, allowed)] = 0.0
+
+        candidates = np.flatnonzero(scores > 0)
+        if len(candidates) == 0:
+            return []
+        k = min(top_k, len(candidates))
+        top = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        top = top[np.argsort(-scores[top])]
+
+        results = []
+        for doc in top:
+            vec_id, namespace, metadata = self._docs[doc]
+            results.append({
+                "id": vec_id,
+                "score": float(scores[doc]),
+                "namespace": namespace,
+                "metadata": dict(metadata),
+                "is_target_section": False
+            })
+        return results
@@ -0,0 +1,103 @@
+from typing import Dict, Any
+from services.log import get_logger
+import threading
+import random
+import time
+
+logger = get_logger("circuit_breaker")
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Full-jitter exponential backoff: uniform in [0, min(cap, base * 2^attempt)]"""
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    Shared failure gate for an upstream service.
+
+    closed    -> calls flow; `failure_threshold` consecutive failures open it
+    open      -> calls are rejected until `recovery_timeout` seconds pass
+    half_open -> one probe call is let through; success closes the breaker,
+                 failure re-opens it for another `recovery_timeout`
+
+    A probe that ends without an outcome (cancelled) must be given back with
+    release(); one that is never given back expires after `probe_timeout`.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, recovery_timeout: float = 30.0, probe_timeout: float = 60.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.probe_timeout = probe_timeout
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started = 0.0
+        self._lock = threading.Lock()
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._opened_at >= self.recovery_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if time.monotonic() - self._opened_at < self.recovery_timeout:
+                    self.rejected += 1
+                    return False
+                self._state = HALF_OPEN
+                self._probe_in_flight = False
+            # Half-open: a single probe at a time, leased for probe_timeout
+            now = time.monotonic()
+            if self._probe_in_flight and now - self._probe_started < self.probe_timeout:
+                self.rejected += 1
+                return False
+            if self._probe_in_flight:
+                logger.warning("Circuit '%s' probe expired after %ss, allowing another", self.name, self.probe_timeout)
+            self._probe_in_flight = True
+            self._probe_started = now
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info("Circuit '%s' closed", self.name)
+            self._state = CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def release(self):
+        """Give back a half-open probe whose call ended without a result"""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    logger.warning("Circuit '%s' open for %ss after %d failures", self.name, self.recovery_timeout, self._failures)
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def stats(self) -> Dict[str, Any]:
+        state = self.state
+        with self._lock:
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "rejected": self.rejected,
+            }
@@ -0,0 +1,45 @@
+from typing import List, Dict, Tuple
+from services.log import get_logger
+import json
+
+logger = get_logger("concordance")
+
+class SectionConcordance:
+    """
+    Section numbering between an act and its replacement (IPC <-> BNS,
+    CrPC <-> BNSS), so "IPC 302" also finds BNS 103 and vice versa.
+
+    Loaded from a JSON file of tables named "<old namespace>-><new namespace>",
+    each mapping an old section number to one new section number or a list of
+    them. Both directions are indexed up front; a lookup is one dict access.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._equivalents: Dict[Tuple[str, str], List[Tuple[str, str]]] = {}
+        with open(path, encoding="utf-8") as f:
+            tables = json.load(f)
+
+        for name, table in tables.items():
+            old_namespace, new_namespace = name.split("->")
+            for old_section, new_sections in table.items():
+                if isinstance(new_sections, str):
+                    new_sections = [new_sections]
+                old_key = (old_namespace, old_section.upper())
+                for new_section in new_sections:
+                    new_key = (new_namespace, new_section.upper())
+                    self._add(old_key, new_key)
+                    self._add(new_key, old_key)
+        logger.info("Loaded section concordance: %d sections (%s)", len(self._equivalents), ", ".join(tables))
+
+    def _add(self, key: Tuple[str, str], equivalent: Tuple[str, str]):
+        equivalents = self._equivalents.setdefault(key, [])
+        if equivalent not in equivalents:
+            equivalents.append(equivalent)
+
+    def equivalents(self, namespace: str, section_number: str) -> List[Tuple[str, str]]:
+        """(namespace, section_number) pairs for the same provision in the paired act"""
+        return self._equivalents.get((namespace, section_number.upper()), [])
+
+    def __len__(self) -> int:
+        return len(self._equivalents)
@@ -0,0 +1,168 @@
+from typing import List, Dict, Any, Optional, Tuple
+from services.log import get_logger
+import os
+
+logger = get_logger("context")
+
+_CHARS_PER_TOKEN = 4  # only used when no tokenizer is available
+
+
+class TokenCounter:
+    """
+    Subword token counts for prompt budgeting.
+
+    Uses a local Hugging Face tokenizer (tokenizer.json) so counting costs
+    microseconds instead of a Gemini count_tokens round trip: the ONNX
+    export's copy, else the one sentence-transformers already downloaded for
+    `cached_model`. Never touches the network; falls back to a
+    characters-per-token estimate if neither file exists.
+    """
+
+    def __init__(self, tokenizer_path: Optional[str] = None, cached_model: Optional[str] = None):
+        self._tokenizer = None
+        try:
+            from tokenizers import Tokenizer
+            if not (tokenizer_path and os.path.exists(tokenizer_path)) and cached_model:
+                from huggingface_hub import try_to_load_from_cache
+                cached = try_to_load_from_cache(cached_model, "tokenizer.json")
+                tokenizer_path = cached if isinstance(cached, str) else None
+            if tokenizer_path and os.path.exists(tokenizer_path):
+                self._tokenizer = Tokenizer.from_file(tokenizer_path)
+            else:
+                logger.info("No local tokenizer.json, estimating tokens from length")
+        except Exception as e:
+            logger.warning("Tokenizer unavailable, estimating tokens from length: %s", e)
+
+        if self._tokenizer is not None:
+            self._tokenizer.no_truncation()
+            self._tokenizer.no_padding()
+
+    def count(self, text: str) -> int:
+        return self.count_batch([text])[0]
+
+    def count_batch(self, texts: List[str]) -> List[int]:
+        if self._tokenizer is None:
+            return [max(1, len(text) // _CHARS_PER_TOKEN) for text in texts]
+        return [len(encoding.ids) for encoding in self._tokenizer.encode_batch(texts, add_special_tokens=False)]
+
+
+def _merge_overlap(left: str, right: str, max_overlap: int) -> str:
+    """Join consecutive chunks, dropping the text they share at the seam"""
+    for size in range(min(len(left), len(right), max_overlap), 20, -1):
+        if left.endswith(right[:size]):
+            return left + right[size:]
+    return f"{left} {right}"
+
+
+class ContextBuilder:
+    """
+    Assembles the "Retrieved Legal Provisions" block for the prompt.
+
+    1. Chunks of the same (act, section) are merged into one entry:
+       duplicates are dropped and consecutive chunks are stitched together
+       without their overlap.
+    2. Entries are packed into a token budget greedily by score per token,
+       skipping entries that do not fit instead of stopping at the first one.
+       The most relevant entry is always kept (truncated if needed).
+    3. Selected entries are listed by relevance.
+
+    When the results were re-ranked ("rerank_position" on every chunk),
+    relevance is the re-ranked order (1 / (position + 1)) instead of the
+    retrieval score.
+    """
+
+    def __init__(self, token_budget: int, counter: TokenCounter, max_overlap: int = 300):
+        self.token_budget = token_budget
+        self.counter = counter
+        self.max_overlap = max_overlap
+
+    def build(self, contexts: List[Dict[str, Any]]) -> str:
+        entries = self._merge_sections(contexts)
+        if not entries:
+            return ""
+
+        headers = [self._header(entry) for entry in entries]
+        costs = self.counter.count_batch([f"{header}\n{entry['text']}" for header, entry in zip(headers, entries)])
+
+        if all(entry['rank'] is not None for entry in entries):
+            relevance = [1.0 / (entry['rank'] + 1) for entry in entries]
+        else:
+            relevance = [entry['score'] for entry in entries]
+
+        # Greedy knapsack on relevance per token
+        order = sorted(range(len(entries)), key=lambda i: relevance[i] / max(costs[i], 1), reverse=True)
+        best = max(range(len(entries)), key=lambda i: relevance[i])
+
+        selected = []
+        remaining = self.token_budget
+        if costs[best] > remaining:
+            entries[best]['text'] = self._truncate(entries[best]['text'], remaining - self.counter.count(headers[best]))
+            costs[best] = remaining
+        for i in [best] + [i for i in order if i != best]:
+            if costs[i] <= remaining:
+                selected.append(i)
+                remaining -= costs[i]
+
+        selected.sort(key=lambda i: relevance[i], reverse=True)
+        parts = []
+        for position, i in enumerate(selected, 1):
+            parts.append(f"\n[Document {position}] {headers[i]}\n{entries[i]['text']}\n")
+
+        logger.info("Context: %d/%d sections from %d chunks, %d/%d tokens",
+                    len(selected), len(entries), len(contexts), self.token_budget - remaining, self.token_budget)
+        return "\n".join(parts)
+
+    def _merge_sections(self, contexts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Group chunks by (act, section) and merge each group's text"""
+        groups: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        for ctx in contexts:
+            metadata = ctx.get('metadata', {})
+            key = (metadata.get('act_name', 'Unknown Act'), str(metadata.get('section_number', 'Unknown')))
+            groups.setdefault(key, []).append(ctx)
+
+        entries = []
+        for (act_name, section), chunks in groups.items():
+            chunks.sort(key=lambda c: c.get('metadata', {}).get('chunk_index', 0))
+
+            text = ""
+            previous_index = None
+            seen = set()
+            for chunk in chunks:
+                metadata = chunk.get('metadata', {})
+                chunk_text = (metadata.get('text') or metadata.get('text_preview', '')).strip()
+                if not chunk_text or chunk_text in seen:
+                    continue
+                seen.add(chunk_text)
+
+                chunk_index = metadata.get('chunk_index')
+                if not text:
+                    text = chunk_text
+                elif chunk_text in text:
+                    pass
+                elif chunk_index is not None and previous_index is not None and chunk_index == previous_index + 1:
+                    text = _merge_overlap(text, chunk_text, self.max_overlap)
+                else:
+                    text = f"{text} … {chunk_text}"
+                previous_index = chunk_index
+
+            if text:
+                ranks = [c['rerank_position'] for c in chunks if 'rerank_position' in c]
+                entries.append({
+                    "act_name": act_name,
+                    "section": section,
+                    "text": text,
+                    "score": max(c.get('score', 0.0) for c in chunks),
+                    "rank": min(ranks) if ranks else None
+                })
+        return entries
+
+    def _header(self, entry: Dict[str, Any]) -> str:
+        return f"{entry['act_name']} - Section {entry['section']} (Relevance: {entry['score']:.2f})"
+
+    def _truncate(self, text: str, max_tokens: int) -> str:
+        """Cut text to roughly max_tokens, on a word boundary"""
+        tokens = self.counter.count(text)
+        if tokens <= max_tokens:
+            return text
+        cut = text[:max(0, int(len(text) * max_tokens / tokens))]
+        return cut.rsplit(' ', 1)[0] + " …"
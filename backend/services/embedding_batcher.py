@@ -0,0 +1,90 @@
+from typing import Callable, List, Optional
+from concurrent.futures import Future, InvalidStateError, TimeoutError
+from services.log import get_logger
+import numpy as np
+import threading
+import queue
+import time
+
+logger = get_logger("embedding_batcher")
+
+class EmbeddingBatcher:
+    """
+    Collects concurrent single-query encode requests into one batched call.
+
+    A background thread takes the first pending request, then keeps collecting
+    for up to `max_wait_ms` or until `max_batch_size` requests are queued, and
+    runs `encode_fn` once for the whole batch. Each caller gets its own row.
+    Requests cancelled before their batch starts (an async caller that went
+    away) are dropped; a failure delivering one result never stops the thread.
+    """
+
+    def __init__(
+        self,
+        encode_fn: Callable[[List[str]], np.ndarray],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 3.0,
+        timeout: Optional[float] = 30.0
+    ):
+        self._encode_fn = encode_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.timeout = timeout
+        self._queue: "queue.Queue[tuple]" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+        self._worker.start()
+
+    def submit(self, text: str) -> "Future[np.ndarray]":
+        future: "Future[np.ndarray]" = Future()
+        self._queue.put((text, future))
+        return future
+
+    def encode(self, text: str) -> np.ndarray:
+        """Blocking helper: submit and wait (up to `timeout` seconds) for the embedding"""
+        future = self.submit(text)
+        try:
+            return future.result(timeout=self.timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def _collect(self) -> List[tuple]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            # Marks each future running, so a later cancel() cannot race set_result
+            batch = [(text, future) for text, future in self._collect() if future.set_running_or_notify_cancel()]
+            if not batch:
+                continue
+
+            # Identical texts in the same batch are encoded once
+            unique_texts = list(dict.fromkeys(text for text, _ in batch))
+            try:
+                embeddings = self._encode_fn(unique_texts)
+            except Exception as e:
+                for _, future in batch:
+                    self._deliver(future.set_exception, e)
+                continue
+
+            rows = {text: embeddings[i] for i, text in enumerate(unique_texts)}
+            for text, future in batch:
+                self._deliver(future.set_result, rows[text])
+
+    @staticmethod
+    def _deliver(setter, value):
+        try:
+            setter(value)
+        except InvalidStateError:
+            logger.warning("Embedding request already completed, dropping its result")
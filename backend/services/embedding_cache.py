@@ -0,0 +1,116 @@
+from typing import Optional, Dict, Any
+from collections import OrderedDict
+from services.log import get_logger
+from services.metrics import CACHE_LOOKUPS
+import numpy as np
+import threading
+import tempfile
+import os
+
+logger = get_logger("embedding_cache")
+
+class EmbeddingCache:
+    """
+    Thread-safe LRU cache of query embeddings, bounded by memory use.
+    Optionally persisted to a .npz file so it survives restarts.
+    """
+
+    def __init__(self, max_bytes: int, persist_path: Optional[str] = None):
+        self.max_bytes = max_bytes
+        self.persist_path = persist_path
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        if persist_path and os.path.exists(persist_path):
+            self.load()
+
+    @staticmethod
+    def _entry_size(key: str, value: np.ndarray) -> int:
+        return value.nbytes + len(key.encode("utf-8"))
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                CACHE_LOOKUPS.labels("embedding", "miss").inc()
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            CACHE_LOOKUPS.labels("embedding", "hit").inc()
+            return value
+
+    def put(self, key: str, value: np.ndarray):
+        # A copy, so a row of a batch matrix does not keep the whole matrix alive
+        value = np.array(value, dtype=np.float32, copy=True)
+        size = self._entry_size(key, value)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= self._entry_size(key, old)
+            self._entries[key] = value
+            self._bytes += size
+
+            while self._bytes > self.max_bytes:
+                evicted_key, evicted = self._entries.popitem(last=False)
+                self._bytes -= self._entry_size(evicted_key, evicted)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    def save(self):
+        """Write entries (oldest first) to persist_path"""
+        if not self.persist_path:
+            return
+
+        with self._lock:
+            keys = list(self._entries.keys())
+            vectors = np.stack(list(self._entries.values())) if keys else np.zeros((0, 0), dtype=np.float32)
+
+        directory = os.path.dirname(self.persist_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Own temp file per process: every worker saves at exit, and a shared
+        # name would let concurrent shutdowns truncate each other's file
+        fd, tmp_path = tempfile.mkstemp(
+            dir=directory or ".",
+            prefix=os.path.basename(self.persist_path) + ".",
+            suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, keys=np.array(keys, dtype=np.str_), vectors=vectors)
+            os.replace(tmp_path, self.persist_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def load(self):
+        """Restore entries from persist_path"""
+        try:
+            with np.load(self.persist_path) as data:
+                keys = data["keys"].tolist()
+                vectors = data["vectors"]
+        except Exception as e:
+            logger.warning("Could not load embedding cache from %s: %s", self.persist_path, e)
+            return
+
+        for key, vector in zip(keys, vectors):
+            self.put(key, vector)
+        logger.info("Loaded %d cached query embeddings", len(self._entries))
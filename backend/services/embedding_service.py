@@ -1,11 +1,20 @@
 from typing import List
-from sentence_transformers import SentenceTransformer
+from services.embedding_cache import EmbeddingCache
+from services.embedding_batcher import EmbeddingBatcher
+from services.log import get_logger
+from services.metrics import stage_timer
 import numpy as np
+import asyncio
+import atexit
 import re
 
+logger = get_logger("embedding")
+
 class EmbeddingService:
     _instance = None
     _model = None
+    _cache = None
+    _batcher = None
     
     def __new__(cls):
         if cls._instance is None:
@@ -15,9 +24,36 @@ class EmbeddingService:
     def __init__(self):
         if self._model is None:
             from config import Config
-            print(f"Loading embedding model: {Config.EMBEDDING_MODEL}")
-            self._model = SentenceTransformer(Config.EMBEDDING_MODEL)
-            print("Embedding model loaded")
+            logger.info("Loading embedding model: %s (%s)", Config.EMBEDDING_MODEL, Config.EMBEDDING_BACKEND)
+            if Config.EMBEDDING_BACKEND == "onnx":
+                from services.onnx_encoder import OnnxEncoder
+                self._model = OnnxEncoder(
+                    Config.ONNX_MODEL_DIR,
+                    model_file="model.int8.onnx" if Config.ONNX_QUANTIZED else "model.onnx",
+                    max_seq_length=Config.ONNX_MAX_SEQ_LENGTH,
+                    num_threads=Config.ONNX_THREADS
+                )
+            else:
+                # Imported lazily so onnx workers never load torch
+                from sentence_transformers import SentenceTransformer
+                self._model = SentenceTransformer(Config.EMBEDDING_MODEL)
+            logger.info("Embedding model loaded")
+            
+            if Config.EMBEDDING_CACHE_MAX_MB > 0:
+                EmbeddingService._cache = EmbeddingCache(
+                    max_bytes=int(Config.EMBEDDING_CACHE_MAX_MB * 1024 * 1024),
+                    persist_path=Config.EMBEDDING_CACHE_PATH
+                )
+                if Config.EMBEDDING_CACHE_PATH:
+                    atexit.register(self._cache.save)
+            
+            if Config.EMBEDDING_MICRO_BATCHING:
+                EmbeddingService._batcher = EmbeddingBatcher(
+                    self._encode_normalized,
+                    max_batch_size=Config.EMBEDDING_BATCH_MAX_SIZE,
+                    max_wait_ms=Config.EMBEDDING_BATCH_MAX_WAIT_MS,
+                    timeout=Config.EMBEDDING_BATCH_TIMEOUT
+                )
     
     def preprocess_query(self, text: str) -> str:
         """Enhanced query preprocessing"""
@@ -45,20 +81,85 @@ class EmbeddingService:
         # Preprocess query
         processed_text = self.preprocess_query(text)
         
-        # Generate embedding
-        embedding = self._model.encode(processed_text, convert_to_tensor=False)
+        # Serve repeated questions from the cache
+        if self._cache is not None:
+            cached = self._cache.get(processed_text)
+            if cached is not None:
+                return cached.tolist()
         
-        # Normalize
-        embedding = embedding / np.linalg.norm(embedding)
+        # Generate normalized embedding, batched with concurrent requests if enabled
+        with stage_timer("embedding_encode"):
+            if self._batcher is not None:
+                embedding = self._batcher.encode(processed_text)
+            else:
+                embedding = self._encode_normalized([processed_text])[0]
+        
+        if self._cache is not None:
+            self._cache.put(processed_text, embedding)
         
         return embedding.tolist()
     
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """
+        embed_query for many questions: cached ones are reused and the rest
+        are encoded together in a single embed_batch call
+        """
+        processed = [self.preprocess_query(text) for text in texts]
+        
+        embeddings = [None] * len(processed)
+        if self._cache is not None:
+            for i, text in enumerate(processed):
+                cached = self._cache.get(text)
+                if cached is not None:
+                    embeddings[i] = cached.tolist()
+        
+        missing = list(dict.fromkeys(text for text, emb in zip(processed, embeddings) if emb is None))
+        if missing:
+            encoded = dict(zip(missing, self.embed_batch(missing)))
+            if self._cache is not None:
+                for text, embedding in encoded.items():
+                    self._cache.put(text, embedding)
+            embeddings = [emb if emb is not None else encoded[text] for text, emb in zip(processed, embeddings)]
+        
+        return embeddings
+    
+    async def embed_query_async(self, text: str) -> List[float]:
+        """
+        Awaitable embed_query for the ASGI app. Encoding runs on the batcher
+        thread (or the default executor), never on the event loop.
+        """
+        processed_text = self.preprocess_query(text)
+        
+        if self._cache is not None:
+            cached = self._cache.get(processed_text)
+            if cached is not None:
+                return cached.tolist()
+        
+        if self._batcher is not None:
+            embedding = await asyncio.wrap_future(self._batcher.submit(processed_text))
+        else:
+            loop = asyncio.get_running_loop()
+            embedding = (await loop.run_in_executor(None, self._encode_normalized, [processed_text]))[0]
+        
+        if self._cache is not None:
+            self._cache.put(processed_text, embedding)
+        
+        return embedding.tolist()
+    
+    def cache_stats(self) -> dict:
+        """Query embedding cache statistics"""
+        if self._cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self._cache.stats()}
+    
     def embed_batch(self, texts: List[str]) -> List[List[float]]:
         """Generate normalized embeddings for batch of texts"""
+        return self._encode_normalized(texts).tolist()
+    
+    def _encode_normalized(self, texts: List[str]) -> np.ndarray:
+        """Encode texts in one model call and L2-normalize each row"""
         embeddings = self._model.encode(texts, convert_to_tensor=False, show_progress_bar=False)
         
         # Normalize
         norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
-        normalized = embeddings / norms
-        
-        return normalized.tolist()
\ No newline at end of file
+        return embeddings / norms
\ No newline at end of file
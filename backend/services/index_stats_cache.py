@@ -0,0 +1,96 @@
+from typing import Callable, Dict, Any, Optional
+from services.log import get_logger
+import threading
+import time
+
+logger = get_logger("index_stats")
+
+class IndexStatsCache:
+    """
+    TTL cache for Pinecone index metadata (namespace list, vector counts).
+    Fresh values are served directly; stale values are served while a
+    background refresh runs (stale-while-revalidate). When nothing usable is
+    cached, one caller fetches and concurrent callers wait for its result.
+    """
+
+    def __init__(
+        self,
+        fetch_fn: Callable[[], Dict[str, Any]],
+        ttl: float = 60.0,
+        max_stale: float = 600.0
+    ):
+        self._fetch_fn = fetch_fn
+        self._ttl = ttl
+        self._max_stale = max_stale
+        self._value: Optional[Dict[str, Any]] = None
+        self._fetched_at = 0.0
+        self._lock = threading.Lock()
+        self._refreshing = False
+        # Single-flight synchronous refresh; its last failure is shared with waiters
+        self._refresh_lock = threading.Lock()
+        self._error: Optional[Exception] = None
+        self._failed_at = 0.0
+
+    def get(self) -> Dict[str, Any]:
+        """Return cached stats, refreshing synchronously only when nothing usable is cached"""
+        with self._lock:
+            value = self._value
+            age = time.monotonic() - self._fetched_at
+
+            if value is not None and age < self._ttl:
+                return value
+
+            if value is not None and age < self._ttl + self._max_stale:
+                # Serve stale value and revalidate in the background
+                if not self._refreshing:
+                    self._refreshing = True
+                    threading.Thread(
+                        target=self._background_refresh,
+                        name="index-stats-refresh",
+                        daemon=True
+                    ).start()
+                return value
+
+        requested_at = time.monotonic()
+        with self._refresh_lock:
+            with self._lock:
+                # Another caller fetched (or failed) while this one waited
+                if self._fetched_at >= requested_at:
+                    return self._value
+                error = self._error if self._failed_at >= requested_at else None
+            if error is None:
+                try:
+                    return self.refresh()
+                except Exception as e:
+                    with self._lock:
+                        self._error = e
+                        self._failed_at = time.monotonic()
+                    error = e
+
+        # Keep serving the last good value when Pinecone is unavailable
+        if value is not None:
+            return value
+        raise error
+
+    def refresh(self) -> Dict[str, Any]:
+        """Fetch fresh stats and store them"""
+        value = self._fetch_fn()
+        with self._lock:
+            self._value = value
+            self._fetched_at = time.monotonic()
+        return value
+
+    def _background_refresh(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            logger.warning("Background index stats refresh failed: %s", e)
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def age(self) -> Optional[float]:
+        """Seconds since last successful fetch, or None if never fetched"""
+        if self._value is None:
+            return None
+        return time.monotonic() - self._fetched_at
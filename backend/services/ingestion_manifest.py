@@ -0,0 +1,73 @@
+from typing import Dict, Any, Optional
+import hashlib
+import json
+import os
+
+class IngestionManifest:
+    """
+    Persistent record of what has been indexed, used for incremental re-indexing.
+
+    Layout:
+      {
+        "settings": "<fingerprint of chunking/embedding settings>",
+        "namespaces": {
+          "<namespace>": {
+            "source_sha256": "...",
+            "sections": {"<section_number>": {"hash": "...", "chunk_ids": [...]}}
+          }
+        }
+      }
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._data: Dict[str, Any] = {"settings": None, "namespaces": {}}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self._data = json.load(f)
+
+    @property
+    def settings(self) -> Optional[str]:
+        return self._data.get("settings")
+
+    @settings.setter
+    def settings(self, value: str):
+        if value != self._data.get("settings"):
+            # Hashes computed under other settings are meaningless
+            self._data = {"settings": value, "namespaces": {}}
+
+    def get_namespace(self, namespace: str) -> Optional[Dict[str, Any]]:
+        return self._data["namespaces"].get(namespace)
+
+    def set_namespace(self, namespace: str, source_sha256: str, sections: Dict[str, Dict[str, Any]]):
+        self._data["namespaces"][namespace] = {
+            "source_sha256": source_sha256,
+            "sections": sections,
+        }
+
+    def save(self):
+        """Write the manifest atomically"""
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._data, f, indent=1, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+
+
+def file_sha256(path: str, block_size: int = 1 << 20) -> str:
+    """SHA-256 of a file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def text_sha256(*parts: str) -> str:
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x1f")
+    return digest.hexdigest()
@@ -0,0 +1,603 @@
+from typing import List, Optional, Dict, Any, Iterator, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import Manager
+from queue import Empty
+from services.ingestion_manifest import IngestionManifest, file_sha256, text_sha256
+from services.log import get_logger
+import numpy as np
+import tempfile
+import time
+import re
+import os
+
+logger = get_logger("ingestion")
+
+# Namespace -> source PDF and metadata for each bundled act
+LEGAL_ACTS = {
+    'ipc': {
+        'file': 'IPC_186045.pdf',
+        'act_name': 'Indian Penal Code, 1860',
+        'act_short_name': 'IPC',
+        'unit': 'Section',
+    },
+    'bns': {
+        'file': 'the-bharatiya-nyaya-sanhita-2023.pdf',
+        'act_name': 'Bharatiya Nyaya Sanhita, 2023',
+        'act_short_name': 'BNS',
+        'unit': 'Section',
+    },
+    'crpc': {
+        'file': 'the_code_of_criminal_procedure_1973.pdf',
+        'act_name': 'Code of Criminal Procedure, 1973',
+        'act_short_name': 'CrPC',
+        'unit': 'Section',
+    },
+    'iea': {
+        'file': 'indian_evidence_act_1872.pdf',
+        'act_name': 'Indian Evidence Act, 1872',
+        'act_short_name': 'IEA',
+        'unit': 'Section',
+    },
+    'constitution': {
+        'file': 'constitution_of_india_2024_version.pdf',
+        'act_name': 'Constitution of India',
+        'act_short_name': 'Constitution',
+        'unit': 'Article',
+    },
+    'hma': {
+        'file': 'hindu_marriage_act_1955.pdf',
+        'act_name': 'Hindu Marriage Act, 1955',
+        'act_short_name': 'HMA',
+        'unit': 'Section',
+    },
+    'cpa': {
+        'file': 'the_consumer_protection_act_2019.pdf',
+        'act_name': 'Consumer Protection Act, 2019',
+        'act_short_name': 'CPA',
+        'unit': 'Section',
+    },
+    'ica': {
+        'file': 'the_indian_contract_act_1872.pdf',
+        'act_name': 'Indian Contract Act, 1872',
+        'act_short_name': 'ICA',
+        'unit': 'Section',
+    },
+}
+
+# "302. Punishment for murder.—Whoever ..." or "103. (1) Whoever ..."
+_STRICT_HEADER = re.compile(
+    r'(?<![\d,/(-])(\d{1,3}[A-Z]{0,3})\.\s+(?:([A-Z“"][^—–]{2,250}?)\s*\.\s*[—–]|\(1\)\s)'
+)
+# "4. The punishments to which ..." (bare numbered paragraph, weighted lower)
+_LOOSE_HEADER = re.compile(r'(?<![\d,/(-])(\d{1,3}[A-Z]{0,3})\.\s+(?=[A-Z“"(])')
+_REFERENCE_PREFIX = re.compile(r'\b(?:section|sections|article|articles|clause|rule|of|and|to|or)\s*$', re.IGNORECASE)
+# Amendment footnotes: "1. Subs. by Act 26 of 1955 ...", "2. The words ... omitted"
+_FOOTNOTE = re.compile(r'\s*(?:Subs|Ins|Rep|Omitted|Added|Inserted|Substituted|Renumbered|The words|Certain words|Cl|Sub-s|Ss?|Arts?|Paras?|Entry|Item|See|Now)\b')
+_PAGE_NUMBER = re.compile(r'^\s*\(?[ivxlcdm\d]+\)?\s*\n', re.IGNORECASE)
+
+STRICT_MAX_GAP = 60  # omitted/repealed sections leave gaps in numbering
+LOOSE_MAX_GAP = 2
+STRICT_WEIGHT = 3
+LOOSE_WEIGHT = 1
+HEADER_WINDOW = 512  # characters re-scanned after a page break; longer than any header match
+SPOOL_READ_SIZE = 1 << 16
+INGEST_QUEUE_BATCHES = 8  # record batches parsers may queue ahead of embedding
+
+
+def _section_key(section_number: str) -> Tuple[int, str]:
+    match = re.match(r'(\d+)([A-Z]*)', section_number)
+    return int(match.group(1)), match.group(2)
+
+
+def iter_pdf_pages(path: str) -> Iterator[str]:
+    """Yield the text of a PDF one page at a time"""
+    from pypdf import PdfReader
+
+    reader = PdfReader(path)
+    for page in reader.pages:
+        text = page.extract_text() or ""
+        yield _PAGE_NUMBER.sub("", text, count=1)
+
+
+class _HeaderScanner:
+    """
+    Finds possible section headers as (position, key, number, title, strict)
+    in text fed a page at a time. Only the last HEADER_WINDOW characters are
+    carried over between pages, so a header split by a page break is still
+    matched whole.
+    """
+
+    def __init__(self):
+        self.candidates: List[Tuple[int, Tuple[int, str], str, str, bool]] = []
+        self._tail = ""
+        self._tail_start = 0  # position of _tail[0] in the whole text
+        self._scanned = 0  # matches starting before this have been accepted
+        self._resume = {False: 0, True: 0}  # end of the last match, per pattern
+
+    def feed(self, text: str, final: bool = False):
+        window = self._tail + text
+        offset = self._tail_start
+        stop = offset + len(window) if final else offset + len(window) - HEADER_WINDOW
+
+        if stop > self._scanned:
+            found = {}
+            for pattern, strict in ((_LOOSE_HEADER, False), (_STRICT_HEADER, True)):
+                for match in pattern.finditer(window, max(self._scanned, self._resume[strict]) - offset):
+                    if match.start() + offset >= stop:
+                        break
+                    self._resume[strict] = match.end() + offset
+                    number = match.group(1)
+                    if _REFERENCE_PREFIX.search(window[max(0, match.start() - 12):match.start()]):
+                        continue
+                    if _FOOTNOTE.match(window, match.start() + len(number) + 1):
+                        continue
+                    title = match.group(2) if strict and match.group(2) else ""
+                    position = match.start() + offset
+                    found[position] = (position, _section_key(number), number, re.sub(r'\s+', ' ', title).strip(), strict)
+            self.candidates.extend(found[position] for position in sorted(found))
+            self._scanned = stop
+
+        # Keep look-behind context for the reference check
+        keep_from = max(self._scanned - 16, offset)
+        self._tail = window[keep_from - offset:]
+        self._tail_start = keep_from
+
+
+def _header_chain(candidates: List[Tuple[int, Tuple[int, str], str, str, bool]]) -> List[int]:
+    """Indexes of the highest-weighted increasing chain of header candidates"""
+    # best[base][suffix] = (score, candidate index) of the best chain ending there
+    best: Dict[int, Dict[str, Tuple[int, int]]] = {}
+    previous: List[Optional[int]] = [None] * len(candidates)
+    end = None
+
+    for i, (_, key, _, _, strict) in enumerate(candidates):
+        weight = STRICT_WEIGHT if strict else LOOSE_WEIGHT
+        max_gap = STRICT_MAX_GAP if strict else LOOSE_MAX_GAP
+
+        score, link = (weight, None) if strict and key == (1, "") else (None, None)
+        for base in range(max(1, key[0] - max_gap), key[0] + 1):
+            for suffix, (chain_score, j) in best.get(base, {}).items():
+                if (base, suffix) < key and (score is None or chain_score + weight > score):
+                    score, link = chain_score + weight, j
+
+        if score is None:
+            continue
+        previous[i] = link
+        if score > best.setdefault(key[0], {}).get(key[1], (-1, None))[0]:
+            best[key[0]][key[1]] = (score, i)
+            if end is None or score > best[candidates[end][1][0]][candidates[end][1][1]][0]:
+                end = i
+
+    chain = []
+    while end is not None:
+        chain.append(end)
+        end = previous[end]
+    chain.reverse()
+    return chain
+
+
+def split_sections(pages: Iterator[str]) -> Iterator[Dict[str, str]]:
+    """
+    Split a stream of page texts into sections/articles.
+
+    Every "N." at the start of a sentence is a candidate header. The headers
+    kept are the highest-weighted chain of candidates that starts at section 1
+    and increases in both position and section number with bounded gaps. Body
+    headers (".—" or "(1)") outweigh bare numbers, so the arrangement table,
+    footnotes and schedule paragraphs drop out.
+
+    Pages are scanned as they arrive and spooled to a temporary file; once the
+    chain is known the spool is read back and each section is yielded as soon
+    as its text is complete, so no more than one section is held in memory.
+    """
+    scanner = _HeaderScanner()
+    with tempfile.TemporaryFile("w+", encoding="utf-8", newline="") as spool:
+        for page in pages:
+            page += "\n"
+            spool.write(page)
+            scanner.feed(page)
+        scanner.feed("", final=True)
+
+        candidates = scanner.candidates
+        chain = _header_chain(candidates)
+        spool.seek(0)
+        buffer, buffer_start = "", 0
+
+        for n, i in enumerate(chain):
+            start = candidates[i][0]
+            stop = candidates[chain[n + 1]][0] if n + 1 < len(chain) else None
+
+            blocks = [buffer]
+            available = buffer_start + len(buffer)
+            while stop is None or available < stop:
+                block = spool.read(SPOOL_READ_SIZE)
+                if not block:
+                    break
+                blocks.append(block)
+                available += len(block)
+            buffer = "".join(blocks)
+
+            cut = len(buffer) if stop is None else stop - buffer_start
+            text = buffer[start - buffer_start:cut]
+            buffer, buffer_start = buffer[cut:], buffer_start + cut
+            yield {
+                "section_number": candidates[i][2],
+                "title": candidates[i][3],
+                "text": re.sub(r'\s+', ' ', text).strip(),
+            }
+
+
+def chunk_text(text: str, chunk_size: int, overlap: int) -> List[str]:
+    """Split text into overlapping chunks on word boundaries"""
+    if len(text) <= chunk_size:
+        return [text]
+
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        if end < len(text):
+            space = text.rfind(" ", start + chunk_size // 2, end)
+            if space != -1:
+                end = space
+        chunks.append(text[start:end].strip())
+        if end >= len(text):
+            break
+        start = max(end - overlap, start + 1)
+    return chunks
+
+
+def parse_act(
+    namespace: str,
+    data_dir: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    preview_length: int,
+    queue,
+    batch_size: int
+) -> Tuple[str, float]:
+    """
+    Parse one act into chunk records (runs in a worker process).
+    Records are put on `queue` as ("records", namespace, records) batches of
+    whole sections as soon as the sections are split, followed by
+    ("done", namespace, seconds). Returns (namespace, seconds).
+    """
+    started = time.perf_counter()
+    act = LEGAL_ACTS[namespace]
+    pages = iter_pdf_pages(os.path.join(data_dir, act['file']))
+
+    records = []
+    for section in split_sections(pages):
+        for chunk_index, chunk in enumerate(chunk_text(section["text"], chunk_size, chunk_overlap)):
+            records.append({
+                "id": f"{namespace}-{section['section_number']}-{chunk_index}",
+                "embed_text": f"{act['act_short_name']} {act['unit']} {section['section_number']}: {chunk}",
+                "metadata": {
+                    "section_number": section["section_number"],
+                    "section_title": section["title"],
+                    "act_name": act['act_name'],
+                    "act_short_name": act['act_short_name'],
+                    "chunk_index": chunk_index,
+                    "text_preview": chunk[:preview_length],
+                    "text": chunk,
+                },
+            })
+        if len(records) >= batch_size:
+            queue.put(("records", namespace, records))
+            records = []
+
+    if records:
+        queue.put(("records", namespace, records))
+    seconds = time.perf_counter() - started
+    queue.put(("done", namespace, seconds))
+    return namespace, seconds
+
+
+def open_index(backend: str):
+    """Open the vector index for the given backend ("pinecone" or "local")"""
+    from config import Config
+
+    if backend == "local":
+        from services.local_index import LocalIndex
+        return LocalIndex(
+            Config.LOCAL_INDEX_DIR,
+            dimension=Config.EMBEDDING_DIM,
+            nprobe=Config.LOCAL_INDEX_NPROBE,
+            ivf_min_vectors=Config.LOCAL_INDEX_IVF_MIN_VECTORS
+        )
+
+    from pinecone import Pinecone
+    if not Config.PINECONE_API_KEY:
+        raise ValueError("PINECONE_API_KEY not found in environment")
+    return Pinecone(api_key=Config.PINECONE_API_KEY).Index(Config.INDEX_NAME)
+
+
+class IngestionService:
+    """
+    Builds the retrieval corpus from the PDFs in backend/data.
+
+    Runs are incremental by default: a manifest of per-section content hashes
+    is compared against the fresh parse, so only new or changed sections are
+    embedded and upserted, and sections that disappeared are deleted.
+    """
+
+    def __init__(self, index, embedding_service, backend: str):
+        from config import Config
+        self._index = index
+        self._embedding_service = embedding_service
+        self._backend = backend
+        self.data_dir = Config.DATA_DIR
+        self.chunk_size = Config.INGEST_CHUNK_SIZE
+        self.chunk_overlap = Config.INGEST_CHUNK_OVERLAP
+        self.preview_length = Config.TEXT_PREVIEW_LENGTH
+        self.embed_batch_size = Config.INGEST_EMBED_BATCH
+        self.upsert_batch_size = Config.INGEST_UPSERT_BATCH
+        self.manifest = IngestionManifest(
+            os.path.join(Config.INGEST_MANIFEST_DIR, f"ingest_manifest.{backend}.json")
+        )
+        # Changing any of these invalidates every stored hash
+        self.manifest.settings = text_sha256(
+            Config.EMBEDDING_MODEL,
+            str(self.chunk_size),
+            str(self.chunk_overlap),
+            str(self.preview_length)
+        )
+
+    def run(
+        self,
+        namespaces: Optional[List[str]] = None,
+        workers: Optional[int] = None,
+        full: bool = False
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Parse acts in parallel worker processes and embed and write their
+        sections in batches while the parse is still streaming them in.
+        With full=True every namespace is rebuilt from scratch. Returns
+        per-act stats.
+        """
+        namespaces = namespaces or list(LEGAL_ACTS.keys())
+        unknown = [ns for ns in namespaces if ns not in LEGAL_ACTS]
+        if unknown:
+            raise ValueError(f"Unknown namespaces: {unknown}")
+
+        report = {}
+        started = time.perf_counter()
+
+        # Skip acts whose source PDF is byte-identical to the last run
+        source_hashes = {}
+        to_parse = []
+        for namespace in namespaces:
+            source_hashes[namespace] = file_sha256(os.path.join(self.data_dir, LEGAL_ACTS[namespace]['file']))
+            previous = self.manifest.get_namespace(namespace)
+            if not full and previous and previous["source_sha256"] == source_hashes[namespace]:
+                logger.info("%s: source unchanged, skipping", namespace)
+                report[namespace] = {"status": "unchanged", "sections": len(previous["sections"])}
+            else:
+                to_parse.append(namespace)
+
+        if not to_parse:
+            logger.info("Nothing to ingest")
+            return report
+
+        logger.info("Ingesting %d acts with %d workers", len(to_parse), workers or os.cpu_count())
+
+        acts = {}
+        for namespace in to_parse:
+            previous = None if full else self.manifest.get_namespace(namespace)
+            acts[namespace] = _ActWriter(self, namespace, previous["sections"] if previous else None)
+
+        with Manager() as manager, ProcessPoolExecutor(max_workers=workers) as executor:
+            # Bounded, so parsers wait for embedding instead of piling up records
+            queue = manager.Queue(maxsize=INGEST_QUEUE_BATCHES)
+            futures = [
+                executor.submit(
+                    parse_act, ns, self.data_dir, self.chunk_size, self.chunk_overlap,
+                    self.preview_length, queue, self.embed_batch_size
+                )
+                for ns in to_parse
+            ]
+
+            remaining = set(to_parse)
+            while remaining:
+                try:
+                    kind, namespace, payload = queue.get(timeout=1.0)
+                except Empty:
+                    for future in futures:
+                        if future.done() and future.exception() is not None:
+                            raise future.exception()
+                    continue
+
+                act = acts[namespace]
+                if kind == "records":
+                    act.add(payload)
+                    continue
+
+                remaining.discard(namespace)
+                stats = act.finish()
+                logger.info("%s: parsed %d sections into %d chunks in %.1fs", namespace, len(act.sections), act.chunks, payload)
+
+                self.manifest.set_namespace(namespace, source_hashes[namespace], act.sections)
+                self.manifest.save()
+
+                logger.info("%s: %s, embedded %d chunks in %.1fs, wrote in %.1fs", namespace, stats['status'],
+                            stats['embedded_chunks'], stats['embed_seconds'], stats['write_seconds'])
+                report[namespace] = {
+                    "sections": len(act.sections),
+                    "chunks": act.chunks,
+                    "parse_seconds": round(payload, 2),
+                    **stats,
+                }
+
+        logger.info("Ingestion finished in %.1fs", time.perf_counter() - started)
+        return report
+
+    def _embed(self, records: List[Dict[str, Any]]) -> np.ndarray:
+        """Embed chunk texts in large batches"""
+        if not records:
+            return np.zeros((0, 0), dtype=np.float32)
+
+        batches = []
+        for start in range(0, len(records), self.embed_batch_size):
+            texts = [r["embed_text"] for r in records[start:start + self.embed_batch_size]]
+            batches.append(np.asarray(self._embedding_service.embed_batch(texts), dtype=np.float32))
+        return np.vstack(batches)
+
+    def write(self, namespace: str, records: List[Dict[str, Any]], vectors: np.ndarray):
+        """Replace a namespace's contents with the given records"""
+        if self._backend == "local":
+            self._index.write_namespace(
+                namespace,
+                [r["id"] for r in records],
+                vectors,
+                [r["metadata"] for r in records]
+            )
+            return
+
+        self.clear(namespace)
+        self.upsert(namespace, records, vectors)
+
+    def clear(self, namespace: str):
+        """Delete every record in a Pinecone namespace"""
+        try:
+            self._index.delete(delete_all=True, namespace=namespace)
+        except Exception as e:
+            # Pinecone returns 404 for a namespace that does not exist yet
+            logger.warning("Could not clear namespace %s: %s", namespace, e)
+
+    def upsert(self, namespace: str, records: List[Dict[str, Any]], vectors: np.ndarray):
+        """Upsert records in bulk batches"""
+        if self._backend == "local":
+            # One rewrite of the memory-mapped files instead of one per batch
+            self._index.upsert(
+                vectors=[
+                    {"id": r["id"], "values": vectors[i], "metadata": r["metadata"]}
+                    for i, r in enumerate(records)
+                ],
+                namespace=namespace
+            )
+            return
+
+        for start in range(0, len(records), self.upsert_batch_size):
+            batch = [
+                {"id": r["id"], "values": vectors[start + i].tolist(), "metadata": r["metadata"]}
+                for i, r in enumerate(records[start:start + self.upsert_batch_size])
+            ]
+            self._index.upsert(vectors=batch, namespace=namespace)
+
+    def delete(self, namespace: str, ids: List[str]):
+        """Delete records by id in bulk batches"""
+        if self._backend == "local":
+            self._index.delete(ids=ids, namespace=namespace)
+            return
+
+        for start in range(0, len(ids), self.upsert_batch_size):
+            self._index.delete(ids=ids[start:start + self.upsert_batch_size], namespace=namespace)
+
+
+class _ActWriter:
+    """
+    Writes one act's records as the parser streams them in.
+
+    Each batch of whole sections is hashed for the manifest; new or changed
+    sections (every section on a rebuild) are embedded and upserted as soon as
+    a full embedding batch is pending. finish() writes the remainder and
+    deletes chunks of changed or removed sections that no longer exist.
+    The local index rewrites its files on every write, so for it vectors are
+    collected and written once in finish().
+    """
+
+    def __init__(self, service: IngestionService, namespace: str, previous: Optional[Dict[str, Dict[str, Any]]]):
+        self.service = service
+        self.namespace = namespace
+        self.previous = previous  # manifest sections; None rebuilds the namespace
+        self.sections: Dict[str, Dict[str, Any]] = {}
+        self.chunks = 0
+        self._pending: List[Dict[str, Any]] = []
+        self._changed = set()
+        self._stale_ids: List[str] = []
+        self._embedded = 0
+        self._cleared = False
+        self._local_records: List[Dict[str, Any]] = []
+        self._local_vectors: List[np.ndarray] = []
+        self._embed_seconds = 0.0
+        self._write_seconds = 0.0
+
+    def add(self, records: List[Dict[str, Any]]):
+        self.chunks += len(records)
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for record in records:
+            grouped.setdefault(record["metadata"]["section_number"], []).append(record)
+
+        for section_number, chunks in grouped.items():
+            section = {
+                "hash": text_sha256(*(r["embed_text"] for r in chunks), chunks[0]["metadata"]["section_title"]),
+                "chunk_ids": [r["id"] for r in chunks],
+            }
+            self.sections[section_number] = section
+            if self.previous is not None:
+                previous = self.previous.get(section_number, {})
+                if previous.get("hash") == section["hash"]:
+                    continue
+                current_ids = set(section["chunk_ids"])
+                self._stale_ids.extend(i for i in previous.get("chunk_ids", []) if i not in current_ids)
+            self._changed.add(section_number)
+            self._pending.extend(chunks)
+
+        batch_size = self.service.embed_batch_size
+        while len(self._pending) >= batch_size:
+            self._write(self._pending[:batch_size])
+            self._pending = self._pending[batch_size:]
+
+    def _write(self, records: List[Dict[str, Any]]):
+        embed_started = time.perf_counter()
+        vectors = self.service._embed(records)
+        self._embed_seconds += time.perf_counter() - embed_started
+        self._embedded += len(records)
+
+        write_started = time.perf_counter()
+        if self.service._backend == "local":
+            self._local_records.extend(records)
+            self._local_vectors.append(vectors)
+        else:
+            if self.previous is None and not self._cleared:
+                self.service.clear(self.namespace)
+                self._cleared = True
+            self.service.upsert(self.namespace, records, vectors)
+        self._write_seconds += time.perf_counter() - write_started
+
+    def finish(self) -> Dict[str, Any]:
+        """Write what is left and return the act's stats"""
+        if self._pending:
+            self._write(self._pending)
+            self._pending = []
+
+        removed = set(self.previous) - set(self.sections) if self.previous is not None else set()
+        for section_number in removed:
+            self._stale_ids.extend(self.previous[section_number].get("chunk_ids", []))
+
+        write_started = time.perf_counter()
+        if self.service._backend == "local":
+            vectors = np.vstack(self._local_vectors) if self._local_vectors else np.zeros((0, 0), dtype=np.float32)
+            if self.previous is None:
+                self.service.write(self.namespace, self._local_records, vectors)
+            elif self._local_records:
+                self.service.upsert(self.namespace, self._local_records, vectors)
+        elif self.previous is None and not self._cleared:
+            self.service.clear(self.namespace)
+        if self._stale_ids:
+            self.service.delete(self.namespace, self._stale_ids)
+        self._write_seconds += time.perf_counter() - write_started
+
+        if self.previous is None:
+            status = "rebuilt"
+        else:
+            status = "updated" if self._changed or removed else "unchanged"
+        return {
+            "status": status,
+            "changed_sections": len(self._changed),
+            "removed_sections": len(removed),
+            "embedded_chunks": self._embedded,
+            "deleted_chunks": len(self._stale_ids),
+            "embed_seconds": round(self._embed_seconds, 2),
+            "write_seconds": round(self._write_seconds, 2),
+        }
@@ -0,0 +1,48 @@
+from typing import Dict, Any, Optional
+import numpy as np
+import threading
+
+
+class LatencyTracker:
+    """
+    Rolling per-key latency samples (seconds) for percentile queries.
+
+    Each key keeps the last `window` observations in a ring buffer, so
+    percentiles follow recent behaviour and memory stays fixed.
+    """
+
+    def __init__(self, window: int = 512, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, np.ndarray] = {}
+        self._counts: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def record(self, key: str, seconds: float):
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = np.zeros(self.window, dtype=np.float32)
+                self._counts[key] = 0
+            samples[self._counts[key] % self.window] = seconds
+            self._counts[key] += 1
+
+    def percentile(self, key: str, q: float) -> Optional[float]:
+        """q-th percentile of recent latencies, or None until min_samples are seen"""
+        with self._lock:
+            count = self._counts.get(key, 0)
+            if count < self.min_samples:
+                return None
+            return float(np.percentile(self._samples[key][:min(count, self.window)], q))
+
+    def stats(self) -> Dict[str, Any]:
+        """p50/p95/p99 in milliseconds per key"""
+        with self._lock:
+            snapshot = {key: samples[:min(self._counts[key], self.window)].copy() for key, samples in self._samples.items()}
+        return {
+            key: {
+                "samples": int(len(values)),
+                **{f"p{q}_ms": round(float(np.percentile(values, q)) * 1000, 1) for q in (50, 95, 99)}
+            }
+            for key, values in snapshot.items() if len(values)
+        }
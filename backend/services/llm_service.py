@@ -1,10 +1,30 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Tuple, Optional
+from concurrent.futures import Future, ThreadPoolExecutor
+from services.context_builder import ContextBuilder, TokenCounter
+from services.circuit_breaker import CircuitBreaker, backoff_delay
+from services.log import get_logger, submit_with_context
+from services.metrics import stage_timer, observe_stage, LLM_RETRIES, FALLBACK_ANSWERS
 import google.generativeai as genai
+import asyncio
 import time
 
+logger = get_logger("llm")
+
+# Canned replies used when Gemini could not produce an answer
+NO_CONTEXT_MESSAGE = "I couldn't find relevant information in the legal documents to answer your question. Please try rephrasing or asking about a different topic."
+HIGH_DEMAND_MESSAGE = "I'm currently experiencing high demand. Please try again in a moment."
+CONFIG_ERROR_MESSAGE = "There's an issue with the API configuration. Please contact support."
+FALLBACK_PREFIX = "Based on the retrieved legal documents:\n"
+NO_RESPONSE_MESSAGE = "I couldn't generate a response. Please try rephrasing your question."
+
+# Prompt variants tried by the retry loop; each gets its own pre-built model
+PROMPT_VARIANTS = ("main", "simple", "educational")
+
 class LLMService:    
     _instance = None
     _configured = False
+    _batch_executor = None
+    _breaker = None
     
     def __new__(cls):
         if cls._instance is None:
@@ -14,13 +34,37 @@ class LLMService:
     def __init__(self):
         if not self._configured:
             from config import Config
-            print(f"Configuring Gemini API: {Config.GEMINI_MODEL}")
-            genai.configure(api_key=Config.GEMINI_API_KEY)
+            logger.info("Configuring Gemini API: %s", Config.GEMINI_MODEL)
+            # gRPC keeps one persistent HTTP/2 channel that every model shares
+            genai.configure(api_key=Config.GEMINI_API_KEY, transport=Config.GEMINI_TRANSPORT)
             self.model_name = Config.GEMINI_MODEL
             self.temperature = Config.TEMPERATURE
             self.max_tokens = Config.MAX_TOKENS
+            # Pre-built per prompt variant and reused by every request
+            self._models = {variant: self._create_model() for variant in PROMPT_VARIANTS}
+            self._generation_configs = {variant: self._create_generation_config() for variant in PROMPT_VARIANTS}
+            self._context_builder = ContextBuilder(
+                token_budget=Config.CONTEXT_TOKEN_BUDGET,
+                counter=TokenCounter(Config.CONTEXT_TOKENIZER_PATH, cached_model=Config.CONTEXT_TOKENIZER),
+                max_overlap=Config.INGEST_CHUNK_OVERLAP * 2
+            )
+            self.request_deadline = Config.LLM_REQUEST_DEADLINE
+            self.backoff_cap = Config.LLM_BACKOFF_CAP
+            # Shared across requests so an outage trips it once for everyone
+            LLMService._breaker = CircuitBreaker(
+                "gemini",
+                failure_threshold=Config.LLM_BREAKER_FAILURES,
+                recovery_timeout=Config.LLM_BREAKER_RECOVERY,
+                # A probe cannot legitimately outlive its request
+                probe_timeout=Config.LLM_REQUEST_DEADLINE
+            )
+            # Bounded pool for batch jobs so they cannot flood Gemini
+            LLMService._batch_executor = ThreadPoolExecutor(
+                max_workers=Config.BATCH_LLM_CONCURRENCY,
+                thread_name_prefix="gemini-batch"
+            )
             self._configured = True
-            print("✓ Gemini configured")
+            logger.info("Gemini configured")
     
     def generate_answer(
         self,
@@ -32,59 +76,57 @@ class LLMService:
         Generate answer using retrieved contexts with improved error handling
         """
         if not contexts:
-            return "I couldn't find relevant information in the legal documents to answer your question. Please try rephrasing or asking about a different topic."
+            return NO_CONTEXT_MESSAGE
         
         # Build enriched context
         context_text = self._build_context(contexts)
         
         # Create optimized prompt
         prompt = self._create_prompt(question, context_text, contexts)
+        variant = "main"
+        
+        deadline = time.monotonic() + self.request_deadline
         
         # Try with different safety settings if needed
         for attempt in range(max_retries):
+            if not self._breaker.allow_request():
+                logger.warning("Gemini circuit open - serving fallback answer")
+                return self._create_fallback_answer(contexts, reason="circuit_open")
+            
             try:
-                print(f"🤖 Attempt {attempt + 1}/{max_retries} - Generating response...")
-                
-                model = genai.GenerativeModel(
-                    self.model_name,
-                    safety_settings={
-                        'HARM_CATEGORY_HARASSMENT': 'BLOCK_NONE',
-                        'HARM_CATEGORY_HATE_SPEECH': 'BLOCK_NONE',
-                        'HARM_CATEGORY_SEXUALLY_EXPLICIT': 'BLOCK_NONE',
-                        'HARM_CATEGORY_DANGEROUS_CONTENT': 'BLOCK_NONE',
-                    }
-                )
+                logger.info("Attempt %d/%d - generating response", attempt + 1, max_retries)
                 
-                response = model.generate_content(
-                    prompt,
-                    generation_config=genai.GenerationConfig(
-                        temperature=self.temperature,
-                        max_output_tokens=self.max_tokens,
-                        top_p=0.95,
-                        top_k=40,
+                model = self._models[variant]
+                
+                with stage_timer("gemini_call"):
+                    response = model.generate_content(
+                        prompt,
+                        generation_config=self._generation_configs[variant],
+                        request_options=self._request_options(deadline)
                     )
-                )
+                self._breaker.record_success()
                 
                 # Check if response was blocked
                 if not response.text or response.text.strip() == "":
-                    print("⚠️  Empty response received")
+                    logger.warning("Empty response received")
                     
                     # Check for safety ratings
                     if hasattr(response, 'prompt_feedback'):
-                        print(f"Prompt feedback: {response.prompt_feedback}")
+                        logger.warning("Prompt feedback: %s", response.prompt_feedback)
                     
                     if hasattr(response, 'candidates') and response.candidates:
                         candidate = response.candidates[0]
                         if hasattr(candidate, 'safety_ratings'):
-                            print(f"Safety ratings: {candidate.safety_ratings}")
+                            logger.warning("Safety ratings: %s", candidate.safety_ratings)
                         if hasattr(candidate, 'finish_reason'):
-                            print(f"Finish reason: {candidate.finish_reason}")
+                            logger.warning("Finish reason: %s", candidate.finish_reason)
                     
                     # Try with simpler prompt
                     if attempt < max_retries - 1:
-                        print("🔄 Retrying with simplified prompt...")
-                        time.sleep(1)
+                        logger.info("Retrying with simplified prompt")
                         prompt = self._create_simple_prompt(question, context_text)
+                        variant = "simple"
+                        LLM_RETRIES.labels("empty").inc()
                         continue
                     else:
                         return self._create_fallback_answer(contexts)
@@ -93,35 +135,41 @@ class LLMService:
             
             except Exception as e:
                 error_msg = str(e)
-                print(f"❌ Error on attempt {attempt + 1}: {error_msg}")
+                logger.error("Error on attempt %d: %s", attempt + 1, error_msg)
                 
                 # Check for specific error types
-                if "safety" in error_msg.lower() or "blocked" in error_msg.lower():
-                    print("⚠️  Content blocked by safety filters")
+                error_kind = self._classify_error(error_msg)
+                self._record_error(error_kind)
+                if error_kind == "safety":
+                    logger.warning("Content blocked by safety filters")
                     if attempt < max_retries - 1:
-                        print("🔄 Retrying with educational framing...")
-                        time.sleep(1)
+                        logger.info("Retrying with educational framing")
                         prompt = self._create_educational_prompt(question, context_text)
+                        variant = "educational"
+                        LLM_RETRIES.labels("safety").inc()
                         continue
                     else:
                         return self._create_fallback_answer(contexts)
                 
-                elif "quota" in error_msg.lower() or "rate" in error_msg.lower():
-                    print("⚠️  Rate limit or quota exceeded")
-                    if attempt < max_retries - 1:
-                        time.sleep(2)
+                elif error_kind == "quota":
+                    logger.warning("Rate limit or quota exceeded")
+                    delay = self._retry_delay(attempt, error_kind, deadline) if attempt < max_retries - 1 else None
+                    if delay is not None:
+                        time.sleep(delay)
                         continue
                     else:
-                        return "I'm currently experiencing high demand. Please try again in a moment."
+                        FALLBACK_ANSWERS.labels("high_demand").inc()
+                        return HIGH_DEMAND_MESSAGE
                 
-                elif "api_key" in error_msg.lower():
-                    return "There's an issue with the API configuration. Please contact support."
+                elif error_kind == "api_key":
+                    FALLBACK_ANSWERS.labels("config_error").inc()
+                    return CONFIG_ERROR_MESSAGE
                 
                 else:
-                    import traceback
-                    traceback.print_exc()
-                    if attempt < max_retries - 1:
-                        time.sleep(1)
+                    logger.debug("Gemini call failed", exc_info=True)
+                    delay = self._retry_delay(attempt, error_kind, deadline) if attempt < max_retries - 1 else None
+                    if delay is not None:
+                        time.sleep(delay)
                         continue
                     else:
                         return self._create_fallback_answer(contexts)
@@ -129,35 +177,269 @@ class LLMService:
         # If all retries failed
         return self._create_fallback_answer(contexts)
     
-    def _build_context(self, contexts: List[Dict[str, Any]]) -> str:
-        """Build enriched context from retrieved documents"""
-        from config import Config
+    def submit_answer(self, question: str, contexts: List[Dict[str, Any]]) -> "Future[str]":
+        """Queue generate_answer on the bounded batch pool"""
+        return submit_with_context(self._batch_executor, self.generate_answer, question, contexts)
+    
+    async def generate_answer_async(
+        self,
+        question: str,
+        contexts: List[Dict[str, Any]],
+        max_retries: int = 2
+    ) -> str:
+        """
+        Awaitable generate_answer for the ASGI app, using Gemini's async
+        client so no thread is held while waiting on the model.
+        """
+        if not contexts:
+            return NO_CONTEXT_MESSAGE
         
-        context_parts = []
-        total_length = 0
+        context_text = self._build_context(contexts)
+        prompt = self._create_prompt(question, context_text, contexts)
+        variant = "main"
         
-        for idx, ctx in enumerate(contexts, 1):
-            metadata = ctx.get('metadata', {})
+        deadline = time.monotonic() + self.request_deadline
+        
+        for attempt in range(max_retries):
+            if not self._breaker.allow_request():
+                logger.warning("Gemini circuit open - serving fallback answer")
+                return self._create_fallback_answer(contexts, reason="circuit_open")
             
-            act_name = metadata.get('act_name', 'Unknown Act')
-            section = metadata.get('section_number', 'Unknown')
-            text = metadata.get('text_preview', '')
-            score = ctx.get('score', 0.0)
+            try:
+                logger.info("Attempt %d/%d - generating response (async)", attempt + 1, max_retries)
+                
+                model = self._models[variant]
+                with stage_timer("gemini_call"):
+                    response = await model.generate_content_async(
+                        prompt,
+                        generation_config=self._generation_configs[variant],
+                        request_options=self._request_options(deadline)
+                    )
+                self._breaker.record_success()
+                
+                if not response.text or response.text.strip() == "":
+                    logger.warning("Empty response received")
+                    if attempt < max_retries - 1:
+                        logger.info("Retrying with simplified prompt")
+                        prompt = self._create_simple_prompt(question, context_text)
+                        variant = "simple"
+                        LLM_RETRIES.labels("empty").inc()
+                        continue
+                    return self._create_fallback_answer(contexts)
+                
+                return response.text.strip()
             
-            # Build context entry
-            context_entry = f"""
-[Document {idx}] {act_name} - Section {section} (Relevance: {score:.2f})
-{text}
-"""
+            except asyncio.CancelledError:
+                # Client went away mid-call: no verdict on Gemini, free the probe
+                self._breaker.release()
+                raise
             
-            # Check if adding this would exceed max length
-            if total_length + len(context_entry) > Config.MAX_CONTEXT_LENGTH:
-                break
+            except Exception as e:
+                error_msg = str(e)
+                logger.error("Error on attempt %d: %s", attempt + 1, error_msg)
+                
+                error_kind = self._classify_error(error_msg)
+                self._record_error(error_kind)
+                if error_kind == "api_key":
+                    FALLBACK_ANSWERS.labels("config_error").inc()
+                    return CONFIG_ERROR_MESSAGE
+                
+                if attempt < max_retries - 1:
+                    if error_kind == "safety":
+                        logger.info("Retrying with educational framing")
+                        prompt = self._create_educational_prompt(question, context_text)
+                        variant = "educational"
+                        LLM_RETRIES.labels("safety").inc()
+                        continue
+                    delay = self._retry_delay(attempt, error_kind, deadline)
+                    if delay is not None:
+                        await asyncio.sleep(delay)
+                        continue
+                
+                if error_kind == "quota":
+                    FALLBACK_ANSWERS.labels("high_demand").inc()
+                    return HIGH_DEMAND_MESSAGE
+                return self._create_fallback_answer(contexts)
+        
+        return self._create_fallback_answer(contexts)
+    
+    def generate_answer_stream(
+        self,
+        question: str,
+        contexts: List[Dict[str, Any]],
+        max_retries: int = 2
+    ) -> Iterator[Tuple[str, str]]:
+        """
+        Stream the answer as ("chunk", text) events using Gemini streaming.
+        If an attempt fails after text was already sent, a ("reset", reason)
+        event tells the client to discard it before the retry or fallback
+        answer is streamed.
+        """
+        if not contexts:
+            yield ("chunk", NO_CONTEXT_MESSAGE)
+            return
+        
+        context_text = self._build_context(contexts)
+        prompt = self._create_prompt(question, context_text, contexts)
+        variant = "main"
+        
+        deadline = time.monotonic() + self.request_deadline
+        
+        for attempt in range(max_retries):
+            if not self._breaker.allow_request():
+                logger.warning("Gemini circuit open - serving fallback answer")
+                yield ("chunk", self._create_fallback_answer(contexts, reason="circuit_open"))
+                return
+            
+            sent_text = False
+            started = time.monotonic()
+            try:
+                logger.info("Attempt %d/%d - streaming response", attempt + 1, max_retries)
+                
+                model = self._models[variant]
+                response = model.generate_content(
+                    prompt,
+                    generation_config=self._generation_configs[variant],
+                    stream=True,
+                    request_options=self._request_options(deadline)
+                )
+                
+                try:
+                    for chunk in response:
+                        text = self._chunk_text(chunk)
+                        if text:
+                            sent_text = True
+                            yield ("chunk", text)
+                except GeneratorExit:
+                    # Client went away mid-stream; Gemini itself was fine
+                    self._breaker.record_success()
+                    raise
+                self._breaker.record_success()
+                observe_stage("gemini_stream", time.monotonic() - started)
+                
+                if sent_text:
+                    return
+                
+                logger.warning("Empty streamed response received")
+                if attempt < max_retries - 1:
+                    logger.info("Retrying with simplified prompt")
+                    prompt = self._create_simple_prompt(question, context_text)
+                    variant = "simple"
+                    LLM_RETRIES.labels("empty").inc()
+                    continue
+                yield ("chunk", self._create_fallback_answer(contexts))
+                return
             
-            context_parts.append(context_entry)
-            total_length += len(context_entry)
+            except Exception as e:
+                error_msg = str(e)
+                logger.error("Error on attempt %d: %s", attempt + 1, error_msg)
+                # Record before yielding: the client may disconnect at the yield
+                error_kind = self._classify_error(error_msg)
+                self._record_error(error_kind)
+                if sent_text:
+                    yield ("reset", "Answer generation was interrupted")
+                
+                if error_kind == "api_key":
+                    FALLBACK_ANSWERS.labels("config_error").inc()
+                    yield ("chunk", CONFIG_ERROR_MESSAGE)
+                    return
+                
+                if attempt < max_retries - 1:
+                    if error_kind == "safety":
+                        logger.info("Retrying with educational framing")
+                        prompt = self._create_educational_prompt(question, context_text)
+                        variant = "educational"
+                        LLM_RETRIES.labels("safety").inc()
+                        continue
+                    delay = self._retry_delay(attempt, error_kind, deadline)
+                    if delay is not None:
+                        time.sleep(delay)
+                        continue
+                
+                if error_kind == "quota":
+                    FALLBACK_ANSWERS.labels("high_demand").inc()
+                    yield ("chunk", HIGH_DEMAND_MESSAGE)
+                else:
+                    yield ("chunk", self._create_fallback_answer(contexts))
+                return
         
-        return "\n".join(context_parts)
+        yield ("chunk", self._create_fallback_answer(contexts))
+    
+    def _create_model(self):
+        """Gemini model with safety filters relaxed for legal content (built once per variant)"""
+        return genai.GenerativeModel(
+            self.model_name,
+            safety_settings={
+                'HARM_CATEGORY_HARASSMENT': 'BLOCK_NONE',
+                'HARM_CATEGORY_HATE_SPEECH': 'BLOCK_NONE',
+                'HARM_CATEGORY_SEXUALLY_EXPLICIT': 'BLOCK_NONE',
+                'HARM_CATEGORY_DANGEROUS_CONTENT': 'BLOCK_NONE',
+            }
+        )
+    
+    def _create_generation_config(self):
+        return genai.GenerationConfig(
+            temperature=self.temperature,
+            max_output_tokens=self.max_tokens,
+            top_p=0.95,
+            top_k=40,
+        )
+    
+    def _request_options(self, deadline: float) -> Dict[str, float]:
+        """Per-call timeout so a single attempt cannot outlive the request deadline"""
+        return {"timeout": max(deadline - time.monotonic(), 1.0)}
+    
+    def _retry_delay(self, attempt: int, error_kind: str, deadline: float) -> Optional[float]:
+        """
+        Jittered exponential backoff before the next attempt, or None if
+        waiting (plus a minimal attempt) would overrun the request deadline
+        """
+        base = 2.0 if error_kind == "quota" else 1.0
+        delay = backoff_delay(attempt, base, self.backoff_cap)
+        if time.monotonic() + delay + 1.0 > deadline:
+            logger.warning("Request deadline reached, not retrying")
+            return None
+        LLM_RETRIES.labels(error_kind).inc()
+        return delay
+    
+    def _record_error(self, error_kind: str):
+        """Safety blocks mean Gemini is healthy; anything else counts against the breaker"""
+        if error_kind == "safety":
+            self._breaker.record_success()
+        else:
+            self._breaker.record_failure()
+    
+    def breaker_stats(self) -> Dict[str, Any]:
+        return self._breaker.stats()
+    
+    def _classify_error(self, error_msg: str) -> str:
+        """Map a Gemini error message to one of: safety, quota, api_key, other"""
+        error_lower = error_msg.lower()
+        if "safety" in error_lower or "blocked" in error_lower:
+            return "safety"
+        if "quota" in error_lower or "rate" in error_lower:
+            return "quota"
+        if "api_key" in error_lower:
+            return "api_key"
+        return "other"
+    
+    def _chunk_text(self, chunk) -> str:
+        """Text of a streamed chunk; blocked chunks have no text"""
+        try:
+            return chunk.text or ""
+        except (ValueError, AttributeError):
+            return ""
+    
+    def is_generated_answer(self, answer: str) -> bool:
+        """True if the answer came from Gemini rather than a canned/fallback reply"""
+        if answer in (NO_CONTEXT_MESSAGE, HIGH_DEMAND_MESSAGE, CONFIG_ERROR_MESSAGE, NO_RESPONSE_MESSAGE):
+            return False
+        return not answer.startswith(FALLBACK_PREFIX)
+    
+    def _build_context(self, contexts: List[Dict[str, Any]]) -> str:
+        """Build enriched, token-budgeted context from retrieved documents"""
+        with stage_timer("context_build"):
+            return self._context_builder.build(contexts)
     
     def _create_prompt(self, question: str, context: str, contexts: List[Dict]) -> str:
         """Create optimized prompt for legal Q&A"""
@@ -219,13 +501,14 @@ Student Question: {question}
 
 Provide an educational explanation of the relevant legal provisions, citing specific sections."""
     
-    def _create_fallback_answer(self, contexts: List[Dict[str, Any]]) -> str:
+    def _create_fallback_answer(self, contexts: List[Dict[str, Any]], reason: str = "llm_failed") -> str:
         """Create fallback answer from contexts when LLM fails"""
+        FALLBACK_ANSWERS.labels(reason).inc()
         if not contexts:
-            return "I couldn't generate a response. Please try rephrasing your question."
+            return NO_RESPONSE_MESSAGE
         
         # Extract key information from contexts
-        answer_parts = ["Based on the retrieved legal documents:\n"]
+        answer_parts = [FALLBACK_PREFIX]
         
         for idx, ctx in enumerate(contexts[:3], 1):  # Use top 3
             metadata = ctx.get('metadata', {})
@@ -0,0 +1,340 @@
+from typing import List, Optional, Dict, Any, Iterator
+import numpy as np
+import threading
+import json
+import os
+
+class LocalMatch:
+    """Single search hit, shaped like a Pinecone match"""
+    __slots__ = ("id", "score", "metadata", "values")
+
+    def __init__(self, id: str, score: float, metadata: Optional[Dict[str, Any]] = None, values: Optional[List[float]] = None):
+        self.id = id
+        self.score = score
+        self.metadata = metadata
+        self.values = values
+
+
+class LocalQueryResponse:
+    """Query result, shaped like a Pinecone QueryResponse"""
+    __slots__ = ("matches", "namespace")
+
+    def __init__(self, matches: List[LocalMatch], namespace: str):
+        self.matches = matches
+        self.namespace = namespace
+
+
+class LocalFetchResponse:
+    """Fetch result, shaped like a Pinecone FetchResponse"""
+    __slots__ = ("vectors", "namespace")
+
+    def __init__(self, vectors: Dict[str, LocalMatch], namespace: str):
+        self.vectors = vectors
+        self.namespace = namespace
+
+
+class _Namespace:
+    """Vectors (memory-mapped), metadata and id -> row map for one namespace"""
+
+    def __init__(self, vectors: np.ndarray, ids: List[str], metadata: List[Dict[str, Any]], ivf: Optional[Dict[str, np.ndarray]] = None):
+        self.vectors = vectors
+        self.ids = ids
+        self.metadata = metadata
+        self.ivf = ivf
+        # Rebuilt whenever upsert()/delete() rewrite the namespace
+        self.positions = {vec_id: row for row, vec_id in enumerate(ids)}
+
+
+class LocalIndex:
+    """
+    Embedded vector index with the same query surface as a Pinecone Index.
+
+    Each namespace is stored in `index_dir` as:
+      <namespace>.vectors.npy  float32 (N x dim), loaded memory-mapped
+      <namespace>.meta.json    {"ids": [...], "metadata": [...]} aligned with vector rows
+      <namespace>.ivf.npz      optional IVF lists (centroids, order, offsets)
+
+    Vectors are expected to be L2-normalized so inner product equals cosine similarity.
+    Search is exact for small namespaces and IVF-approximate for namespaces with
+    at least `ivf_min_vectors` rows (0 disables IVF).
+    """
+
+    def __init__(self, index_dir: str, dimension: int = 768, nprobe: int = 8, ivf_min_vectors: int = 0):
+        self.index_dir = index_dir
+        self.dimension = dimension
+        self.nprobe = nprobe
+        self.ivf_min_vectors = ivf_min_vectors
+        self._namespaces: Dict[str, _Namespace] = {}
+        self._lock = threading.Lock()
+        os.makedirs(index_dir, exist_ok=True)
+        self._load_all()
+
+    # ------------------------------------------------------------------
+    # Loading / persistence
+    # ------------------------------------------------------------------
+
+    def _paths(self, namespace: str) -> Dict[str, str]:
+        base = os.path.join(self.index_dir, namespace)
+        return {
+            "vectors": f"{base}.vectors.npy",
+            "meta": f"{base}.meta.json",
+            "ivf": f"{base}.ivf.npz",
+        }
+
+    def _load_all(self):
+        for filename in sorted(os.listdir(self.index_dir)):
+            if filename.endswith(".vectors.npy"):
+                self._load_namespace(filename[:-len(".vectors.npy")])
+
+    def _load_namespace(self, namespace: str):
+        paths = self._paths(namespace)
+        if not os.path.exists(paths["vectors"]) or not os.path.exists(paths["meta"]):
+            return
+
+        vectors = np.load(paths["vectors"], mmap_mode="r")
+        with open(paths["meta"], "r", encoding="utf-8") as f:
+            meta = json.load(f)
+
+        ivf = None
+        if os.path.exists(paths["ivf"]):
+            with np.load(paths["ivf"]) as data:
+                ivf = {key: data[key] for key in ("centroids", "order", "offsets")}
+
+        self._namespaces[namespace] = _Namespace(vectors, meta["ids"], meta["metadata"], ivf)
+
+    def write_namespace(
+        self,
+        namespace: str,
+        ids: List[str],
+        vectors: np.ndarray,
+        metadata: List[Dict[str, Any]]
+    ):
+        """Replace a namespace's contents on disk and reload it memory-mapped"""
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or (len(vectors) and vectors.shape[1] != self.dimension):
+            raise ValueError(f"Expected vectors of shape (N, {self.dimension}), got {vectors.shape}")
+        if not (len(ids) == len(vectors) == len(metadata)):
+            raise ValueError("ids, vectors and metadata must have the same length")
+
+        paths = self._paths(namespace)
+        with self._lock:
+            # Release the old memory map before replacing its file
+            self._namespaces.pop(namespace, None)
+
+            tmp_vectors = paths["vectors"] + ".tmp"
+            with open(tmp_vectors, "wb") as f:
+                np.save(f, vectors)
+            os.replace(tmp_vectors, paths["vectors"])
+
+            tmp_meta = paths["meta"] + ".tmp"
+            with open(tmp_meta, "w", encoding="utf-8") as f:
+                json.dump({"ids": list(ids), "metadata": list(metadata)}, f, ensure_ascii=False)
+            os.replace(tmp_meta, paths["meta"])
+
+            # Any existing IVF lists no longer match the rows
+            if os.path.exists(paths["ivf"]):
+                os.remove(paths["ivf"])
+
+            self._load_namespace(namespace)
+
+        if self.ivf_min_vectors and len(ids) >= self.ivf_min_vectors:
+            self.build_ivf(namespace)
+
+    def build_ivf(self, namespace: str, n_lists: Optional[int] = None, iterations: int = 10, seed: int = 0):
+        """Build IVF (inverted file) lists with spherical k-means for approximate search"""
+        ns = self._namespaces.get(namespace)
+        if ns is None or len(ns.vectors) == 0:
+            return
+
+        vectors = np.asarray(ns.vectors, dtype=np.float32)
+        n = len(vectors)
+        n_lists = n_lists or max(1, int(np.sqrt(n)))
+        n_lists = min(n_lists, n)
+
+        rng = np.random.default_rng(seed)
+        centroids = vectors[rng.choice(n, size=n_lists, replace=False)].copy()
+
+        for _ in range(iterations):
+            assignments = np.argmax(vectors @ centroids.T, axis=1)
+            for list_id in range(n_lists):
+                members = vectors[assignments == list_id]
+                if len(members):
+                    centroid = members.sum(axis=0)
+                    centroids[list_id] = centroid / (np.linalg.norm(centroid) or 1.0)
+
+        assignments = np.argmax(vectors @ centroids.T, axis=1)
+        order = np.argsort(assignments, kind="stable").astype(np.int64)
+        counts = np.bincount(assignments, minlength=n_lists)
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+        np.savez(self._paths(namespace)["ivf"], centroids=centroids, order=order, offsets=offsets)
+        with self._lock:
+            ns.ivf = {"centroids": centroids, "order": order, "offsets": offsets}
+
+    # ------------------------------------------------------------------
+    # Pinecone-compatible surface
+    # ------------------------------------------------------------------
+
+    def upsert(self, vectors: List[Dict[str, Any]], namespace: str = ""):
+        """Insert or overwrite records given as {"id", "values", "metadata"} dicts"""
+        ns = self._namespaces.get(namespace)
+        ids = list(ns.ids) if ns else []
+        metadata = list(ns.metadata) if ns else []
+        matrix = [np.asarray(ns.vectors, dtype=np.float32)] if ns and len(ns.vectors) else []
+
+        positions = dict(ns.positions) if ns else {}
+        new_rows = []
+        updates = {}
+        for record in vectors:
+            values = np.asarray(record["values"], dtype=np.float32)
+            if record["id"] in positions:
+                updates[positions[record["id"]]] = values
+                metadata[positions[record["id"]]] = record.get("metadata", {})
+            else:
+                positions[record["id"]] = len(ids)
+                ids.append(record["id"])
+                metadata.append(record.get("metadata", {}))
+                new_rows.append(values)
+
+        if new_rows:
+            matrix.append(np.vstack(new_rows))
+        combined = np.vstack(matrix) if matrix else np.zeros((0, self.dimension), dtype=np.float32)
+        if updates:
+            combined = np.array(combined, copy=True)
+            for row, values in updates.items():
+                combined[row] = values
+
+        self.write_namespace(namespace, ids, combined, metadata)
+        return {"upserted_count": len(vectors)}
+
+    def delete(self, ids: List[str], namespace: str = ""):
+        """Delete records by id"""
+        ns = self._namespaces.get(namespace)
+        if ns is None:
+            return {}
+
+        to_delete = set(ids)
+        keep = [i for i, vec_id in enumerate(ns.ids) if vec_id not in to_delete]
+        self.write_namespace(
+            namespace,
+            [ns.ids[i] for i in keep],
+            np.asarray(ns.vectors, dtype=np.float32)[keep],
+            [ns.metadata[i] for i in keep]
+        )
+        return {}
+
+    def query(
+        self,
+        vector: List[float],
+        top_k: int = 10,
+        include_metadata: bool = False,
+        namespace: str = "",
+        include_values: bool = False,
+        **kwargs
+    ) -> LocalQueryResponse:
+        """Top-k inner-product search in one namespace"""
+        return self.query_batch(
+            [vector],
+            top_k=top_k,
+            include_metadata=include_metadata,
+            namespace=namespace,
+            include_values=include_values
+        )[0]
+
+    def query_batch(
+        self,
+        vectors: List[List[float]],
+        top_k: int = 10,
+        include_metadata: bool = False,
+        namespace: str = "",
+        include_values: bool = False
+    ) -> List[LocalQueryResponse]:
+        """Vectorized top-k search for several query vectors in one namespace"""
+        ns = self._namespaces.get(namespace)
+        if ns is None or len(ns.vectors) == 0:
+            return [LocalQueryResponse([], namespace) for _ in vectors]
+
+        queries = np.asarray(vectors, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries[None, :]
+
+        responses = []
+        if ns.ivf is None:
+            scores = queries @ ns.vectors.T
+            for row in scores:
+                responses.append(self._to_response(ns, namespace, np.arange(len(row)), row, top_k, include_metadata, include_values))
+        else:
+            for query in queries:
+                candidates = self._ivf_candidates(ns, query)
+                row = ns.vectors[candidates] @ query
+                responses.append(self._to_response(ns, namespace, candidates, row, top_k, include_metadata, include_values))
+
+        return responses
+
+    def _ivf_candidates(self, ns: _Namespace, query: np.ndarray) -> np.ndarray:
+        centroids = ns.ivf["centroids"]
+        order = ns.ivf["order"]
+        offsets = ns.ivf["offsets"]
+
+        nprobe = min(self.nprobe, len(centroids))
+        probe_lists = np.argpartition(-(centroids @ query), nprobe - 1)[:nprobe]
+        return np.sort(np.concatenate([order[offsets[i]:offsets[i + 1]] for i in probe_lists]))
+
+    def _to_response(
+        self,
+        ns: _Namespace,
+        namespace: str,
+        rows: np.ndarray,
+        scores: np.ndarray,
+        top_k: int,
+        include_metadata: bool,
+        include_values: bool
+    ) -> LocalQueryResponse:
+        k = min(top_k, len(scores))
+        if k == 0:
+            return LocalQueryResponse([], namespace)
+
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+
+        matches = []
+        for i in top:
+            row = int(rows[i])
+            matches.append(LocalMatch(
+                id=ns.ids[row],
+                score=float(scores[i]),
+                metadata=ns.metadata[row] if include_metadata else None,
+                values=ns.vectors[row].tolist() if include_values else None
+            ))
+        return LocalQueryResponse(matches, namespace)
+
+    def list(self, namespace: str = "", limit: int = 100) -> Iterator[List[str]]:
+        """Yield pages of record ids in a namespace"""
+        ns = self._namespaces.get(namespace)
+        ids = list(ns.ids) if ns else []
+        for start in range(0, len(ids), limit):
+            yield ids[start:start + limit]
+
+    def fetch(self, ids: List[str], namespace: str = "") -> LocalFetchResponse:
+        """Fetch records (values and metadata) by id"""
+        ns = self._namespaces.get(namespace)
+        if ns is None:
+            return LocalFetchResponse({}, namespace)
+
+        vectors = {}
+        for vec_id in ids:
+            row = ns.positions.get(vec_id)
+            if row is not None:
+                vectors[vec_id] = LocalMatch(vec_id, 0.0, ns.metadata[row], ns.vectors[row].tolist())
+        return LocalFetchResponse(vectors, namespace)
+
+    def describe_index_stats(self) -> Dict[str, Any]:
+        namespaces = {
+            name: {"vector_count": len(ns.ids)}
+            for name, ns in self._namespaces.items()
+        }
+        return {
+            "dimension": self.dimension,
+            "namespaces": namespaces,
+            "total_vector_count": sum(ns["vector_count"] for ns in namespaces.values())
+        }
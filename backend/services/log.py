@@ -0,0 +1,102 @@
+from typing import Optional
+from logging.handlers import QueueHandler, QueueListener
+import contextvars
+import logging
+import atexit
+import queue
+import random
+import json
+import sys
+import uuid
+
+ROOT_LOGGER = "legal_mitra"
+
+# Per-request context, copied into worker threads by submit_with_context
+request_id_var: contextvars.ContextVar[str] = contextvars.ContextVar("request_id", default="-")
+debug_sampled_var: contextvars.ContextVar[bool] = contextvars.ContextVar("debug_sampled", default=True)
+
+_STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+_listener: Optional[QueueListener] = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger under the application root, e.g. get_logger("retrieval")"""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def start_request(request_id: Optional[str] = None, debug_sample_rate: float = 1.0) -> str:
+    """Bind a correlation ID (and the debug sampling decision) to the current context"""
+    request_id = request_id or uuid.uuid4().hex[:12]
+    request_id_var.set(request_id)
+    debug_sampled_var.set(random.random() < debug_sample_rate)
+    return request_id
+
+
+def submit_with_context(executor, fn, *args, **kwargs):
+    """executor.submit that carries the caller's request ID into the worker thread"""
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
+
+def debug_enabled(logger: logging.Logger) -> bool:
+    """Guard for per-match tracing: False unless DEBUG is on and this request is sampled"""
+    return logger.isEnabledFor(logging.DEBUG) and debug_sampled_var.get()
+
+
+class RequestContextFilter(logging.Filter):
+    """Stamps records with the request ID and drops debug lines of unsampled requests"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return record.levelno > logging.DEBUG or debug_sampled_var.get()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; `extra=` fields are included as keys"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _STANDARD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def configure_logging(level: str = "INFO", fmt: str = "text"):
+    """
+    Route application logs through a QueueHandler so request threads only
+    enqueue records; a single listener thread formats and writes them.
+    Safe to call more than once.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    if fmt == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter("%(asctime)s %(levelname)-7s [%(request_id)s] %(name)s: %(message)s")
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(formatter)
+
+    log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+    queue_handler = QueueHandler(log_queue)
+    # Filter before enqueueing so the request ID is captured on the calling thread
+    queue_handler.addFilter(RequestContextFilter())
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(level.upper())
+    root.handlers = [queue_handler]
+    root.propagate = False
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=False)
+    _listener.start()
+    atexit.register(_listener.stop)
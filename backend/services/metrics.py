@@ -0,0 +1,91 @@
+from prometheus_client import Counter, Histogram, CollectorRegistry, CONTENT_TYPE_LATEST, generate_latest
+from prometheus_client import multiprocess
+from contextlib import contextmanager
+from typing import Callable, List
+import time
+import os
+
+# Sub-millisecond stages (ranking, cache lookups) up to slow Gemini calls
+_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+STAGE_SECONDS = Histogram(
+    "legal_mitra_stage_seconds",
+    "Time spent in each pipeline stage",
+    ["stage"],
+    buckets=_LATENCY_BUCKETS
+)
+REQUEST_SECONDS = Histogram(
+    "legal_mitra_request_seconds",
+    "End-to-end request latency",
+    ["endpoint"],
+    buckets=_LATENCY_BUCKETS
+)
+NAMESPACE_QUERY_SECONDS = Histogram(
+    "legal_mitra_namespace_query_seconds",
+    "Vector index query latency per namespace",
+    ["namespace"],
+    buckets=_LATENCY_BUCKETS
+)
+
+CACHE_LOOKUPS = Counter(
+    "legal_mitra_cache_lookups_total",
+    "Cache lookups by cache and result (hit/miss)",
+    ["cache", "result"]
+)
+LLM_RETRIES = Counter(
+    "legal_mitra_llm_retries_total",
+    "Gemini retries by reason",
+    ["reason"]
+)
+FALLBACK_ANSWERS = Counter(
+    "legal_mitra_fallback_answers_total",
+    "Answers served without Gemini output, by reason",
+    ["reason"]
+)
+BELOW_THRESHOLD_MATCHES = Counter(
+    "legal_mitra_below_threshold_matches_total",
+    "Dense matches dropped by the score threshold",
+    ["namespace"]
+)
+RERANK_BUDGET_EXHAUSTED = Counter(
+    "legal_mitra_rerank_budget_exhausted_total",
+    "Cross-encoder re-ranks stopped early by the latency budget"
+)
+HEDGED_QUERIES = Counter(
+    "legal_mitra_hedged_queries_total",
+    "Duplicate namespace queries sent by hedging, by winner",
+    ["winner"]
+)
+
+
+# In-process observers of raw stage timings (used by the benchmark harness)
+_stage_listeners: List[Callable[[str, float], None]] = []
+
+
+def add_stage_listener(listener: Callable[[str, float], None]):
+    _stage_listeners.append(listener)
+
+
+def observe_stage(stage: str, seconds: float):
+    STAGE_SECONDS.labels(stage).observe(seconds)
+    for listener in _stage_listeners:
+        listener(stage, seconds)
+
+
+@contextmanager
+def stage_timer(stage: str):
+    """Context manager that observes a stage's duration (works around awaits too)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe_stage(stage, time.perf_counter() - started)
+
+
+def render_metrics():
+    """(body, content type) for the /metrics endpoint; aggregates gunicorn workers in multiprocess mode"""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,47 @@
+from typing import List, Optional
+import numpy as np
+
+
+def mmr_select(
+    vectors: np.ndarray,
+    relevance: np.ndarray,
+    top_k: int,
+    lambda_: float = 0.7,
+    groups: Optional[np.ndarray] = None
+) -> List[int]:
+    """
+    Maximal marginal relevance: greedily pick the candidate maximizing
+    lambda * relevance - (1 - lambda) * (max similarity to anything picked).
+
+    vectors    (n x dim) L2-normalized candidate vectors
+    relevance  (n,) candidate scores; min-max scaled to 0-1 here
+    groups     optional (n,) integer labels; a picked candidate counts as an
+               exact duplicate (similarity 1) of every candidate sharing its label
+
+    The similarity matrix is computed once; each pick is an O(n) update.
+    Returns candidate positions in selection order.
+    """
+    n = len(relevance)
+    k = min(top_k, n)
+    if k == 0:
+        return []
+
+    relevance = np.asarray(relevance, dtype=np.float32)
+    spread = float(relevance.max() - relevance.min())
+    relevance = (relevance - relevance.min()) / spread if spread > 0 else np.ones(n, dtype=np.float32)
+
+    similarity = vectors @ vectors.T
+    max_similarity = np.full(n, -np.inf, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+
+    selected = [int(np.argmax(relevance))]
+    for _ in range(k - 1):
+        last = selected[-1]
+        available[last] = False
+        np.maximum(max_similarity, similarity[last], out=max_similarity)
+        if groups is not None:
+            max_similarity[groups == groups[last]] = 1.0
+        gains = lambda_ * relevance - (1.0 - lambda_) * max_similarity
+        gains[~available] = -np.inf
+        selected.append(int(np.argmax(gains)))
+    return selected
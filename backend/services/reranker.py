@@ -0,0 +1,135 @@
+from typing import List, Dict, Any, Tuple
+from collections import OrderedDict
+from services.log import get_logger
+from services.metrics import CACHE_LOOKUPS, RERANK_BUDGET_EXHAUSTED
+import threading
+import time
+import re
+
+logger = get_logger("reranker")
+
+class CrossEncoderReranker:
+    """
+    Re-scores (question, provision) pairs with a CPU cross-encoder.
+
+    Candidates are scored best-first in batches; before each batch the
+    elapsed time plus the last batch's duration is checked against
+    `budget_ms`, so a slow request stops early instead of blowing its
+    latency budget. Scored candidates come first (by cross-encoder score),
+    unscored ones keep their incoming order behind them. Cross-encoder logits
+    are not on the retrieval score scale, so the new order is carried as a
+    position rather than by overwriting "score". Pair scores are kept in an
+    LRU so repeated questions skip the model.
+    """
+
+    def __init__(
+        self,
+        model_name: str,
+        batch_size: int = 8,
+        budget_ms: float = 150.0,
+        cache_size: int = 10000,
+        max_length: int = 256
+    ):
+        # Imported lazily so the model is only loaded when re-ranking is enabled
+        from sentence_transformers import CrossEncoder
+        self._model = CrossEncoder(model_name, max_length=max_length, device="cpu")
+        self.batch_size = batch_size
+        self.budget = budget_ms / 1000.0
+        self.cache_size = cache_size
+        self._scores: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.budget_exhausted = 0
+
+    @staticmethod
+    def _normalize(question: str) -> str:
+        return re.sub(r'\s+', ' ', question).strip().lower()
+
+    @staticmethod
+    def _passage(result: Dict[str, Any]) -> str:
+        metadata = result.get('metadata', {})
+        text = metadata.get('text') or metadata.get('text_preview', '')
+        return f"{metadata.get('act_short_name', '')} Section {metadata.get('section_number', '')}: {text}"
+
+    def _cached(self, key: Tuple[str, str]):
+        with self._lock:
+            score = self._scores.get(key)
+            if score is None:
+                self.misses += 1
+                CACHE_LOOKUPS.labels("rerank", "miss").inc()
+                return None
+            self._scores.move_to_end(key)
+            self.hits += 1
+            CACHE_LOOKUPS.labels("rerank", "hit").inc()
+            return score
+
+    def _store(self, keys: List[Tuple[str, str]], scores):
+        with self._lock:
+            for key, score in zip(keys, scores):
+                self._scores[key] = float(score)
+                self._scores.move_to_end(key)
+            while len(self._scores) > self.cache_size:
+                self._scores.popitem(last=False)
+
+    def rerank(self, question: str, results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Reorder `results` (already in retrieval order) by cross-encoder score.
+        Every result gets "rerank_position" (0 = best), scored ones also the
+        raw "rerank_score"; "score" keeps the retrieval score.
+        """
+        if not results:
+            return results
+
+        started = time.perf_counter()
+        query = self._normalize(question)
+        scores: Dict[int, float] = {}
+        pending = []
+        for position, result in enumerate(results):
+            score = self._cached((query, result['id']))
+            if score is None:
+                pending.append(position)
+            else:
+                scores[position] = score
+
+        last_batch = 0.0
+        for start in range(0, len(pending), self.batch_size):
+            elapsed = time.perf_counter() - started
+            if elapsed + last_batch > self.budget:
+                self.budget_exhausted += 1
+                RERANK_BUDGET_EXHAUSTED.inc()
+                logger.info("Re-rank budget used after %d of %d candidates", len(scores), len(results))
+                break
+            batch = pending[start:start + self.batch_size]
+            batch_started = time.perf_counter()
+            batch_scores = self._model.predict(
+                [(question, self._passage(results[position])) for position in batch],
+                batch_size=len(batch),
+                show_progress_bar=False
+            )
+            last_batch = time.perf_counter() - batch_started
+            self._store([(query, results[position]['id']) for position in batch], batch_scores)
+            scores.update(zip(batch, (float(score) for score in batch_scores)))
+
+        scored = sorted(scores, key=lambda position: scores[position], reverse=True)
+        unscored = [position for position in range(len(results)) if position not in scores]
+        reranked = []
+        for position in scored:
+            result = results[position]
+            result['rerank_score'] = round(scores[position], 4)
+            reranked.append(result)
+        reranked.extend(results[position] for position in unscored)
+        for rerank_position, result in enumerate(reranked):
+            result['rerank_position'] = rerank_position
+        return reranked
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._scores),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "budget_exhausted": self.budget_exhausted,
+            }
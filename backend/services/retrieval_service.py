@@ -1,12 +1,37 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from pinecone import Pinecone, Index
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED, TimeoutError as FuturesTimeoutError
+from services.index_stats_cache import IndexStatsCache
+from services.section_index import SectionIndex
+from services.bm25_index import BM25Index
+from services.latency_tracker import LatencyTracker
+from services.mmr import mmr_select
+from services.concordance import SectionConcordance
+from services.log import get_logger, debug_enabled, submit_with_context
+from services.metrics import stage_timer, observe_stage, NAMESPACE_QUERY_SECONDS, BELOW_THRESHOLD_MATCHES, HEDGED_QUERIES
+import numpy as np
+import contextvars
+import threading
+import time
+import asyncio
 import re
 
+logger = get_logger("retrieval")
+
 class RetrievalService:    
     _instance = None
     _pinecone_client = None
     _index = None
+    _executor = None
+    _stats_cache = None
+    _section_index = None
+    _bm25_index = None
+    _corpus_index_error = None
+    _latency = None
+    _reranker = None
+    _concordance = None
+    _hedge_executor = None
     
     def __new__(cls):
         if cls._instance is None:
@@ -14,23 +39,105 @@ class RetrievalService:
         return cls._instance
     
     def __init__(self):
-        if self._pinecone_client is None:
+        if self._index is None:
             from config import Config
-            print(f"Connecting to Pinecone index: {Config.INDEX_NAME}")
-            self._pinecone_client = Pinecone(api_key=Config.PINECONE_API_KEY)
-            self._index = self._pinecone_client.Index(Config.INDEX_NAME)
-            print("Pinecone connected")
+            if Config.RETRIEVAL_BACKEND == "local":
+                from services.local_index import LocalIndex
+                logger.info("Loading local vector index: %s", Config.LOCAL_INDEX_DIR)
+                RetrievalService._index = LocalIndex(
+                    Config.LOCAL_INDEX_DIR,
+                    dimension=Config.EMBEDDING_DIM,
+                    nprobe=Config.LOCAL_INDEX_NPROBE,
+                    ivf_min_vectors=Config.LOCAL_INDEX_IVF_MIN_VECTORS
+                )
+            else:
+                logger.info("Connecting to Pinecone index: %s", Config.INDEX_NAME)
+                RetrievalService._pinecone_client = Pinecone(api_key=Config.PINECONE_API_KEY)
+                RetrievalService._index = self._pinecone_client.Index(Config.INDEX_NAME)
+            self._namespace_timeout = Config.NAMESPACE_QUERY_TIMEOUT
+            self._batch_chunk_size = Config.BATCH_QUERY_CHUNK_SIZE
+            # Namespace list and vector counts, shared by retrieve() and health checks
+            RetrievalService._stats_cache = IndexStatsCache(
+                self._fetch_index_stats,
+                ttl=Config.INDEX_STATS_TTL,
+                max_stale=Config.INDEX_STATS_MAX_STALE
+            )
+            # Bounds each index call, so a hung query frees its pool thread
+            self._query_args = {"_request_timeout": self._namespace_timeout}
+            # Shared pool for namespace fan-out, reused across requests; at
+            # least one fan-out's worth of headroom above the namespace count
+            RetrievalService._executor = ThreadPoolExecutor(
+                max_workers=max(Config.NAMESPACE_QUERY_WORKERS, 2 * len(self.get_available_namespaces())),
+                thread_name_prefix="pinecone-query"
+            )
+            # Recent per-namespace query latencies; they drive hedging
+            RetrievalService._latency = LatencyTracker(
+                window=Config.LATENCY_WINDOW,
+                min_samples=Config.HEDGE_MIN_SAMPLES
+            )
+            self._hedge_percentile = Config.HEDGE_PERCENTILE
+            self._hedge_min_delay = Config.HEDGE_MIN_DELAY_MS / 1000.0
+            self.hedges_sent = 0
+            self.hedge_wins = 0
+            if Config.HEDGE_ENABLED:
+                # Separate pool: fan-out threads wait here while primary and hedge race
+                RetrievalService._hedge_executor = ThreadPoolExecutor(
+                    max_workers=Config.NAMESPACE_QUERY_WORKERS * 2,
+                    thread_name_prefix="pinecone-hedge"
+                )
+            self._dense_overfetch = Config.DENSE_OVERFETCH
+            self._namespace_detection = Config.NAMESPACE_DETECTION_ENABLED
+            self._diversify = Config.DIVERSIFY_RESULTS
+            self._mmr_lambda = Config.MMR_LAMBDA
+            self._rerank_top_n = Config.RERANK_TOP_N
+            if Config.RERANK_ENABLED:
+                from services.reranker import CrossEncoderReranker
+                logger.info("Loading re-ranking model: %s", Config.RERANK_MODEL)
+                RetrievalService._reranker = CrossEncoderReranker(
+                    Config.RERANK_MODEL,
+                    batch_size=Config.RERANK_BATCH_SIZE,
+                    budget_ms=Config.RERANK_BUDGET_MS,
+                    cache_size=Config.RERANK_CACHE_SIZE,
+                    max_length=Config.RERANK_MAX_LENGTH
+                )
+            self._hybrid_enabled = Config.HYBRID_SEARCH_ENABLED
+            self._fusion_method = Config.FUSION_METHOD
+            self._fusion_weights = (Config.FUSION_DENSE_WEIGHT, Config.FUSION_BM25_WEIGHT)
+            self._rrf_k = Config.FUSION_RRF_K
+            if self._hybrid_enabled:
+                # Keyword matches cover recall, so dense search needs less over-fetch
+                self._dense_overfetch = Config.HYBRID_DENSE_OVERFETCH
+            
+            # Corpus-wide in-memory indexes, loaded once in the background
+            self._section_lookup_enabled = Config.SECTION_INDEX_ENABLED
+            if Config.SECTION_INDEX_ENABLED or self._hybrid_enabled:
+                RetrievalService._section_index = SectionIndex()
+                if Config.CONCORDANCE_PATH:
+                    try:
+                        RetrievalService._concordance = SectionConcordance(Config.CONCORDANCE_PATH)
+                    except (OSError, ValueError) as e:
+                        logger.warning("Section concordance not loaded from %s: %s", Config.CONCORDANCE_PATH, e)
+                if self._hybrid_enabled:
+                    RetrievalService._bm25_index = BM25Index(k1=Config.BM25_K1, b=Config.BM25_B)
+                threading.Thread(
+                    target=self._build_corpus_indexes,
+                    args=(self.get_available_namespaces(),),
+                    name="corpus-index-build",
+                    daemon=True
+                ).start()
+            logger.info("Vector index ready (%s)", Config.RETRIEVAL_BACKEND)
     
     def _extract_section_number(self, query: str) -> Optional[str]:
         """Extract section/article number from query if present"""
+        # Letter suffixes (21A, 498A, 376AB) are part of the number
         patterns = [
-            r'(?:section|article|sec)\s+(\d{1,3}[A-Z]?)',
-            r'\b(\d{1,3}[A-Z]?)\s+(?:ipc|bns|crpc|article)',
-            r'(?:ipc|bns|crpc)\s+(\d{1,3}[A-Z]?)',
+            r'\b(?:section|article|sec)\s+(\d{1,3}[a-zA-Z]{0,2})\b',
+            r'\b(\d{1,3}[a-zA-Z]{0,2})\s+(?:ipc|bnss|bns|crpc|article)\b',
+            r'\b(?:ipc|bnss|bns|crpc)\s+(\d{1,3}[a-zA-Z]{0,2})\b',
         ]
         
         for pattern in patterns:
-            match = re.search(pattern, query.lower())
+            match = re.search(pattern, query, re.IGNORECASE)
             if match:
                 return match.group(1).upper()
         
@@ -49,6 +156,7 @@ class RetrievalService:
             'ipc': [r'\bipc\b', r'indian penal code'],
             'bns': [r'\bbns\b', r'bharatiya nyaya sanhita', r'bhartiya nyaya sanhita'],
             'crpc': [r'\bcrpc\b', r'criminal procedure code', r'code of criminal procedure'],
+            'bnss': [r'\bbnss\b', r'bharatiya nagarik suraksha sanhita'],
             'iea': [r'\biea\b', r'evidence act', r'indian evidence act'],
             'constitution': [r'\bconstitution\b', r'article \d+'],
             'hma': [r'\bhma\b', r'hindu marriage act'],
@@ -73,80 +181,527 @@ class RetrievalService:
         """
         Retrieve relevant documents from Pinecone with query-aware ranking
         """
+        plan = self._plan_retrieval(query_embedding, top_k, namespaces, query_text)
+        if plan is None:
+            return []
+        namespaces, target_section, exact_results, fetch_k = plan
+        
+        all_results = []
+        started = time.monotonic()
+        
+        # Query all namespaces in parallel; merge results as they arrive
+        futures = {
+            submit_with_context(
+                self._executor,
+                self._query_namespace,
+                namespace,
+                query_embedding,
+                fetch_k,
+                score_threshold,
+                target_section
+            ): namespace
+            for namespace in namespaces
+        }
+        
+        try:
+            for future in as_completed(futures, timeout=self._namespace_timeout):
+                namespace = futures[future]
+                try:
+                    all_results.extend(future.result())
+                except Exception as e:
+                    logger.warning("Error querying namespace %s: %s", namespace, e)
+        except FuturesTimeoutError:
+            for future, namespace in futures.items():
+                if not future.done():
+                    future.cancel()
+                    logger.warning("Namespace %s timed out after %ss, skipping", namespace, self._namespace_timeout)
+        observe_stage("namespace_fanout", time.monotonic() - started)
+        
+        return self._rank_results(all_results, exact_results, namespaces, target_section, top_k, query_text)
+    
+    async def retrieve_async(
+        self,
+        query_embedding: List[float],
+        top_k: int = 10,
+        namespaces: Optional[List[str]] = None,
+        score_threshold: float = 0.3,
+        query_text: str = ""
+    ) -> List[Dict[str, Any]]:
+        """
+        Awaitable retrieve() for the ASGI app: namespace queries are awaited
+        without holding the event loop, with the same timeout and ranking.
+        Planning (index stats, section lookup) and ranking (BM25, MMR,
+        cross-encoder) block, so they run in worker threads too.
+        """
+        plan = await asyncio.to_thread(self._plan_retrieval, query_embedding, top_k, namespaces, query_text)
+        if plan is None:
+            return []
+        namespaces, target_section, exact_results, fetch_k = plan
+        
+        loop = asyncio.get_running_loop()
+        tasks = {
+            namespace: asyncio.ensure_future(loop.run_in_executor(
+                self._executor,
+                contextvars.copy_context().run,
+                self._query_namespace,
+                namespace,
+                query_embedding,
+                fetch_k,
+                score_threshold,
+                target_section
+            ))
+            for namespace in namespaces
+        }
+        started = time.monotonic()
+        done, pending = await asyncio.wait(tasks.values(), timeout=self._namespace_timeout)
+        observe_stage("namespace_fanout", time.monotonic() - started)
+        
         all_results = []
+        for namespace, task in tasks.items():
+            if task in pending:
+                task.cancel()
+                logger.warning("Namespace %s timed out after %ss, skipping", namespace, self._namespace_timeout)
+            elif task.exception() is not None:
+                logger.warning("Error querying namespace %s: %s", namespace, task.exception())
+            else:
+                all_results.extend(task.result())
+        
+        return await asyncio.to_thread(
+            self._rank_results, all_results, exact_results, namespaces, target_section, top_k, query_text
+        )
+    
+    def retrieve_batch(
+        self,
+        query_embeddings: List[List[float]],
+        query_texts: List[str],
+        top_k: int = 10,
+        namespaces: Optional[List[str]] = None,
+        score_threshold: float = 0.3,
+        timeout: Optional[float] = None
+    ) -> Tuple[List[List[Dict[str, Any]]], List[List[str]]]:
+        """
+        retrieve() for many questions at once, results in input order.
+        
+        Queries are grouped by namespace and each group is sent as chunks of
+        up to `_batch_chunk_size` vectors, run concurrently on the fan-out
+        pool (LocalIndex answers a whole chunk with one matrix product).
+        Returns (results, failed_namespaces): per question, its ranked
+        results and the namespaces whose request failed or timed out.
+        
+        Batch requests bypass the latency tracker and hedging on purpose: a
+        chunk's latency grows with its size and would skew the single-query
+        percentiles that hedging thresholds come from.
+        """
+        plans = [
+            self._plan_retrieval(embedding, top_k, namespaces, text)
+            for embedding, text in zip(query_embeddings, query_texts)
+        ]
+        
+        groups = defaultdict(list)
+        for item, plan in enumerate(plans):
+            if plan is None:
+                continue
+            for namespace in plan[0]:
+                groups[namespace].append(item)
         
+        futures = {}
+        for namespace, items in groups.items():
+            for start in range(0, len(items), self._batch_chunk_size):
+                chunk = items[start:start + self._batch_chunk_size]
+                future = submit_with_context(
+                    self._executor,
+                    self._query_namespace_batch,
+                    namespace,
+                    [query_embeddings[item] for item in chunk],
+                    max(plans[item][3] for item in chunk)
+                )
+                futures[future] = (namespace, chunk)
+        
+        logger.info("Batch retrieve: %d questions, %d namespace requests", len(query_texts), len(futures))
+        
+        all_results = [[] for _ in query_texts]
+        failed_namespaces = [[] for _ in query_texts]
+        collected = set()
+        try:
+            for future in as_completed(futures, timeout=timeout):
+                collected.add(future)
+                namespace, chunk = futures[future]
+                try:
+                    responses = future.result()
+                except Exception as e:
+                    logger.warning("Error querying namespace %s: %s", namespace, e)
+                    for item in chunk:
+                        failed_namespaces[item].append(namespace)
+                    continue
+                for item, matches in zip(chunk, responses):
+                    _, target_section, _, fetch_k = plans[item]
+                    all_results[item].extend(
+                        self._collect_matches(namespace, matches[:fetch_k], score_threshold, target_section)
+                    )
+        except FuturesTimeoutError:
+            for future, (namespace, chunk) in futures.items():
+                if future not in collected:
+                    future.cancel()
+                    logger.warning("Batch request to namespace %s timed out after %ss, skipping", namespace, timeout)
+                    for item in chunk:
+                        failed_namespaces[item].append(namespace)
+        
+        ranked = []
+        for item, plan in enumerate(plans):
+            if plan is None:
+                ranked.append([])
+                continue
+            item_namespaces, target_section, exact_results, _ = plan
+            ranked.append(self._rank_results(
+                all_results[item], exact_results, item_namespaces, target_section, top_k, query_texts[item]
+            ))
+        return ranked, failed_namespaces
+    
+    def _query_namespace_batch(
+        self,
+        namespace: str,
+        query_embeddings: List[List[float]],
+        fetch_k: int
+    ) -> List[list]:
+        """Matches for several query vectors in one namespace"""
+        if hasattr(self._index, "query_batch"):
+            responses = self._index.query_batch(
+                vectors=query_embeddings,
+                top_k=fetch_k,
+                include_metadata=True,
+                include_values=self._needs_match_values(),
+                namespace=namespace
+            )
+        else:
+            responses = [
+                self._index.query(
+                    vector=embedding,
+                    top_k=fetch_k,
+                    include_metadata=True,
+                    include_values=self._needs_match_values(),
+                    namespace=namespace,
+                    **self._query_args
+                )
+                for embedding in query_embeddings
+            ]
+        return [response.matches for response in responses]
+    
+    def _plan_retrieval(
+        self,
+        query_embedding: List[float],
+        top_k: int,
+        namespaces: Optional[List[str]],
+        query_text: str
+    ) -> Optional[tuple]:
+        """
+        Resolve namespaces, target section, exact section-index hits and the
+        per-namespace fetch size. Returns None when there is nothing to search.
+        """
         # Extract specific section number if mentioned
         target_section = self._extract_section_number(query_text)
         if target_section:
-            print(f"🎯 Detected target section: {target_section}")
+            logger.info("Detected target section: %s", target_section)
         
         # Detect mentioned acts to determine which namespaces to search
-        if query_text and not namespaces:
+        if query_text and not namespaces and self._namespace_detection:
             detected_namespaces = self._detect_mentioned_acts(query_text)
             if detected_namespaces:
                 namespaces = detected_namespaces
-                print(f"🔍 Query mentions specific acts: {namespaces}")
+                logger.info("Query mentions specific acts: %s", namespaces)
         
         # Get all namespaces if none specified and none detected
         if namespaces is None or len(namespaces) == 0:
             namespaces = self.get_available_namespaces()
-            print(f"🔍 Searching all namespaces: {namespaces}")
+            logger.debug("Searching all namespaces: %s", namespaces)
         
         if not namespaces:
-            print("❌ No namespaces available")
-            return []
+            logger.error("No namespaces available")
+            return None
         
-        # Query each namespace
+        # Answer explicit section queries straight from the section index
+        exact_results = []
+        if target_section and self._section_index is not None and self._section_lookup_enabled:
+            with stage_timer("section_lookup"):
+                exact_results = self._section_index.lookup(namespaces, target_section, query_embedding)
+                # The same provision under the paired act's numbering (IPC 302 <-> BNS 103)
+                for namespace, section in self._concordance_targets(namespaces, target_section):
+                    exact_results.extend(self._section_index.lookup([namespace], section, query_embedding))
+            for result in exact_results:
+                result["is_target_section"] = True
+                result["score"] = result["score"] * 1.2  # Boost score
+            if exact_results:
+                logger.info("Section index hit: %d chunks for section %s", len(exact_results), target_section)
+        
+        # With a direct hit, dense search only fills in related context
+        fetch_k = top_k if exact_results else top_k * self._dense_overfetch
+        if self._reranker is not None and not target_section:
+            # Enough candidates across the searched namespaces for the cross-encoder
+            fetch_k = max(fetch_k, -(-self._rerank_top_n // len(namespaces)))
+        
+        return namespaces, target_section, exact_results, fetch_k
+    
+    def _concordance_targets(self, namespaces: List[str], target_section: str) -> List[tuple]:
+        """Equivalent (namespace, section) pairs of the target section in the searched acts"""
+        if self._concordance is None:
+            return []
+        targets = []
         for namespace in namespaces:
-            try:
-                print(f"🔎 Querying namespace: {namespace}")
-                response = self._index.query(
-                    vector=query_embedding,
-                    top_k=top_k * 2,  # Get more results initially
-                    include_metadata=True,
-                    namespace=namespace
-                )
+            for equivalent in self._concordance.equivalents(namespace, target_section):
+                if equivalent not in targets and not (equivalent[0] in namespaces and equivalent[1] == target_section):
+                    targets.append(equivalent)
+        if targets:
+            logger.info("Concordance for section %s: %s", target_section,
+                        ", ".join(f"{namespace.upper()} {section}" for namespace, section in targets))
+        return targets
+    
+    def _rank_results(
+        self,
+        all_results: List[Dict],
+        exact_results: List[Dict],
+        namespaces: List[str],
+        target_section: Optional[str],
+        top_k: int,
+        query_text: str
+    ) -> List[Dict[str, Any]]:
+        """Fuse dense, keyword and exact hits, then apply query-aware ranking"""
+        # General queries keep a deeper candidate list for the cross-encoder
+        rerank = self._reranker is not None and bool(query_text) and not target_section
+        limit = max(top_k, self._rerank_top_n) if rerank else top_k
+        
+        # Exact section hits are dense-scored, so they join the dense list and
+        # go through fusion with it: every candidate ends up on one score scale
+        if exact_results:
+            exact_ids = {result["id"] for result in exact_results}
+            all_results = exact_results + [r for r in all_results if r["id"] not in exact_ids]
+        
+        # Blend in keyword (BM25) matches for exact statutory terms
+        if self._bm25_index is not None and query_text:
+            with stage_timer("bm25_fusion"):
+                sparse_results = self._bm25_index.search(query_text, namespaces, max(top_k * self._dense_overfetch, limit))
+                all_results = self._fuse_results(all_results, sparse_results)
+        
+        # Apply smart ranking based on query type
+        with stage_timer("ranking"):
+            if target_section:
+                # Specific section query: prioritize exact match
+                ranked_results = self._rank_for_specific_section(all_results, target_section, top_k)
+            elif self._diversify:
+                # General query: promote diversity
+                ranked_results = self._mmr_rerank(all_results, limit)
+            else:
+                ranked_results = sorted(all_results, key=lambda x: x['score'], reverse=True)
+        
+        if rerank:
+            with stage_timer("rerank"):
+                ranked_results = self._reranker.rerank(query_text, ranked_results[:limit])
+        
+        logger.info("Total results: %d (after smart ranking)", len(ranked_results))
+        
+        ranked_results = ranked_results[:top_k]
+        for result in ranked_results:
+            result.pop('_vector', None)
+        return ranked_results
+    
+    def _query_namespace(
+        self,
+        namespace: str,
+        query_embedding: List[float],
+        fetch_k: int,
+        score_threshold: float,
+        target_section: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        """Query a single namespace and return matches above threshold"""
+        logger.debug("Querying namespace: %s", namespace)
+        response = self._hedged_query(
+            namespace,
+            vector=query_embedding,
+            top_k=fetch_k,
+            include_metadata=True,
+            include_values=self._needs_match_values()
+        )
+        
+        logger.debug("Found %d matches in %s", len(response.matches), namespace)
+        
+        return self._collect_matches(namespace, response.matches, score_threshold, target_section)
+    
+    def _hedged_query(self, namespace: str, **query_args):
+        """
+        Query one namespace. With hedging enabled, a duplicate request is sent
+        if the first has not answered within the namespace's recent
+        HEDGE_PERCENTILE latency, and whichever succeeds first is used.
+        """
+        if self._hedge_executor is None:
+            return self._timed_query(namespace, query_args)
+        
+        primary = submit_with_context(self._hedge_executor, self._timed_query, namespace, query_args)
+        threshold = self._latency.percentile(namespace, self._hedge_percentile)
+        if threshold is None:
+            return primary.result()
+        
+        done, _ = wait([primary], timeout=max(threshold, self._hedge_min_delay))
+        if done:
+            return primary.result()
+        
+        logger.info("Hedging %s after %.0fms (p%g)", namespace, threshold * 1000, self._hedge_percentile)
+        self.hedges_sent += 1
+        hedge = submit_with_context(self._hedge_executor, self._timed_query, namespace, query_args)
+        
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self.hedge_wins += 1
+                    HEDGED_QUERIES.labels("hedge" if future is hedge else "primary").inc()
+                    return future.result()
+        
+        # Both failed: surface the original error
+        return primary.result()
+    
+    def _timed_query(self, namespace: str, query_args: Dict[str, Any]):
+        started = time.monotonic()
+        response = self._index.query(namespace=namespace, **query_args, **self._query_args)
+        elapsed = time.monotonic() - started
+        self._latency.record(namespace, elapsed)
+        NAMESPACE_QUERY_SECONDS.labels(namespace).observe(elapsed)
+        return response
+    
+    def reranker_stats(self) -> Dict[str, Any]:
+        """Cross-encoder pair-score cache and budget counters"""
+        if self._reranker is None:
+            return {"enabled": False}
+        return {"enabled": True, "top_n": self._rerank_top_n, **self._reranker.stats()}
+    
+    def latency_stats(self) -> Dict[str, Any]:
+        """Per-namespace query latency percentiles and hedging counters"""
+        return {
+            "namespaces": self._latency.stats(),
+            "hedging": {
+                "enabled": self._hedge_executor is not None,
+                "percentile": self._hedge_percentile,
+                "hedges_sent": self.hedges_sent,
+                "hedge_wins": self.hedge_wins
+            }
+        }
+    
+    def _collect_matches(
+        self,
+        namespace: str,
+        matches,
+        score_threshold: float,
+        target_section: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        """Convert index matches to result dicts, dropping those below threshold"""
+        trace = debug_enabled(logger)
+        results = []
+        below_threshold = 0
+        for match in matches:
+            if match.score >= score_threshold:
+                result = {
+                    "id": match.id,
+                    "score": float(match.score),
+                    "namespace": namespace,
+                    "metadata": dict(match.metadata) if match.metadata else {},
+                    "is_target_section": False
+                }
+                if getattr(match, 'values', None):
+                    result["_vector"] = match.values
                 
-                print(f"  ✓ Found {len(response.matches)} matches in {namespace}")
+                # Mark if this is the target section
+                if target_section:
+                    section_num = match.metadata.get('section_number', '')
+                    if section_num == target_section:
+                        result["is_target_section"] = True
+                        result["score"] = result["score"] * 1.2  # Boost score
+                        logger.info("Exact match: section %s in %s (boosted score: %.4f)", section_num, namespace.upper(), result['score'])
                 
-                for match in response.matches:
-                    if match.score >= score_threshold:
-                        result = {
-                            "id": match.id,
-                            "score": float(match.score),
-                            "namespace": namespace,
-                            "metadata": dict(match.metadata) if match.metadata else {},
-                            "is_target_section": False
-                        }
-                        
-                        # Mark if this is the target section
-                        if target_section:
-                            section_num = match.metadata.get('section_number', '')
-                            if section_num == target_section:
-                                result["is_target_section"] = True
-                                result["score"] = result["score"] * 1.2  # Boost score
-                                print(f"    🎯 EXACT MATCH: Section {section_num} in {namespace.upper()} (boosted score: {result['score']:.4f})")
-                        
-                        all_results.append(result)
-                        print(f"    ✓ Score: {match.score:.4f} | Section: {match.metadata.get('section_number', 'N/A')}")
-                    else:
-                        print(f"    ✗ Score: {match.score:.4f} (below threshold)")
-            
-            except Exception as e:
-                print(f"⚠️  Error querying namespace {namespace}: {e}")
-                continue
+                results.append(result)
+                if trace:
+                    logger.debug("Match %s score=%.4f section=%s", namespace, match.score, match.metadata.get('section_number', 'N/A'))
+            else:
+                below_threshold += 1
+                if trace:
+                    logger.debug("Match %s score=%.4f below threshold", namespace, match.score)
         
-        # Apply smart ranking based on query type
-        if target_section:
-            # Specific section query: prioritize exact match
-            ranked_results = self._rank_for_specific_section(all_results, target_section, top_k)
-        else:
-            # General query: promote diversity
-            ranked_results = self._diversify_results(all_results, top_k)
+        if below_threshold:
+            BELOW_THRESHOLD_MATCHES.labels(namespace).inc(below_threshold)
+        return results
+    
+    def _fuse_results(
+        self,
+        dense_results: List[Dict],
+        sparse_results: List[Dict]
+    ) -> List[Dict]:
+        """
+        Combine dense and BM25 results with reciprocal-rank ("rrf") or
+        weighted score fusion. The fused score is scaled to 0-1 and replaces
+        "score"; the inputs are kept as "dense_score" and "bm25_score".
+        """
+        if not sparse_results:
+            return dense_results
+        
+        dense_weight, bm25_weight = self._fusion_weights
+        total_weight = (dense_weight + bm25_weight) or 1.0
+        
+        fused = {}
+        dense_sorted = sorted(dense_results, key=lambda x: x['score'], reverse=True)
+        for rank, result in enumerate(dense_sorted, 1):
+            entry = fused.setdefault(result['id'], dict(result))
+            entry['dense_score'] = result['score']
+            entry['_dense_rank'] = rank
+        
+        max_bm25 = sparse_results[0]['score'] or 1.0
+        for rank, result in enumerate(sparse_results, 1):
+            entry = fused.setdefault(result['id'], dict(result))
+            entry['bm25_score'] = round(result['score'], 4)
+            entry['_bm25_rank'] = rank
+            entry['_bm25_norm'] = result['score'] / max_bm25
+        
+        for entry in fused.values():
+            dense_rank = entry.pop('_dense_rank', None)
+            bm25_rank = entry.pop('_bm25_rank', None)
+            bm25_norm = entry.pop('_bm25_norm', 0.0)
+            
+            if self._fusion_method == "rrf":
+                score = 0.0
+                if dense_rank:
+                    score += dense_weight / (self._rrf_k + dense_rank)
+                if bm25_rank:
+                    score += bm25_weight / (self._rrf_k + bm25_rank)
+                entry['score'] = score * (self._rrf_k + 1) / total_weight
+            else:
+                dense_score = entry.get('dense_score', 0.0)
+                entry['score'] = (dense_weight * dense_score + bm25_weight * bm25_norm) / total_weight
         
-        print(f"📊 Total results: {len(ranked_results)} (after smart ranking)")
+        logger.debug("Fused %d dense + %d BM25 results into %d", len(dense_results), len(sparse_results), len(fused))
+        return list(fused.values())
+    
+    def _build_corpus_indexes(self, namespaces: List[str]):
+        """Load all chunks once and build the section and BM25 indexes from them"""
+        try:
+            self._section_index.build(self._index, namespaces)
+            if self._bm25_index is not None:
+                self._bm25_index.build(self._section_index.iter_chunks())
+        except Exception as e:
+            # Section lookup and hybrid search stay off; /health reports why
+            RetrievalService._corpus_index_error = f"{type(e).__name__}: {e}"
+            logger.error("Corpus index build failed, section lookup and BM25 disabled: %s", e)
+    
+    def corpus_index_stats(self) -> Dict[str, Any]:
+        """Build state of the in-memory section and BM25 indexes"""
+        def state(index) -> str:
+            if index is None:
+                return "disabled"
+            if index.ready:
+                return "ready"
+            return "failed" if self._corpus_index_error else "building"
         
-        return ranked_results[:top_k]
+        return {
+            "section_index": state(self._section_index),
+            "bm25": state(self._bm25_index),
+            "error": self._corpus_index_error
+        }
     
     def _rank_for_specific_section(
         self, 
@@ -157,13 +712,15 @@ class RetrievalService:
         """
         Ranking for queries about a specific section:
         1. Target section from all acts (IPC 302, BNS 302, etc.)
-        2. Related sections (376A, 376B if asking about 376)
-        3. Other high-scoring sections
+        2. Its concordance equivalents (BNS 103 for IPC 302)
+        3. Related sections (376A, 376B if asking about 376)
+        4. Other high-scoring sections
         """
         if not results:
             return []
         
         target_results = []
+        equivalent_results = []
         related_results = []
         other_results = []
         
@@ -172,6 +729,8 @@ class RetrievalService:
             
             if section_num == target_section:
                 target_results.append(result)
+            elif result.get('is_target_section'):
+                equivalent_results.append(result)
             elif section_num.startswith(target_section):
                 # Related sections (376A, 376B for 376)
                 related_results.append(result)
@@ -180,11 +739,12 @@ class RetrievalService:
         
         # Sort each group by score
         target_results.sort(key=lambda x: x['score'], reverse=True)
+        equivalent_results.sort(key=lambda x: x['score'], reverse=True)
         related_results.sort(key=lambda x: x['score'], reverse=True)
         other_results.sort(key=lambda x: x['score'], reverse=True)
         
-        # Combine: target first, then related, then others
-        ranked = target_results + related_results + other_results
+        # Combine: target first, then equivalents, related, others
+        ranked = target_results + equivalent_results + related_results + other_results
         
         # Show breakdown by namespace for target sections
         if target_results:
@@ -194,12 +754,47 @@ class RetrievalService:
                 act_name = result['metadata'].get('act_short_name', ns.upper())
                 namespaces_found[ns] = act_name
             
-            print(f"  📌 Section {target_section} found in: {', '.join(namespaces_found.values())}")
+            logger.debug("Section %s found in: %s", target_section, ', '.join(namespaces_found.values()))
         
-        print(f"  📊 Ranking: {len(target_results)} target, {len(related_results)} related, {len(other_results)} others")
+        logger.debug("Ranking: %d target, %d equivalent, %d related, %d others",
+                     len(target_results), len(equivalent_results), len(related_results), len(other_results))
         
         return ranked[:top_k]
     
+    def _needs_match_values(self) -> bool:
+        """Ask the index for match vectors only while MMR cannot read them from the section index"""
+        return self._diversify and (self._section_index is None or not self._section_index.ready)
+    
+    def _mmr_rerank(self, results: List[Dict], top_k: int) -> List[Dict]:
+        """
+        Re-rank with maximal marginal relevance over the chunk vectors, so
+        near-duplicate provisions (e.g. IPC 302 / BNS 103) do not crowd out
+        other sections. Chunks of an already picked section count as exact
+        duplicates. Falls back to one-result-per-section without vectors.
+        """
+        if not results:
+            return []
+        
+        results.sort(key=lambda x: x['score'], reverse=True)
+        vectors = None
+        if self._section_index is not None:
+            vectors = self._section_index.vectors_for([(r['namespace'], r['id']) for r in results])
+        if vectors is None and all('_vector' in r for r in results):
+            vectors = np.asarray([r['_vector'] for r in results], dtype=np.float32)
+        if vectors is None:
+            return self._diversify_results(results, top_k)
+        
+        section_codes = {}
+        groups = np.fromiter(
+            (section_codes.setdefault((r['metadata'].get('act_name', ''), r['metadata'].get('section_number', '')), len(section_codes))
+             for r in results),
+            dtype=np.int64,
+            count=len(results)
+        )
+        scores = np.fromiter((r['score'] for r in results), dtype=np.float32, count=len(results))
+        order = mmr_select(vectors, scores, top_k, self._mmr_lambda, groups)
+        return [results[i] for i in order]
+    
     def _diversify_results(self, results: List[Dict], top_k: int) -> List[Dict]:
         """
         Re-rank results to promote diversity across sections/acts
@@ -241,43 +836,43 @@ class RetrievalService:
         return diverse_results
     
     def get_available_namespaces(self) -> List[str]:
-        """Get list of available namespaces"""
+        """Get list of available namespaces (served from the index stats cache)"""
         try:
-            stats = self._index.describe_index_stats()
-            
-            if hasattr(stats, 'namespaces'):
-                namespaces_dict = stats.namespaces
-            elif isinstance(stats, dict):
-                namespaces_dict = stats.get('namespaces', {})
-            else:
-                stats_dict = dict(stats)
-                namespaces_dict = stats_dict.get('namespaces', {})
+            stats = self._stats_cache.get()
+            namespaces_dict = stats.get('namespaces', {})
             
             namespace_list = list(namespaces_dict.keys()) if namespaces_dict else []
-            print(f"📚 Available namespaces: {namespace_list}")
+            logger.debug("Available namespaces: %s", namespace_list)
             return namespace_list
             
         except Exception as e:
-            print(f"⚠️  Error getting namespaces: {e}")
+            logger.warning("Error getting namespaces: %s", e)
             return ['ipc', 'bns', 'crpc', 'iea', 'constitution', 'hma', 'cpa', 'ica']
     
     def get_index_stats(self) -> Dict[str, Any]:
-        """Get Pinecone index statistics"""
+        """Get Pinecone index statistics (served from the index stats cache)"""
         try:
-            stats = self._index.describe_index_stats()
-            
-            if hasattr(stats, 'to_dict'):
-                return stats.to_dict()
-            elif isinstance(stats, dict):
-                return stats
-            else:
-                result = {}
-                if hasattr(stats, 'total_vector_count'):
-                    result['total_vector_count'] = stats.total_vector_count
-                if hasattr(stats, 'namespaces'):
-                    result['namespaces'] = dict(stats.namespaces)
-                return result
-                
+            return self._stats_cache.get()
         except Exception as e:
-            print(f"❌ Error getting index stats: {e}")
-            return {"error": str(e)}
\ No newline at end of file
+            logger.error("Error getting index stats: %s", e)
+            return {"error": str(e)}
+    
+    def get_index_stats_age(self) -> Optional[float]:
+        """Seconds since index stats were last fetched from Pinecone"""
+        return self._stats_cache.age()
+    
+    def _fetch_index_stats(self) -> Dict[str, Any]:
+        """Fetch index statistics from Pinecone as a plain dict"""
+        stats = self._index.describe_index_stats()
+        
+        if hasattr(stats, 'to_dict'):
+            return stats.to_dict()
+        elif isinstance(stats, dict):
+            return stats
+        else:
+            result = {}
+            if hasattr(stats, 'total_vector_count'):
+                result['total_vector_count'] = stats.total_vector_count
+            if hasattr(stats, 'namespaces'):
+                result['namespaces'] = dict(stats.namespaces)
+            return result
@@ -0,0 +1,115 @@
+from typing import List, Dict, Any, Tuple, Iterator, Optional
+from services.log import get_logger
+import numpy as np
+import threading
+
+logger = get_logger("section_index")
+
+class SectionIndex:
+    """
+    In-memory map from (namespace, section_number) to that section's chunks.
+
+    Built once from the vector index via list/fetch (works for Pinecone and
+    LocalIndex), so explicit section queries are answered by an O(1) lookup
+    instead of hoping dense search returns the section above threshold.
+    Chunk vectors are kept so direct hits still get a comparable cosine score,
+    and can be looked up by chunk id for diversification (MMR).
+    """
+
+    def __init__(self):
+        self._sections: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        self._vectors: Dict[Tuple[str, str], np.ndarray] = {}
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._rows: Dict[Tuple[str, str], int] = {}
+        self._ready = threading.Event()
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    def build(self, index, namespaces: List[str], fetch_batch_size: int = 100):
+        """Load every record's metadata and vector from the index"""
+        sections: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        vectors: Dict[Tuple[str, str], List[List[float]]] = {}
+
+        for namespace in namespaces:
+            for page in index.list(namespace=namespace):
+                ids = list(page)
+                for start in range(0, len(ids), fetch_batch_size):
+                    response = index.fetch(ids=ids[start:start + fetch_batch_size], namespace=namespace)
+                    for vec_id, record in response.vectors.items():
+                        metadata = dict(record.metadata) if record.metadata else {}
+                        section_number = str(metadata.get('section_number', '')).upper()
+                        if not section_number:
+                            continue
+                        key = (namespace, section_number)
+                        sections.setdefault(key, []).append({"id": vec_id, "metadata": metadata})
+                        vectors.setdefault(key, []).append(list(record.values))
+
+        # Keep chunks in document order
+        for key, chunks in sections.items():
+            order = sorted(range(len(chunks)), key=lambda i: chunks[i]["metadata"].get('chunk_index', 0))
+            sections[key] = [chunks[i] for i in order]
+            vectors[key] = [vectors[key][i] for i in order]
+
+        # One contiguous matrix; each section's vectors are a view into it
+        matrix = np.asarray([values for key in sections for values in vectors[key]], dtype=np.float32)
+        section_vectors = {}
+        rows = {}
+        start = 0
+        for key, chunks in sections.items():
+            section_vectors[key] = matrix[start:start + len(chunks)]
+            for offset, chunk in enumerate(chunks):
+                rows[(key[0], chunk["id"])] = start + offset
+            start += len(chunks)
+
+        self._sections = sections
+        self._vectors = section_vectors
+        self._matrix = matrix
+        self._rows = rows
+        self._ready.set()
+        logger.info("Section index built: %d sections across %d namespaces", len(sections), len(namespaces))
+
+    def iter_chunks(self) -> Iterator[Tuple[str, str, Dict[str, Any]]]:
+        """Yield (namespace, id, metadata) for every loaded chunk"""
+        for (namespace, _), chunks in self._sections.items():
+            for chunk in chunks:
+                yield namespace, chunk["id"], chunk["metadata"]
+
+    def vectors_for(self, keys: List[Tuple[str, str]]) -> Optional[np.ndarray]:
+        """Vectors for (namespace, id) pairs, or None unless every one is loaded"""
+        if not self.ready:
+            return None
+        try:
+            rows = [self._rows[key] for key in keys]
+        except KeyError:
+            return None
+        return self._matrix[rows]
+
+    def lookup(
+        self,
+        namespaces: List[str],
+        section_number: str,
+        query_embedding: List[float]
+    ) -> List[Dict[str, Any]]:
+        """Return the section's chunks in each namespace, scored against the query"""
+        if not self.ready:
+            return []
+
+        query = np.asarray(query_embedding, dtype=np.float32)
+        results = []
+        for namespace in namespaces:
+            key = (namespace, section_number.upper())
+            chunks = self._sections.get(key)
+            if not chunks:
+                continue
+            scores = self._vectors[key] @ query
+            for chunk, score in zip(chunks, scores):
+                results.append({
+                    "id": chunk["id"],
+                    "score": float(score),
+                    "namespace": namespace,
+                    "metadata": dict(chunk["metadata"]),
+                    "is_target_section": False
+                })
+        return results
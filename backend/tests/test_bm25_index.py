@@ -0,0 +1,50 @@
+from services.bm25_index import BM25Index, tokenize
+
+
+def chunk(namespace, vec_id, text, title=""):
+    return namespace, vec_id, {"text": text, "section_title": title, "section_number": vec_id.split("-")[1]}
+
+
+def build(chunks):
+    index = BM25Index()
+    index.build(chunks)
+    return index
+
+
+CHUNKS = [
+    chunk("crpc", "crpc-438-0", "Direction for grant of bail to person apprehending arrest", "Anticipatory bail"),
+    chunk("crpc", "crpc-437-0", "When bail may be taken in case of non-bailable offence"),
+    chunk("ipc", "ipc-302-0", "Whoever commits murder shall be punished with death", "Punishment for murder"),
+    chunk("bns", "bns-103-0", "Whoever commits murder shall be punished with death or imprisonment for life"),
+]
+
+
+def test_tokenize_drops_stopwords_and_adds_bigrams():
+    assert tokenize("The grant of Anticipatory Bail") == ["grant", "anticipatory", "bail", "grant_anticipatory", "anticipatory_bail"]
+
+
+def test_ranks_exact_phrase_first():
+    results = build(CHUNKS).search("anticipatory bail", ["crpc", "ipc", "bns"], 10)
+    assert [r["id"] for r in results] == ["crpc-438-0", "crpc-437-0"]
+    assert results[0]["score"] > results[1]["score"] > 0
+
+
+def test_filters_by_namespace():
+    index = build(CHUNKS)
+    assert [r["id"] for r in index.search("murder", ["bns"], 10)] == ["bns-103-0"]
+    assert index.search("murder", ["hma"], 10) == []
+
+
+def test_top_k_and_unknown_terms():
+    index = build(CHUNKS)
+    assert len(index.search("murder death", ["ipc", "bns"], 1)) == 1
+    assert index.search("xylophone", ["ipc", "bns", "crpc"], 10) == []
+
+
+def test_not_ready_until_built():
+    index = BM25Index()
+    assert not index.ready
+    assert index.search("murder", ["ipc"], 10) == []
+    index.build([])
+    assert index.ready
+    assert index.search("murder", ["ipc"], 10) == []
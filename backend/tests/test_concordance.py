@@ -0,0 +1,70 @@
+import json
+
+import pytest
+
+from services.concordance import SectionConcordance
+from services.retrieval_service import RetrievalService
+
+
+TABLES = {
+    "ipc->bns": {"302": "103", "498A": ["85", "86"], "304B": "80", "376": ["64", "65"], "1": "1"},
+    "crpc->bnss": {"41": "35", "41A": "35", "438": "482"},
+}
+
+
+@pytest.fixture
+def concordance(tmp_path):
+    path = tmp_path / "concordance.json"
+    path.write_text(json.dumps(TABLES), encoding="utf-8")
+    return SectionConcordance(str(path))
+
+
+@pytest.fixture
+def service(concordance):
+    # Parsing helpers only; skip __init__, which connects to the index
+    service = object.__new__(RetrievalService)
+    service._concordance = concordance
+    return service
+
+
+def test_both_directions(concordance):
+    assert concordance.equivalents("ipc", "302") == [("bns", "103")]
+    assert concordance.equivalents("bns", "103") == [("ipc", "302")]
+
+
+def test_lettered_sections_and_lists(concordance):
+    assert concordance.equivalents("ipc", "498A") == [("bns", "85"), ("bns", "86")]
+    assert concordance.equivalents("ipc", "498a") == [("bns", "85"), ("bns", "86")]
+    assert concordance.equivalents("bns", "86") == [("ipc", "498A")]
+
+
+def test_many_to_one(concordance):
+    assert concordance.equivalents("bnss", "35") == [("crpc", "41"), ("crpc", "41A")]
+
+
+def test_unknown_section(concordance):
+    assert concordance.equivalents("ipc", "9999") == []
+    assert concordance.equivalents("iea", "302") == []
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("Section 498A IPC", [("bns", "85"), ("bns", "86")]),
+    ("ipc 304b dowry death", [("bns", "80")]),
+    ("What is BNSS 35?", [("crpc", "41"), ("crpc", "41A")]),
+    ("anticipatory bail under 482 bnss", [("crpc", "438")]),
+    ("Explain section 302 of IPC", [("bns", "103")]),
+])
+def test_targets_for_query(service, query, expected):
+    namespaces = service._detect_mentioned_acts(query)
+    target_section = service._extract_section_number(query)
+    assert service._concordance_targets(namespaces, target_section) == expected
+
+
+def test_same_number_in_a_searched_act_is_not_a_target(service):
+    assert service._concordance_targets(["ipc", "bns"], "1") == []
+    assert service._concordance_targets(["ipc"], "1") == [("bns", "1")]
+
+
+def test_disabled(service):
+    service._concordance = None
+    assert service._concordance_targets(["ipc"], "302") == []
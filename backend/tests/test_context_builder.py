@@ -0,0 +1,76 @@
+from services.context_builder import ContextBuilder, TokenCounter
+
+
+def context(section, text, score, chunk_index=0, act="Indian Penal Code, 1860"):
+    return {
+        "id": f"{section}-{chunk_index}",
+        "score": score,
+        "metadata": {"act_name": act, "section_number": section, "chunk_index": chunk_index, "text": text},
+    }
+
+
+def builder(budget, max_overlap=300):
+    # No tokenizer file: counts are len(text) // 4
+    return ContextBuilder(budget, TokenCounter(), max_overlap=max_overlap)
+
+
+def documents(text):
+    return [line for line in text.splitlines() if line.startswith("[Document")]
+
+
+def test_merges_consecutive_chunks_without_overlap():
+    shared = "punished with imprisonment for a term which may extend to seven years"
+    contexts = [
+        context("420", f"{shared}, and shall also be liable to fine.", 0.7, chunk_index=1),
+        context("420", f"Whoever cheats and thereby dishonestly induces delivery shall be {shared}", 0.8, chunk_index=0),
+    ]
+    text = builder(1000).build(contexts)
+    assert len(documents(text)) == 1
+    assert text.count(shared) == 1
+    assert "Relevance: 0.80" in text
+
+
+def test_drops_duplicate_chunks():
+    contexts = [context("302", "Whoever commits murder shall be punished with death.", 0.9)] * 3
+    text = builder(1000).build(contexts)
+    assert text.count("Whoever commits murder") == 1
+
+
+def test_skips_entries_that_do_not_fit_and_keeps_smaller_ones():
+    contexts = [
+        context("1", "a" * 400, 0.9),
+        context("2", "b" * 400, 0.8),
+        context("3", "c" * 40, 0.5),
+    ]
+    text = builder(140).build(contexts)
+    assert [line.split("Section ")[1].split(" ")[0] for line in documents(text)] == ["1", "3"]
+
+
+def test_most_relevant_entry_is_truncated_to_fit():
+    contexts = [context("1", " ".join(["word"] * 400), 0.9), context("2", "short text here", 0.1)]
+    text = builder(50).build(contexts)
+    assert documents(text)[0].startswith("[Document 1] Indian Penal Code, 1860 - Section 1")
+    assert text.rstrip().endswith("…")
+    assert "Section 2" not in text
+
+
+def test_listed_by_relevance():
+    contexts = [context("10", "ten", 0.2), context("20", "twenty", 0.9), context("30", "thirty", 0.5)]
+    assert [line.split("Section ")[1].split(" ")[0] for line in documents(builder(1000).build(contexts))] == ["20", "30", "10"]
+
+
+def test_empty():
+    assert builder(100).build([]) == ""
+
+
+def test_rerank_position_orders_entries_over_retrieval_score():
+    contexts = [context("10", "ten", 0.2), context("20", "twenty", 0.9), context("30", "thirty", 0.5)]
+    for position, ctx in enumerate(contexts):
+        ctx["rerank_position"] = position
+    assert [line.split("Section ")[1].split(" ")[0] for line in documents(builder(1000).build(contexts))] == ["10", "20", "30"]
+
+
+def test_rerank_position_decides_which_entry_is_kept():
+    contexts = [context("1", "a" * 400, 0.9), context("2", "b" * 400, 0.1)]
+    contexts[0]["rerank_position"], contexts[1]["rerank_position"] = 1, 0
+    assert [line.split("Section ")[1].split(" ")[0] for line in documents(builder(120).build(contexts))] == ["2"]
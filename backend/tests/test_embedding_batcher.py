@@ -0,0 +1,71 @@
+import asyncio
+import threading
+from concurrent.futures import TimeoutError
+
+import numpy as np
+import pytest
+
+from services.embedding_batcher import EmbeddingBatcher
+
+
+class GatedEncoder:
+    """encode_fn that holds each batch until released"""
+
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.batches = []
+
+    def __call__(self, texts):
+        self.batches.append(list(texts))
+        self.started.set()
+        assert self.release.wait(5)
+        return np.array([[float(len(text))] * 4 for text in texts], dtype=np.float32)
+
+
+def test_batches_concurrent_requests_and_deduplicates():
+    encoder = GatedEncoder()
+    encoder.release.set()
+    batcher = EmbeddingBatcher(encoder, max_batch_size=8, max_wait_ms=50)
+    futures = [batcher.submit(text) for text in ("a", "bb", "a")]
+    assert [future.result(timeout=5)[0] for future in futures] == [1.0, 2.0, 1.0]
+    assert encoder.batches == [["a", "bb"]]
+
+
+def test_cancelled_async_caller_does_not_stop_the_worker():
+    encoder = GatedEncoder()
+    batcher = EmbeddingBatcher(encoder, max_wait_ms=0, timeout=5)
+
+    async def cancel_while_in_flight():
+        task = asyncio.ensure_future(asyncio.wrap_future(batcher.submit("question")))
+        assert await asyncio.to_thread(encoder.started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(cancel_while_in_flight())
+    encoder.release.set()
+    assert batcher.encode("next").tolist() == [4.0] * 4
+    assert batcher._worker.is_alive()
+
+
+def test_request_cancelled_before_its_batch_is_skipped():
+    encoder = GatedEncoder()
+    batcher = EmbeddingBatcher(encoder, max_wait_ms=0, timeout=5)
+    first = batcher.submit("first")
+    assert encoder.started.wait(5)
+    cancelled = batcher.submit("cancelled")
+    assert cancelled.cancel()
+    encoder.release.set()
+    assert first.result(timeout=5)[0] == 5.0
+    assert batcher.encode("next")[0] == 4.0
+    assert ["cancelled"] not in encoder.batches
+
+
+def test_encode_times_out():
+    encoder = GatedEncoder()
+    batcher = EmbeddingBatcher(encoder, max_wait_ms=0, timeout=0.05)
+    with pytest.raises(TimeoutError):
+        batcher.encode("slow")
+    encoder.release.set()
+    assert batcher.encode("next")[0] == 4.0
@@ -0,0 +1,36 @@
+import os
+import numpy as np
+
+from services.embedding_cache import EmbeddingCache
+
+
+def test_stores_a_copy_of_batch_rows():
+    batch = np.ones((32, 768), dtype=np.float32)
+    cache = EmbeddingCache(max_bytes=1 << 20)
+    cache.put("question", batch[3])
+    batch[3] = 0.0
+    cached = cache.get("question")
+    assert cached.base is None
+    assert cached.nbytes == 768 * 4
+    assert float(cached.sum()) == 768.0
+
+
+def test_evicts_least_recently_used():
+    size = 768 * 4 + 1
+    cache = EmbeddingCache(max_bytes=2 * size)
+    cache.put("a", np.zeros(768))
+    cache.put("b", np.zeros(768))
+    cache.get("a")
+    cache.put("c", np.zeros(768))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+
+
+def test_save_and_load(tmp_path):
+    path = str(tmp_path / "cache.npz")
+    cache = EmbeddingCache(max_bytes=1 << 20, persist_path=path)
+    cache.put("question", np.arange(768, dtype=np.float32))
+    cache.save()
+    restored = EmbeddingCache(max_bytes=1 << 20, persist_path=path)
+    assert np.array_equal(restored.get("question"), np.arange(768, dtype=np.float32))
+    assert [name for name in os.listdir(tmp_path)] == ["cache.npz"]
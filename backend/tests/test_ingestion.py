@@ -0,0 +1,152 @@
+import numpy as np
+
+from services.ingestion_manifest import IngestionManifest
+from services.ingestion_service import split_sections, chunk_text, _ActWriter
+
+
+FRONT_MATTER = (
+    "THE TEST ACT\nARRANGEMENT OF CLAUSES\n1. Short title.\n2. Definitions.\n3. Punishment.\n"
+    "An Act to consolidate and amend the law relating to the matters set out below, and to provide "
+    "for procedure, penalties and other matters connected therewith or incidental thereto, as the "
+    "legislature has deemed expedient; be it enacted in the seventy-fourth year of the Republic.\n"
+)
+
+
+def body(count):
+    return "".join(
+        f"{n}. Heading number {n}.—(1) Whoever does thing {n} shall be liable under section {n + 1}.\n"
+        for n in range(1, count + 1)
+    )
+
+
+def numbers(sections):
+    return [section["section_number"] for section in sections]
+
+
+def test_skips_table_of_contents_and_footnotes():
+    pages = [
+        FRONT_MATTER,
+        "1. Short title.—This Act may be called the Test Act.\n"
+        "2. Definitions.—In this Act words have their ordinary meaning.\n",
+        "3. Punishment.—(1) Whoever commits an offence shall be punished.\n"
+        "1. Subs. by Act 5 of 1999, s. 2.\n",
+    ]
+    sections = list(split_sections(iter(pages)))
+    assert numbers(sections) == ["1", "2", "3"]
+    assert [s["title"] for s in sections] == ["Short title", "Definitions", "Punishment"]
+    assert sections[2]["text"] == "3. Punishment.—(1) Whoever commits an offence shall be punished. 1. Subs. by Act 5 of 1999, s. 2."
+
+
+def test_header_split_across_pages():
+    pages = [
+        "1. Short title.—This Act may be called the Test Act.\n2. Punishment.",
+        "—(1) Whoever commits an offence shall be punished.",
+    ]
+    sections = list(split_sections(iter(pages)))
+    assert numbers(sections) == ["1", "2"]
+    assert sections[1]["title"] == "Punishment"
+
+
+def test_page_boundaries_do_not_change_sections():
+    text = FRONT_MATTER + body(80) + "81. Last section.—(1) Text of the last section.\n"
+    whole = list(split_sections(iter([text.rstrip("\n")])))
+    by_line = list(split_sections(iter(text.rstrip("\n").split("\n"))))
+    assert whole == by_line
+    assert numbers(whole)[:6] == ["1", "2", "3", "4", "5", "6"]
+    assert len(whole) == 81
+
+
+def test_lettered_sections_follow_their_base():
+    text = body(4) + "4A. Special case.—(1) Later insertion.\n5. Heading five.—(1) Five.\n"
+    assert numbers(split_sections(iter([text]))) == ["1", "2", "3", "4", "4A", "5"]
+
+
+def test_chunk_text_overlaps_on_word_boundaries():
+    text = " ".join(f"w{i}" for i in range(300))
+    chunks = chunk_text(text, 200, 50)
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 200 for chunk in chunks)
+    assert all(chunk.split()[0] in previous for previous, chunk in zip(chunks, chunks[1:]))
+    assert chunk_text("short", 200, 50) == ["short"]
+
+
+def test_manifest_settings_change_drops_hashes(tmp_path):
+    path = str(tmp_path / "manifest.json")
+    manifest = IngestionManifest(path)
+    manifest.settings = "v1"
+    manifest.set_namespace("ipc", "abc", {"302": {"hash": "h", "chunk_ids": ["ipc-302-0"]}})
+    manifest.save()
+
+    reloaded = IngestionManifest(path)
+    reloaded.settings = "v1"
+    assert reloaded.get_namespace("ipc")["sections"]["302"]["hash"] == "h"
+    reloaded.settings = "v2"
+    assert reloaded.get_namespace("ipc") is None
+
+
+class FakeService:
+    embed_batch_size = 2
+    _backend = "pinecone"
+
+    def __init__(self):
+        self.calls = []
+
+    def _embed(self, records):
+        return np.ones((len(records), 3), dtype=np.float32)
+
+    def upsert(self, namespace, records, vectors):
+        self.calls.append(("upsert", [r["id"] for r in records]))
+
+    def delete(self, namespace, ids):
+        self.calls.append(("delete", sorted(ids)))
+
+    def clear(self, namespace):
+        self.calls.append(("clear", namespace))
+
+    def write(self, namespace, records, vectors):
+        self.calls.append(("write", [r["id"] for r in records]))
+
+
+def records(section, texts):
+    return [
+        {"id": f"ipc-{section}-{i}", "embed_text": text, "metadata": {"section_number": section, "section_title": ""}}
+        for i, text in enumerate(texts)
+    ]
+
+
+def written(service):
+    return [i for kind, ids in service.calls if kind == "upsert" for i in ids]
+
+
+def test_act_writer_rebuild_streams_batches():
+    service = FakeService()
+    writer = _ActWriter(service, "ipc", previous=None)
+    writer.add(records("1", ["a", "b", "c"]))
+    assert service.calls[0] == ("clear", "ipc")
+    assert written(service) == ["ipc-1-0", "ipc-1-1"]
+    writer.add(records("2", ["d"]))
+    stats = writer.finish()
+    assert written(service) == ["ipc-1-0", "ipc-1-1", "ipc-1-2", "ipc-2-0"]
+    assert stats["status"] == "rebuilt"
+    assert stats["embedded_chunks"] == 4
+
+
+def test_act_writer_only_writes_changed_sections():
+    first = FakeService()
+    writer = _ActWriter(first, "ipc", previous=None)
+    for section, texts in (("1", ["a"]), ("2", ["b", "c"]), ("3", ["d"])):
+        writer.add(records(section, texts))
+    writer.finish()
+    previous = writer.sections
+
+    service = FakeService()
+    writer = _ActWriter(service, "ipc", previous=previous)
+    writer.add(records("1", ["a"]) + records("2", ["b changed"]))
+    writer.add(records("4", ["e"]))
+    stats = writer.finish()
+
+    assert written(service) == ["ipc-2-0", "ipc-4-0"]
+    assert ("delete", ["ipc-2-1", "ipc-3-0"]) in service.calls
+    assert ("clear", "ipc") not in service.calls
+    assert stats["status"] == "updated"
+    assert (stats["changed_sections"], stats["removed_sections"], stats["deleted_chunks"]) == (2, 1, 2)
@@ -0,0 +1,45 @@
+import numpy as np
+
+from services.mmr import mmr_select
+
+
+def unit(*rows):
+    vectors = np.asarray(rows, dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def test_near_duplicate_is_demoted():
+    vectors = unit([1, 0, 0], [0.99, 0.01, 0], [0, 1, 0])
+    relevance = np.array([1.0, 0.95, 0.5])
+    assert mmr_select(vectors, relevance, 3, lambda_=0.5) == [0, 2, 1]
+
+
+def test_lambda_one_is_relevance_order():
+    vectors = unit([1, 0, 0], [0.99, 0.01, 0], [0, 1, 0])
+    relevance = np.array([0.5, 1.0, 0.7])
+    assert mmr_select(vectors, relevance, 3, lambda_=1.0) == [1, 2, 0]
+
+
+def test_same_group_counts_as_duplicate():
+    # Orthogonal vectors, but 0 and 1 are chunks of the same section
+    vectors = unit([1, 0, 0, 0], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1])
+    relevance = np.array([1.0, 0.9, 0.85, 0.0])
+    assert mmr_select(vectors, relevance, 4, lambda_=0.7) == [0, 1, 2, 3]
+    groups = np.array([7, 7, 3, 4])
+    assert mmr_select(vectors, relevance, 4, lambda_=0.7, groups=groups) == [0, 2, 1, 3]
+
+
+def test_top_k_larger_than_candidates():
+    vectors = unit([1, 0], [0, 1])
+    assert sorted(mmr_select(vectors, np.array([0.2, 0.4]), 10)) == [0, 1]
+
+
+def test_empty_and_zero_k():
+    assert mmr_select(np.zeros((0, 3), dtype=np.float32), np.zeros(0), 5) == []
+    assert mmr_select(unit([1, 0]), np.array([1.0]), 0) == []
+
+
+def test_equal_relevance_picks_every_candidate_once():
+    vectors = unit([1, 0, 0], [0, 1, 0], [0, 0, 1])
+    order = mmr_select(vectors, np.array([0.5, 0.5, 0.5]), 3)
+    assert sorted(order) == [0, 1, 2]
@@ -0,0 +1,34 @@
+import pytest
+
+from services.retrieval_service import RetrievalService
+
+
+@pytest.fixture
+def service():
+    # Parsing helpers only; skip __init__, which connects to the index
+    return object.__new__(RetrievalService)
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("Section 498A IPC", "498A"),
+    ("What does section 21A of the Constitution say?", "21A"),
+    ("Article 21a", "21A"),
+    ("ipc 376d", "376D"),
+    ("IPC 304B dowry death", "304B"),
+    ("punishment under sec 120B", "120B"),
+    ("Section 376AB", "376AB"),
+    ("302 IPC", "302"),
+    ("Explain section 302 of IPC", "302"),
+    ("BNSS 35 arrest without warrant", "35"),
+    ("482 bnss", "482"),
+])
+def test_extracts_section_numbers_with_letter_suffixes(service, query, expected):
+    assert service._extract_section_number(query) == expected
+
+
+@pytest.mark.parametrize("query", [
+    "what is anticipatory bail",
+    "Section 1000",
+])
+def test_no_section_number(service, query):
+    assert service._extract_section_number(query) is None